@@ -0,0 +1,15 @@
+import asyncio
+
+from src.bot.api_services import get_report_service_callback
+from src.core.db.db import session_scope
+
+
+async def create_report_thumbnails() -> None:
+    """Создаёт превью фото отчётов всех смен, у которых его ещё нет."""
+    async with session_scope() as session:
+        created = await get_report_service_callback(session).create_missing_thumbnails()
+    print(f"Создано превью: {created}")
+
+
+if __name__ == '__main__':
+    asyncio.run(create_report_thumbnails())
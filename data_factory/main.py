@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import sys
 from uuid import UUID
@@ -17,6 +18,7 @@ from data_factory.factories import (
     UserFactory,
     session,
 )
+from rebuild_task_report_stats import rebuild_task_report_stats
 from src.core.db.models import Member, Request, Shift, User
 
 
@@ -41,7 +43,12 @@ def get_random_user_ids(count: int, status: User.Status) -> list:
 def truncate_tables(session: Session) -> None:
     """Очистить таблицы БД."""
     logger.info("Удаление данных из таблиц...")
-    session.execute(sqlalchemy.text("""TRUNCATE TABLE requests, shifts, reports, users, members, administrators"""))
+    session.execute(
+        sqlalchemy.text(
+            """TRUNCATE TABLE requests, shifts, reports, task_report_stats, users, members, administrators,
+            outbox_messages, analytics_exports"""
+        )
+    )
     session.commit()
 
 
@@ -108,6 +115,8 @@ def generate_fake_data() -> None:
         logger.info("Создание администратора")
         create_administrator()
 
+    logger.info("Пересчёт статистики отчётов по заданиям...")
+    asyncio.run(rebuild_task_report_stats())
     logger.info("Создание тестовых данных завершено!")
 
 
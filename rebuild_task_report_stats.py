@@ -0,0 +1,14 @@
+import asyncio
+
+from src.core.db.db import session_scope
+from src.core.db.repository import TaskReportStatsRepository
+
+
+async def rebuild_task_report_stats() -> None:
+    """Пересчитывает статистику отчётов по заданиям с нуля по всем отчётам."""
+    async with session_scope() as session:
+        await TaskReportStatsRepository(session).rebuild()
+
+
+if __name__ == '__main__':
+    asyncio.run(rebuild_task_report_stats())
@@ -0,0 +1,6 @@
+from src.api.request_models.request_base import RequestBase
+from src.core.db.models import AnalyticsExport
+
+
+class AnalyticsExportCreateRequest(RequestBase):
+    report_type: AnalyticsExport.ReportType
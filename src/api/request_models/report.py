@@ -1,11 +1,34 @@
+import enum
 from typing import Optional
 
-from pydantic import Field, validator
+from pydantic import Field, conlist, validator
+from pydantic.schema import UUID
 
 from src.api.request_models.request_base import RequestBase
 from src.core.db.models import Report
 
 
+class ReportSummaryFieldRequest(str, enum.Enum):
+    """Поля списка отчетов, которые можно запросить."""
+
+    SHIFT_ID = "shift_id"
+    SHIFT_STATUS = "shift_status"
+    SHIFT_STARTED_AT = "shift_started_at"
+    REPORT_ID = "report_id"
+    REPORT_STATUS = "report_status"
+    REPORT_CREATED_AT = "report_created_at"
+    REPORT_UPLOADED_AT = "report_uploaded_at"
+    UPDATED_BY = "updated_by"
+    REPORT_REVIEWED_AT = "report_reviewed_at"
+    USER_NAME = "user_name"
+    USER_SURNAME = "user_surname"
+    TASK_ID = "task_id"
+    TASK_TITLE = "task_title"
+    TASK_URL = "task_url"
+    PHOTO_URL = "photo_url"
+    THUMBNAIL_URL = "thumbnail_url"
+
+
 class ChangeStatusRequest(RequestBase):
     """Модель изменения статуса."""
 
@@ -18,6 +41,24 @@ class ChangeStatusRequest(RequestBase):
         return value
 
 
+class ReportReviewRequest(ChangeStatusRequest):
+    """Модель решения по одному отчету при массовой проверке."""
+
+    report_id: UUID
+
+
+class ReportsBulkReviewRequest(RequestBase):
+    """Модель массовой проверки отчетов."""
+
+    reports: conlist(ReportReviewRequest, min_items=1, max_items=500)
+
+    @validator("reports")
+    def validate_reports_unique(cls, value: list[ReportReviewRequest]) -> list[ReportReviewRequest]:
+        if len({report.report_id for report in value}) != len(value):
+            raise ValueError("Отчеты в списке не должны повторяться")
+        return value
+
+
 class ReportUpdateRequest(RequestBase):
     status: Optional[Report.Status]
     report_url: Optional[str]
@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+from pydantic.schema import UUID
+
+from src.core.db.models import AnalyticsExport
+
+
+class AnalyticsExportResponse(BaseModel):
+    """Задача на формирование отчёта в фоне."""
+
+    id: UUID
+    report_type: AnalyticsExport.ReportType
+    status: AnalyticsExport.Status
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    error: Optional[str]
+
+    class Config:
+        orm_mode = True
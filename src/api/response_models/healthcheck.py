@@ -12,6 +12,48 @@ class ComponentItemHealthcheck(BaseModel):
     errors: Optional[list[str]] = []
 
 
+class CacheStatusResponse(BaseModel):
+    """Model for displaying in-process cache statistics."""
+
+    size: int
+    hits: int
+    misses: int
+
+
+class AuthenticationCacheStatusResponse(BaseModel):
+    """Model for displaying authentication cache statistics of the current worker process."""
+
+    pid: int
+    administrators: CacheStatusResponse
+    tokens: CacheStatusResponse
+
+
+class BotUpdatesStatusResponse(BaseModel):
+    """Model for displaying bot update processing statistics of the current worker process."""
+
+    pid: int
+    queued: int
+    waiting: int
+    processing: int
+    processed: int
+    concurrency_limit: int
+    latency_avg_ms: Optional[float]
+    latency_p95_ms: Optional[float]
+    latency_max_ms: Optional[float]
+
+
+class DatabasePoolStatusResponse(BaseModel):
+    """Model for displaying database connection pool statistics of the current worker process."""
+
+    pid: int
+    pool_size: int
+    max_overflow: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    long_checkouts: list[float]
+
+
 class HealthcheckResponse(BaseModel):
     """Model for displaying statuses from /healthcheck."""
 
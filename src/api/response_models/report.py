@@ -43,6 +43,7 @@ class ReportSummaryResponse(BaseModel):
     task_title: str
     task_url: str
     photo_url: Optional[str]
+    thumbnail_url: Optional[str]
 
     class Config:
         orm_mode = True
@@ -0,0 +1,28 @@
+import json
+from typing import Any, AsyncIterator, Mapping, Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def generate_ndjson_response(
+    items: AsyncIterator[Mapping[str, Any]],
+    response_model: Optional[type[BaseModel]] = None,
+    exclude_none: bool = False,
+) -> StreamingResponse:
+    """Создает потоковый ответ в формате NDJSON: по одному JSON-объекту на строку.
+
+    Каждый объект сериализуется сразу после получения из базы, через response_model, если она передана.
+    """
+
+    async def serialize() -> AsyncIterator[str]:
+        async for item in items:
+            if response_model:
+                yield response_model.parse_obj(item).json(exclude_none=exclude_none, ensure_ascii=False) + "\n"
+            else:
+                yield json.dumps(jsonable_encoder(item, exclude_none=exclude_none), ensure_ascii=False) + "\n"
+
+    return StreamingResponse(serialize(), media_type=NDJSON_MEDIA_TYPE)
@@ -2,7 +2,7 @@ from http import HTTPStatus
 from typing import Any
 from uuid import UUID
 
-from fastapi import APIRouter, Cookie, Depends, Response
+from fastapi import APIRouter, Cookie, Depends, Request, Response
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from fastapi_restful.cbv import cbv
 
@@ -37,20 +37,25 @@ class AdministratorCBV:
         status_code=HTTPStatus.OK,
         summary="Аутентификация",
         response_description="Access-токен и информация о пользователе.",
-        responses=generate_error_responses(HTTPStatus.BAD_REQUEST, HTTPStatus.FORBIDDEN),
+        responses=generate_error_responses(HTTPStatus.BAD_REQUEST, HTTPStatus.FORBIDDEN, HTTPStatus.TOO_MANY_REQUESTS),
     )
     async def login(
-        self, response: Response, auth_data: AdministratorAuthenticateRequest
+        self, request: Request, response: Response, auth_data: AdministratorAuthenticateRequest
     ) -> AdministratorAndAccessTokenResponse:
         """Аутентифицировать администратора по email и паролю. Вернуть access-токен и информацию об администраторе.
 
         - **email**: электронная почта
         - **password**: пароль
         """
-        admin_and_token = await self.authentication_service.login(auth_data)
+        # в docker-окружении запросы приходят через nginx, который передаёт адрес клиента в X-Real-IP
+        client_ip = request.headers.get("X-Real-IP") or (request.client.host if request.client else None)
+        admin_and_token = await self.authentication_service.login(auth_data, client_ip)
         response.set_cookie(key="refresh_token", value=admin_and_token.refresh_token, httponly=True, samesite="strict")
-        admin_and_token.administrator.access_token = admin_and_token.access_token
-        return admin_and_token.administrator
+        # администратор может быть общим объектом из кэша процесса, поэтому токен в него не записывается
+        return AdministratorAndAccessTokenResponse(
+            **AdministratorResponse.from_orm(admin_and_token.administrator).dict(),
+            access_token=admin_and_token.access_token,
+        )
 
     @router.get(
         "/refresh",
@@ -75,8 +80,10 @@ class AdministratorCBV:
             raise UnauthorizedError
         admin_and_token = await self.authentication_service.refresh(refresh_token)
         response.set_cookie(key="refresh_token", value=admin_and_token.refresh_token, httponly=True, samesite="strict")
-        admin_and_token.administrator.access_token = admin_and_token.access_token
-        return admin_and_token.administrator
+        return AdministratorAndAccessTokenResponse(
+            **AdministratorResponse.from_orm(admin_and_token.administrator).dict(),
+            access_token=admin_and_token.access_token,
+        )
 
     @router.get(
         "/me",
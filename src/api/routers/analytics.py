@@ -1,19 +1,39 @@
 from datetime import datetime
 from http import HTTPStatus
+from typing import Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Response
 from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from fastapi_restful.cbv import cbv
+from pydantic.schema import UUID
 
+from src.api.request_models.analytics import AnalyticsExportCreateRequest
+from src.api.response_models.analytics import AnalyticsExportResponse
+from src.api.response_models.error import generate_error_responses
+from src.core.db.models import AnalyticsExport
 from src.core.services.analytics_service import AnalyticsService
+from src.core.services.authentication_service import AuthenticationService
 
 router = APIRouter(prefix="/analytics", tags=["Analytics"])
 
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+# браузер хранит отчёт, но перед использованием проверяет его актуальность по ETag
+CACHE_CONTROL = "private, no-cache"
+
+
+def is_not_modified(if_none_match: Optional[str], etag: str) -> bool:
+    """Проверяет, совпадает ли версия отчёта у клиента из заголовка If-None-Match с текущей."""
+    if not if_none_match:
+        return False
+    client_etags = {client_etag.strip().removeprefix("W/") for client_etag in if_none_match.split(",")}
+    return "*" in client_etags or etag in client_etags
+
 
 @cbv(router)
 class AnalyticsCBV:
     _analytics_service: AnalyticsService = Depends()
+    _authentication_service: AuthenticationService = Depends()
     _token: HTTPAuthorizationCredentials = Depends(HTTPBearer())
 
     @router.get(
@@ -25,12 +45,21 @@ class AnalyticsCBV:
     )
     async def generate_full_report(
         self,
-    ) -> StreamingResponse:
-        """Формирует excel файл со всеми отчётами."""
+        if_none_match: Optional[str] = Header(default=None),
+    ) -> Response:
+        """Формирует excel файл со всеми отчётами.
+
+        Если данные не изменились с момента предыдущего запроса с тем же ETag, возвращает 304.
+        """
+        version = await self._analytics_service.get_report_version(AnalyticsService.ReportType.FULL)
+        etag = f'"{version}"'
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        if is_not_modified(if_none_match, etag):
+            return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=headers)
         filename = f"full_report_{datetime.now()}.xlsx"
-        headers = {'Content-Disposition': f'attachment; filename={filename}'}
-        workbook = await self._analytics_service.generate_full_report()
-        return StreamingResponse(workbook, headers=headers)
+        headers['Content-Disposition'] = f'attachment; filename={filename}'
+        report = await self._analytics_service.generate_full_report(version)
+        return StreamingResponse(report, headers=headers, media_type=XLSX_MEDIA_TYPE)
 
     @router.get(
         "/tasks",
@@ -39,15 +68,66 @@ class AnalyticsCBV:
         status_code=HTTPStatus.OK,
         summary="Формирование отчёта c задачами",
     )
-    async def generate_task_report(self) -> StreamingResponse:
+    async def generate_task_report(
+        self,
+        if_none_match: Optional[str] = Header(default=None),
+    ) -> Response:
         """
         Формирует отчёт с общей статистикой выполнения задач во всех сменах.
 
         Содержит:
         - cписок всех заданий;
         - общее количество принятых/отклонённых/не предоставленных отчётов по каждому заданию.
+
+        Если данные не изменились с момента предыдущего запроса с тем же ETag, возвращает 304.
         """
+        version = await self._analytics_service.get_report_version(AnalyticsService.ReportType.TASKS)
+        etag = f'"{version}"'
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        if is_not_modified(if_none_match, etag):
+            return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=headers)
         filename = f"tasks_report_{datetime.now()}.xlsx"
+        headers['Content-Disposition'] = f'attachment; filename={filename}'
+        report = await self._analytics_service.generate_task_report(version)
+        return StreamingResponse(report, headers=headers, media_type=XLSX_MEDIA_TYPE)
+
+    @router.post(
+        "/exports",
+        response_model=AnalyticsExportResponse,
+        status_code=HTTPStatus.ACCEPTED,
+        summary="Создать задачу на формирование отчёта в фоне",
+        responses=generate_error_responses(HTTPStatus.UNAUTHORIZED),
+    )
+    async def create_export(self, export_data: AnalyticsExportCreateRequest) -> AnalyticsExportResponse:
+        """
+        Создаёт задачу на формирование excel файла в фоне и возвращает её.
+
+        - **report_type**: тип отчёта: full - полный отчёт, tasks - отчёт с задачами
+
+        Статус задачи и готовый файл можно получить по id задачи.
+        """
+        administrator = await self._authentication_service.get_current_active_administrator(self._token.credentials)
+        return await self._analytics_service.create_export(export_data.report_type, administrator.id)
+
+    @router.get(
+        "/exports/{export_id}",
+        response_model=AnalyticsExportResponse,
+        status_code=HTTPStatus.OK,
+        summary="Получить статус задачи на формирование отчёта или готовый отчёт",
+        responses=generate_error_responses(HTTPStatus.UNAUTHORIZED, HTTPStatus.NOT_FOUND),
+    )
+    async def get_export(self, export_id: UUID) -> AnalyticsExportResponse | StreamingResponse:
+        """
+        Возвращает excel файл, если отчёт сформирован, иначе - задачу с текущим статусом.
+
+        - **status**: pending - ожидает формирования, in_progress - формируется,
+        done - сформирован, failed - не удалось сформировать (причина в поле error)
+        """
+        await self._authentication_service.get_current_active_administrator(self._token.credentials)
+        export = await self._analytics_service.get_export(export_id)
+        if export.status is not AnalyticsExport.Status.DONE:
+            return export
+        filename = f"{export.report_type.value}_report_{export.finished_at}.xlsx"
         headers = {'Content-Disposition': f'attachment; filename={filename}'}
-        workbook = await self._analytics_service.generate_task_report()
-        return StreamingResponse(workbook, headers=headers)
+        report = self._analytics_service.get_export_file(export)
+        return StreamingResponse(report, headers=headers, media_type=XLSX_MEDIA_TYPE)
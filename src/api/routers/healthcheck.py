@@ -2,9 +2,16 @@ from http import HTTPStatus
 
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.encoders import jsonable_encoder
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from fastapi_restful.cbv import cbv
 
-from src.api.response_models.healthcheck import HealthcheckResponse
+from src.api.response_models.healthcheck import (
+    AuthenticationCacheStatusResponse,
+    BotUpdatesStatusResponse,
+    DatabasePoolStatusResponse,
+    HealthcheckResponse,
+)
+from src.core.services.authentication_service import AuthenticationService
 from src.core.services.healthcheck_service import HealthcheckService
 
 router = APIRouter()
@@ -29,3 +36,82 @@ class HealthcheckCBV:
                 raise HTTPException(
                     status_code=HTTPStatus.BAD_REQUEST, detail=jsonable_encoder(result))
         return result
+
+    @router.get(
+        "/healthcheck/db_pool",
+        response_model=DatabasePoolStatusResponse,
+        summary="Получить статистику пула соединений с БД.",
+        response_description="Статистика пула соединений процесса, обработавшего запрос.",
+    )
+    async def get_db_pool_status(
+        self,
+        authentication_service: AuthenticationService = Depends(),
+        token: HTTPAuthorizationCredentials = Depends(HTTPBearer()),
+    ) -> DatabasePoolStatusResponse:
+        """
+        Возвращает статистику пула соединений с БД.
+
+        Каждый процесс uvicorn имеет собственный пул, поэтому данные относятся к процессу **pid**.
+
+        - **pool_size**: количество постоянных соединений в пуле
+        - **max_overflow**: максимальное количество соединений сверх pool_size
+        - **checked_in**: количество свободных соединений в пуле
+        - **checked_out**: количество выданных соединений
+        - **overflow**: количество открытых соединений сверх pool_size
+        - **long_checkouts**: время (в секундах) удержания соединений, выданных дольше DB_SESSION_LEAK_THRESHOLD секунд,
+          в том числе так и не возвращенных в пул (возможные утечки сессий)
+        """
+        await authentication_service.get_current_active_administrator(token.credentials)
+        return await self.healthcheck_service.get_db_pool_status()
+
+    @router.get(
+        "/healthcheck/auth_cache",
+        response_model=AuthenticationCacheStatusResponse,
+        summary="Получить статистику кэшей аутентификации.",
+        response_description="Статистика кэшей процесса, обработавшего запрос.",
+    )
+    async def get_authentication_cache_status(
+        self,
+        authentication_service: AuthenticationService = Depends(),
+        token: HTTPAuthorizationCredentials = Depends(HTTPBearer()),
+    ) -> AuthenticationCacheStatusResponse:
+        """
+        Возвращает статистику кэшей администраторов и проверенных токенов.
+
+        Каждый процесс uvicorn имеет собственные кэши, поэтому данные относятся к процессу **pid**.
+
+        - **size**: количество записей в кэше
+        - **hits**: количество обращений, для которых запись нашлась в кэше
+        - **misses**: количество обращений, для которых запись пришлось получать заново
+        """
+        await authentication_service.get_current_active_administrator(token.credentials)
+        return await self.healthcheck_service.get_authentication_cache_status()
+
+    @router.get(
+        "/healthcheck/bot_updates",
+        response_model=BotUpdatesStatusResponse,
+        summary="Получить статистику обработки обновлений бота.",
+        response_description="Статистика обработки обновлений процесса, обработавшего запрос.",
+    )
+    async def get_bot_updates_status(
+        self,
+        request: Request,
+        authentication_service: AuthenticationService = Depends(),
+        token: HTTPAuthorizationCredentials = Depends(HTTPBearer()),
+    ) -> BotUpdatesStatusResponse:
+        """
+        Возвращает статистику очереди и времени обработки обновлений бота.
+
+        Данные относятся к процессу **pid**.
+
+        - **queued**: количество обновлений в очереди бота, ещё не взятых в обработку
+        - **waiting**: количество обновлений, ожидающих свободного обработчика
+          или обработки предыдущего обновления чата
+        - **processing**: количество обновлений, обрабатываемых в данный момент
+        - **processed**: количество обработанных обновлений с момента запуска
+        - **concurrency_limit**: максимальное количество одновременно обрабатываемых обновлений
+        - **latency_avg_ms**, **latency_p95_ms**, **latency_max_ms**: время обработки последних обновлений
+          в миллисекундах
+        """
+        await authentication_service.get_current_active_administrator(token.credentials)
+        return await self.healthcheck_service.get_bot_updates_status(request.app.state.bot_instance)
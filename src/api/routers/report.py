@@ -1,13 +1,20 @@
 from http import HTTPStatus
-from typing import Any
+from typing import Any, Optional
 
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from fastapi_restful.cbv import cbv
 from pydantic.schema import UUID
 
+from src.api.request_models.report import (
+    ReportsBulkReviewRequest,
+    ReportSummaryFieldRequest,
+)
 from src.api.response_models.error import generate_error_responses
 from src.api.response_models.report import ReportResponse, ReportSummaryResponse
+from src.api.response_models.streaming import generate_ndjson_response
 from src.core.db.models import Report
 from src.core.services.authentication_service import AuthenticationService
 from src.core.services.report_service import ReportService
@@ -15,6 +22,8 @@ from src.core.services.shift_service import ShiftService
 
 router = APIRouter(prefix="/reports", tags=["Report"])
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
 
 @cbv(router)
 class ReportsCBV:
@@ -81,26 +90,78 @@ class ReportsCBV:
         administrator = await self.authentication_service.get_current_active_administrator(self.token.credentials)
         return await self.report_service.decline_report(report_id, administrator.id, request.app.state.bot_instance)
 
+    @router.post(
+        "/bulk_review",
+        status_code=HTTPStatus.OK,
+        summary="Принять или отклонить несколько заданий.",
+        response_model=list[ReportResponse],
+        responses=generate_error_responses(HTTPStatus.NOT_FOUND, HTTPStatus.BAD_REQUEST),
+    )
+    async def bulk_review_reports(
+        self,
+        bulk_review: ReportsBulkReviewRequest,
+        request: Request,
+    ) -> list[ReportResponse]:
+        """
+        Проверка нескольких отчетов участников одним запросом.
+
+        Если хотя бы один отчет не найден или не может быть проверен, не изменяется ни один отчет.
+
+        - **reports**: список решений по отчетам
+        - **report_id**: id отчета
+        - **status**: решение по отчету (approved или declined)
+        """
+        administrator = await self.authentication_service.get_current_active_administrator(self.token.credentials)
+        return await self.report_service.review_reports(
+            bulk_review.reports, administrator.id, request.app.state.bot_instance
+        )
+
     @router.get(
         "/",
         response_model=list[ReportSummaryResponse],
         summary="Получения списка заданий пользователя по полям status и shift_id.",
-        responses=generate_error_responses(HTTPStatus.NOT_FOUND),
+        responses=generate_error_responses(HTTPStatus.BAD_REQUEST, HTTPStatus.NOT_FOUND),
     )
     async def get_report_summary(
         self,
+        response: Response,
         shift_id: UUID,
         status: Report.Status = None,
+        limit: Optional[int] = Query(default=None, ge=1, le=1000),
+        cursor: Optional[UUID] = None,
+        fields: Optional[list[ReportSummaryFieldRequest]] = Query(default=None),
+        stream: bool = Query(default=False),
     ) -> Any:
         """
         Получения списка задач на проверку с возможностью фильтрации по полям status и shift_id.
 
-        Список формируется по убыванию поля started_at.
+        Список формируется по убыванию даты задания и id отчета.
 
         В запросе передаётся:
 
         - **shift_id**: уникальный id смены, ожидается в формате UUID.uuid4
         - **report.status**: статус задачи
+        - **limit**: количество отчетов на странице, без него возвращаются все отчеты
+        - **cursor**: значение заголовка X-Next-Cursor из ответа на запрос предыдущей страницы
+          (неизвестный курсор или курсор другой смены приводят к ошибке)
+        - **fields**: поля отчета, которые нужно вернуть (можно указать несколько раз), по умолчанию все
+        - **stream**: отдавать все отчеты смены потоком в формате NDJSON (по одному объекту на строку)
+          (limit и cursor при этом не учитываются)
+
+        Если есть следующая страница, в ответе передается заголовок **X-Next-Cursor**.
         """
         await self.authentication_service.get_current_active_administrator(self.token.credentials)
-        return await self.report_service.get_summaries_of_reports(shift_id, status)
+        fields = [field.value for field in fields] if fields else None
+        if stream:
+            return generate_ndjson_response(
+                await self.report_service.stream_summaries_of_reports(shift_id, status, fields),
+                None if fields else ReportSummaryResponse,
+            )
+        reports, next_cursor = await self.report_service.get_summaries_of_reports(
+            shift_id, status, fields, limit, cursor
+        )
+        headers = {NEXT_CURSOR_HEADER: str(next_cursor)} if next_cursor else {}
+        if fields:
+            return JSONResponse(content=jsonable_encoder(reports), headers=headers)
+        response.headers.update(headers)
+        return reports
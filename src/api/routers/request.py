@@ -1,7 +1,7 @@
 from http import HTTPStatus
 from typing import Optional
 
-from fastapi import APIRouter, Body, Depends, Request
+from fastapi import APIRouter, Body, Depends, Query, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from fastapi_restful.cbv import cbv
 from pydantic.schema import UUID
@@ -9,6 +9,7 @@ from pydantic.schema import UUID
 from src.api.request_models.request import RequestDeclineRequest
 from src.api.response_models.error import generate_error_responses
 from src.api.response_models.request import RequestResponse
+from src.api.response_models.streaming import generate_ndjson_response
 from src.core.db import DTO_models, models
 from src.core.services.authentication_service import AuthenticationService
 from src.core.services.request_service import RequestService
@@ -64,7 +65,11 @@ class RequestCBV:
         summary="Получить список заявок на участие.",
         response_description="Список заявок участников с фильтрацией по статусу заявки.",
     )
-    async def get_requests_list(self, status: Optional[models.Request.Status] = None) -> list[DTO_models.RequestDTO]:
+    async def get_requests_list(
+        self,
+        status: Optional[models.Request.Status] = None,
+        stream: bool = Query(default=False),
+    ) -> list[DTO_models.RequestDTO]:
         """Получить список заявок с фильтрацией по статусу заявки.
 
         - **request_id**: id заявки
@@ -76,6 +81,10 @@ class RequestCBV:
         - **phone_number**: номер телефона участника
         - **request_status**: статус заявки
         - **user_status**: статус участника
+
+        - **stream**: отдавать список потоком в формате NDJSON (по одному объекту на строку)
         """
         await self.authentication_service.get_current_active_administrator(self.token.credentials)
+        if stream:
+            return generate_ndjson_response(self.request_service.stream_requests_list(status), RequestResponse)
         return await self.request_service.get_requests_list(status)
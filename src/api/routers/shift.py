@@ -20,6 +20,7 @@ from src.api.response_models.shift import (
     ShiftResponse,
     ShiftWithTotalUsersResponse,
 )
+from src.api.response_models.streaming import generate_ndjson_response
 from src.core.db.models import Member, Request, Shift
 from src.core.services.authentication_service import AuthenticationService
 from src.core.services.shift_service import ShiftService
@@ -158,6 +159,7 @@ class ShiftCBV:
         self,
         shift_id: UUID,
         status: Optional[Request.Status] = None,
+        stream: bool = Query(default=False),
     ) -> Any:
         """
         Получить сведения обо всех заявках смены.
@@ -173,8 +175,16 @@ class ShiftCBV:
         - **phone**: Телефон пользователя
         - **request_id**: Номер заявки
         - **status**: Статус заявки
+
+        - **stream**: Отдавать список потоком в формате NDJSON (по одному объекту на строку)
         """
         await self.authentication_service.get_current_active_administrator(self.token.credentials)
+        if stream:
+            return generate_ndjson_response(
+                await self.shift_service.stream_all_requests(_id=shift_id, status=status),
+                ShiftDtoResponse,
+                exclude_none=True,
+            )
         return await self.shift_service.list_all_requests(_id=shift_id, status=status)
 
     @router.get(
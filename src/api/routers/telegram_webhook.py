@@ -1,6 +1,6 @@
 from typing import Iterator
 
-from fastapi import APIRouter, Request, status
+from fastapi import APIRouter, Request, Response, status
 from fastapi.responses import StreamingResponse
 from telegram import Update
 
@@ -48,15 +48,19 @@ if settings.BOT_WEBHOOK_MODE:
 
     @router.post(
         "/webhook",
+        response_class=Response,
         summary="Получить обновления telegram",
         response_description="Обновления получены",
     )
-    async def get_telegram_bot_updates(request: Request) -> dict:
-        """Получение обновлений telegram в режиме работы бота webhook."""
+    async def get_telegram_bot_updates(request: Request) -> Response:
+        """Получение обновлений telegram в режиме работы бота webhook.
+
+        Обновление только ставится в очередь бота, ответ отправляется, не дожидаясь его обработки.
+        """
         secret_token = request.headers.get('X-Telegram-Bot-Api-Secret-Token')
         if secret_token != settings.SECRET_KEY:
             raise UnauthorizedError
         bot_instance = request.app.state.bot_instance
         request_json_data = await request.json()
         await bot_instance.update_queue.put(Update.de_json(data=request_json_data, bot=bot_instance.bot))
-        return request_json_data
+        return Response(status_code=status.HTTP_200_OK)
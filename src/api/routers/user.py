@@ -2,12 +2,13 @@ from http import HTTPStatus
 from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from fastapi_restful.cbv import cbv
 
 from src.api.request_models.user import UserDescAscSortRequest, UserFieldSortRequest
 from src.api.response_models.error import generate_error_responses
+from src.api.response_models.streaming import generate_ndjson_response
 from src.api.response_models.user import UserDetailResponse, UserWithStatusResponse
 from src.core.db.models import User
 from src.core.services.authentication_service import AuthenticationService
@@ -35,6 +36,7 @@ class UserCBV:
         status: Optional[User.Status] = None,
         field_sort: Optional[UserFieldSortRequest] = None,
         direction_sort: Optional[UserDescAscSortRequest] = None,
+        stream: bool = Query(default=False),
     ) -> list[UserWithStatusResponse]:
         """
         Получить список пользователей с фильтрацией по статусу.
@@ -48,8 +50,16 @@ class UserCBV:
         - **status**: статус пользователя
         - **shifts_count**: количество пройденных пользователем смен
         - **is_in_active_shift**: флаг, является ли пользователь участником текущей активной смены
+
+        - **stream**: отдавать список потоком в формате NDJSON (по одному объекту на строку)
         """
         await self.authentication_service.get_current_active_administrator(self.token.credentials)
+        if stream:
+            return generate_ndjson_response(
+                self.user_service.stream_all_users(status, field_sort, direction_sort),
+                UserWithStatusResponse,
+                exclude_none=True,
+            )
         return await self.user_service.list_all_users(status, field_sort, direction_sort)
 
     @router.get(
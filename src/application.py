@@ -5,6 +5,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
 from src.api import routers
+from src.api.routers.report import NEXT_CURSOR_HEADER
 from src.bot.main import start_bot
 from src.core import exceptions
 from src.core.exception_handlers import (
@@ -29,6 +30,7 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
     )
 
     app.include_router(routers.report_router)
@@ -1,60 +1,93 @@
-from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.db.repository import (
+    AnalyticsExportRepository,
     MemberRepository,
+    OutboxRepository,
     ReportRepository,
     RequestRepository,
     ShiftRepository,
+    TaskReportStatsRepository,
     TaskRepository,
     UserRepository,
 )
+from src.core.services.analytics_service import AnalyticsService
 from src.core.services.member_service import MemberService
+from src.core.services.outbox_service import OutboxService
 from src.core.services.report_service import ReportService
 from src.core.services.shift_service import ShiftService
 from src.core.services.task_service import TaskService
 from src.core.services.user_service import UserService
+from src.excel_generator.builder import AnalyticReportBuilder
+from src.excel_generator.cache import AnalyticReportCache
 
 
-async def get_user_service_callback(sessions) -> Optional[UserService]:
-    async for session in sessions:  # noqa R503
-        task_repository = TaskRepository(session)
-        shift_repository = ShiftRepository(session)
-        task_service = TaskService(task_repository)
-        request_repository = RequestRepository(session)
-        user_repository = UserRepository(session)
-        shift_service = ShiftService(shift_repository, task_service)
-        user_service = UserService(user_repository, request_repository, shift_service)
-        return user_service
-
-
-async def get_report_service_callback(sessions):
-    async for session in sessions:  # noqa R503
-        shift_repository = ShiftRepository(session)
-        task_repository = TaskRepository(session)
-        report_repository = ReportRepository(session)
-        member_repository = MemberRepository(session)
-        task_service = TaskService(task_repository)
-        report_service = ReportService(report_repository, shift_repository, member_repository, task_service)
-        return report_service
-
-
-async def get_member_service_callback(sessions):
-    async for session in sessions:  # noqa R503
-        member_repository = MemberRepository(session)
-        shift_repository = ShiftRepository(session)
-        member_service = MemberService(member_repository, shift_repository)
-        return member_service
-
-
-async def get_shift_service_callback(sessions):
-    async for session in sessions:  # noqa R503
-        task_repository = TaskRepository(session)
-        shift_repository = ShiftRepository(session)
-        report_repository = ReportRepository(session)
-        user_repository = UserRepository(session)
-        request_repository = RequestRepository(session)
-        task_service = TaskService(task_repository)
-        shift_service = ShiftService(
-            shift_repository, task_service, report_repository, user_repository, request_repository
-        )
-        return shift_service
+def get_user_service_callback(session: AsyncSession) -> UserService:
+    task_repository = TaskRepository(session)
+    shift_repository = ShiftRepository(session)
+    task_service = TaskService(task_repository)
+    request_repository = RequestRepository(session)
+    user_repository = UserRepository(session)
+    shift_service = ShiftService(shift_repository, task_service)
+    user_service = UserService(user_repository, request_repository, shift_service)
+    return user_service
+
+
+def get_report_service_callback(session: AsyncSession) -> ReportService:
+    shift_repository = ShiftRepository(session)
+    task_repository = TaskRepository(session)
+    report_repository = ReportRepository(session)
+    member_repository = MemberRepository(session)
+    task_report_stats_repository = TaskReportStatsRepository(session)
+    task_service = TaskService(task_repository)
+    report_service = ReportService(
+        report_repository, shift_repository, member_repository, task_service, task_report_stats_repository
+    )
+    return report_service
+
+
+def get_member_service_callback(session: AsyncSession) -> MemberService:
+    member_repository = MemberRepository(session)
+    shift_repository = ShiftRepository(session)
+    member_service = MemberService(member_repository, shift_repository)
+    return member_service
+
+
+def get_task_service_callback(session: AsyncSession) -> TaskService:
+    task_repository = TaskRepository(session)
+    task_service = TaskService(task_repository)
+    return task_service
+
+
+def get_outbox_service_callback(session: AsyncSession) -> OutboxService:
+    outbox_repository = OutboxRepository(session)
+    outbox_service = OutboxService(outbox_repository)
+    return outbox_service
+
+
+def get_shift_service_callback(session: AsyncSession) -> ShiftService:
+    task_repository = TaskRepository(session)
+    shift_repository = ShiftRepository(session)
+    report_repository = ReportRepository(session)
+    user_repository = UserRepository(session)
+    request_repository = RequestRepository(session)
+    task_report_stats_repository = TaskReportStatsRepository(session)
+    task_service = TaskService(task_repository)
+    shift_service = ShiftService(
+        shift_repository,
+        task_service,
+        report_repository,
+        user_repository,
+        request_repository,
+        task_report_stats_repository,
+    )
+    return shift_service
+
+
+def get_analytics_service_callback(session: AsyncSession) -> AnalyticsService:
+    task_repository = TaskRepository(session)
+    analytics_export_repository = AnalyticsExportRepository(session)
+    analytics_service = AnalyticsService(
+        task_repository, AnalyticReportBuilder(), AnalyticReportCache(), analytics_export_repository
+    )
+    return analytics_service
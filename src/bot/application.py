@@ -0,0 +1,79 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Optional
+
+from telegram import Update
+from telegram.ext import Application
+
+from src.core.settings import settings
+
+# количество последних обработанных обновлений, по которым считается время обработки
+HANDLER_LATENCY_SAMPLES = 1000
+
+
+class ChatOrderedApplication(Application):
+    """Приложение бота, которое обрабатывает обновления разных чатов параллельно.
+
+    Одновременно работает не больше BOT_CONCURRENT_UPDATES обработчиков, а обновления
+    одного чата обрабатываются строго в порядке поступления: следующее обновление чата
+    ждёт завершения предыдущего, не занимая места среди работающих обработчиков.
+    Дополнительно собирается статистика очереди и времени обработки обновлений.
+    """
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.__handlers_semaphore = asyncio.Semaphore(settings.BOT_CONCURRENT_UPDATES)
+        # идентификатор чата -> блокировка чата и количество обновлений, которые её используют
+        self.__chat_locks: dict[int, tuple[asyncio.Lock, int]] = {}
+        self.waiting_updates = 0
+        self.processing_updates = 0
+        self.processed_updates = 0
+        self.handler_latencies: deque[float] = deque(maxlen=HANDLER_LATENCY_SAMPLES)
+
+    @staticmethod
+    def __get_chat_id(update: object) -> Optional[int]:
+        """Идентификатор чата, в пределах которого нужно сохранить порядок обработки обновлений."""
+        if not isinstance(update, Update):
+            return None
+        if update.effective_chat:
+            return update.effective_chat.id
+        if update.effective_user:
+            return update.effective_user.id
+        return None
+
+    def __acquire_chat_lock(self, chat_id: int) -> asyncio.Lock:
+        lock, users = self.__chat_locks.get(chat_id, (asyncio.Lock(), 0))
+        self.__chat_locks[chat_id] = (lock, users + 1)
+        return lock
+
+    def __release_chat_lock(self, chat_id: int) -> None:
+        lock, users = self.__chat_locks[chat_id]
+        if users == 1:
+            del self.__chat_locks[chat_id]
+        else:
+            self.__chat_locks[chat_id] = (lock, users - 1)
+
+    async def process_update(self, update: object) -> None:
+        chat_id = self.__get_chat_id(update)
+        self.waiting_updates += 1
+        if chat_id is None:
+            await self.__process_update_with_limit(update)
+            return
+        try:
+            async with self.__acquire_chat_lock(chat_id):
+                await self.__process_update_with_limit(update)
+        finally:
+            self.__release_chat_lock(chat_id)
+
+    async def __process_update_with_limit(self, update: object) -> None:
+        async with self.__handlers_semaphore:
+            self.waiting_updates -= 1
+            self.processing_updates += 1
+            started_at = time.perf_counter()
+            try:
+                await super().process_update(update)
+            finally:
+                self.handler_latencies.append(time.perf_counter() - started_at)
+                self.processing_updates -= 1
+                self.processed_updates += 1
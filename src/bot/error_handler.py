@@ -2,7 +2,7 @@ import logging
 
 from telegram.error import BadRequest, Forbidden, TelegramError
 
-from src.core.db.db import get_session
+from src.core.db.db import session_scope
 from src.core.db.models import User
 from src.core.db.repository import RequestRepository, UserRepository
 from src.core.services.user_service import UserService
@@ -16,10 +16,9 @@ ERRORS_TO_HANDLE = {
 async def error_handler(user: User, error: TelegramError) -> None:
     error_type = type(error)
     if error_type in ERRORS_TO_HANDLE and error.message in ERRORS_TO_HANDLE[error_type]:
-        session_gen = get_session()
-        session = await session_gen.asend(None)
-        user_service = UserService(UserRepository(session), RequestRepository(session))
-        await user_service.set_telegram_blocked(user)
+        async with session_scope() as session:
+            user_service = UserService(UserRepository(session), RequestRepository(session))
+            await user_service.set_telegram_blocked(user)
         logging.warning(f"Произведена блокировка пользователя: {user}. Причина блокировки: {error.message} ")
     else:
         raise error
@@ -1,7 +1,6 @@
 import json
 import urllib
-from pathlib import Path
-from urllib.parse import urljoin
+from uuid import UUID
 
 from pydantic import ValidationError
 from telegram import (
@@ -14,7 +13,7 @@ from telegram import (
 from telegram.ext import CallbackContext
 
 from src.api.request_models.user import UserCreateRequest, UserWebhookTelegram
-from src.bot.api_services import get_user_service_callback
+from src.bot.api_services import get_report_service_callback, get_user_service_callback
 from src.bot.ui import (
     CONFIRM_SKIP_TASK,
     CONFIRM_SKIP_TASK_KEYBOARD,
@@ -22,19 +21,16 @@ from src.bot.ui import (
     SKIP_A_TASK,
 )
 from src.core import exceptions
-from src.core.db.db import get_session
+from src.core.db.db import session_scope
 from src.core.db.repository import (
     MemberRepository,
-    ReportRepository,
     RequestRepository,
     ShiftRepository,
-    TaskRepository,
     UserRepository,
 )
+from src.core.photo_storage import PhotoStorage
 from src.core.services.member_service import MemberService
-from src.core.services.report_service import ReportService
 from src.core.services.shift_service import ShiftService
-from src.core.services.task_service import TaskService
 from src.core.services.user_service import UserService
 from src.core.settings import settings
 from src.core.utils import get_lombaryers_for_quantity
@@ -49,25 +45,26 @@ async def start(update: Update, context: CallbackContext) -> None:
         "Каждый месяц мы будем подводить итоги "
         "и награждать самых активных и старательных ребят!"
     )
-    session = get_session()
-    user_service = await get_user_service_callback(session)
-    user = await user_service.get_user_by_telegram_id(update.effective_chat.id)
-    context.user_data["user"] = user
-    if user and user.telegram_blocked:
-        await user_service.unset_telegram_blocked(user)
-    await context.bot.send_message(chat_id=update.effective_chat.id, text=start_text)
-    if user:
-        try:
-            await user_service.check_before_change_user_data(user.id)
-        except exceptions.ApplicationError as e:
-            await update.message.reply_text(
-                text=e.detail,
-                reply_markup=ReplyKeyboardRemove(),
-            )
-            return
-        await update_user_data(update, context)
-    else:
-        await register_user(update, context)
+    async with session_scope() as session:
+        user_service = get_user_service_callback(session)
+        user = await user_service.get_user_by_telegram_id(update.effective_chat.id)
+        # в данных пользователя бота хранится только то, что нужно для формы изменения данных
+        context.user_data["user"] = UserWebhookTelegram.from_orm(user).dict() if user else None
+        if user and user.telegram_blocked:
+            await user_service.unset_telegram_blocked(user)
+        await context.bot.send_message(chat_id=update.effective_chat.id, text=start_text)
+        if user:
+            try:
+                await user_service.check_before_change_user_data(user.id)
+            except exceptions.ApplicationError as e:
+                await update.message.reply_text(
+                    text=e.detail,
+                    reply_markup=ReplyKeyboardRemove(),
+                )
+                return
+            await update_user_data(update, context)
+        else:
+            await register_user(update, context)
 
 
 async def register_user(
@@ -101,9 +98,7 @@ async def update_user_data(
         text = "Исправить неверно внесенные данные"
     else:
         text = "Подать заявку на участие в смене"
-        user = context.user_data.get("user")
-        web_hook = UserWebhookTelegram.from_orm(user)
-        query = urllib.parse.urlencode(web_hook.dict())
+        query = urllib.parse.urlencode(context.user_data.get("user"))
     await update.message.reply_text(
         "Нажмите на кнопку ниже, чтобы перейти на форму регистрации.",
         reply_markup=ReplyKeyboardMarkup.from_button(
@@ -129,63 +124,64 @@ async def web_app_data(update: Update, context: CallbackContext) -> None:
             await register_user(update, context)
         return
     user_scheme.telegram_id = update.effective_user.id
-    session = get_session()
-    registration_service = await get_user_service_callback(session)
-    reply_markup, validation_error = None, False
-    try:
-        await registration_service.register_user(user_scheme)
-    except exceptions.NotValidValueError as e:
-        text = e.detail
-        validation_error = True
-    except exceptions.ApplicationError as e:
-        text = e.detail
-    else:
-        text = "Процесс регистрации занимает некоторое время - вам придет уведомление."
-        if context.user_data.get('user'):
-            text = (
-                "Обновленные данные приняты!\n"
-                "Процесс обработки заявок занимает некоторое время - вам придет уведомление."
+    async with session_scope() as session:
+        registration_service = get_user_service_callback(session)
+        reply_markup, validation_error = None, False
+        try:
+            await registration_service.register_user(user_scheme)
+        except exceptions.NotValidValueError as e:
+            text = e.detail
+            validation_error = True
+        except exceptions.ApplicationError as e:
+            text = e.detail
+        else:
+            text = "Процесс регистрации занимает некоторое время - вам придет уведомление."
+            if context.user_data.get('user'):
+                text = (
+                    "Обновленные данные приняты!\n"
+                    "Процесс обработки заявок занимает некоторое время - вам придет уведомление."
+                )
+            reply_markup = ReplyKeyboardRemove()
+        finally:
+            await update.message.reply_text(
+                text=text,
+                reply_markup=reply_markup,
             )
-        reply_markup = ReplyKeyboardRemove()
-    finally:
-        await update.message.reply_text(
-            text=text,
-            reply_markup=reply_markup,
-        )
-        if validation_error and context.user_data.get("user"):
-            await update_user_data(update, context)
-        elif validation_error:
-            await register_user(update, context)
+            if validation_error and context.user_data.get("user"):
+                await update_user_data(update, context)
+            elif validation_error:
+                await register_user(update, context)
 
 
-async def download_photo_report_callback(update: Update, context: CallbackContext, shift_user_dir: str) -> str:
-    """Сохранить фото отчёта на диск."""
+async def download_photo_report_callback(update: Update, context: CallbackContext) -> tuple[str, str]:
+    """Сохранить фото отчёта в хранилище фотографий. Возвращает хэш фото и ссылку на него."""
     file = await update.message.photo[-1].get_file()
-    file_name = file.file_unique_id + Path(file.file_path).suffix
-    file_path = f"{shift_user_dir}/{file_name}"
-    await file.download_to_drive(custom_path=(settings.user_reports_dir / file_path))
-    return file_path
+    photo_hash, photo_path = await PhotoStorage().save_telegram_file(file)
+    return photo_hash, PhotoStorage.get_url(photo_path)
+
+
+async def create_report_thumbnail(report_id: UUID, photo_url: str) -> None:
+    """Создать превью фото отчёта. Выполняется в фоне, чтобы не задерживать ответ участнику."""
+    async with session_scope() as session:
+        await get_report_service_callback(session).create_thumbnail(report_id, photo_url)
 
 
 async def photo_handler(update: Update, context: CallbackContext) -> None:
     """Обработка полученного фото."""
-    session_gen = get_session()
-    session = await session_gen.asend(None)
-    user_service = UserService(UserRepository(session), RequestRepository(session))
-    report_service = ReportService(ReportRepository(session), ShiftRepository(session), MemberRepository(session))
-    shift_service = ShiftService(ShiftRepository(session))
+    async with session_scope() as session:
+        user_service = UserService(UserRepository(session), RequestRepository(session))
+        report_service = get_report_service_callback(session)
 
-    text = "Твой отчет отправлен на модерацию, после проверки тебе придет уведомление."
+        text = "Твой отчет отправлен на модерацию, после проверки тебе придет уведомление."
 
-    try:
-        user = await user_service.get_user_by_telegram_id(update.effective_chat.id)
-        report = await report_service.get_current_report(user.id)
-        shift_dir = await shift_service.get_shift_dir(report.shift_id)
-        file_path = await download_photo_report_callback(update, context, f"{shift_dir}/{user.id}")
-        photo_url = urljoin(settings.user_reports_url, file_path)
-        await report_service.send_report(report, photo_url)
-    except exceptions.ApplicationError as e:
-        text = e.detail
+        try:
+            user = await user_service.get_user_by_telegram_id(update.effective_chat.id)
+            report = await report_service.get_current_report(user.id)
+            photo_hash, photo_url = await download_photo_report_callback(update, context)
+            await report_service.send_report(report, photo_url, photo_hash)
+            context.application.create_task(create_report_thumbnail(report.id, photo_url))
+        except exceptions.ApplicationError as e:
+            text = e.detail
 
     await update.message.reply_text(text)
 
@@ -222,24 +218,19 @@ async def inline_button_handler(update: Update, context: CallbackContext) -> Non
 
 async def get_balance(telegram_id: int) -> int:
     """Метод для получения баланса ломбарьеров."""
-    session_gen = get_session()
-    session = await session_gen.asend(None)
-    member_service = MemberService(MemberRepository(session))
-    return await member_service.get_number_of_lombariers_by_telegram_id(telegram_id)
+    async with session_scope() as session:
+        member_service = MemberService(MemberRepository(session))
+        return await member_service.get_number_of_lombariers_by_telegram_id(telegram_id)
 
 
 async def skip_report(chat_id: int) -> None:
     """Метод для пропуска задания."""
-    session_gen = get_session()
-    session = await session_gen.asend(None)
-    shift_service = ShiftService(ShiftRepository(session))
-    user_service = UserService(UserRepository(session), RequestRepository(session), shift_service)
-    task_service = TaskService(TaskRepository(session))
-    report_service = ReportService(
-        ReportRepository(session), ShiftRepository(session), MemberRepository(session), task_service
-    )
-    user = await user_service.get_user_by_telegram_id(chat_id)
-    await report_service.skip_current_report(user.id)
+    async with session_scope() as session:
+        shift_service = ShiftService(ShiftRepository(session))
+        user_service = UserService(UserRepository(session), RequestRepository(session), shift_service)
+        report_service = get_report_service_callback(session)
+        user = await user_service.get_user_by_telegram_id(chat_id)
+        await report_service.skip_current_report(user.id)
 
 
 async def incorrect_report_type_handler(update: Update, context: CallbackContext) -> None:
@@ -249,18 +240,17 @@ async def incorrect_report_type_handler(update: Update, context: CallbackContext
 
 async def chat_member_handler(update: Update, context: CallbackContext) -> None:
     """Меняет значение поля telegram_blocked при блокировке/разблокировке бота."""
-    session_gen = get_session()
-    session = await session_gen.asend(None)
-    user_service = UserService(UserRepository(session))
-    user = await user_service.get_user_by_telegram_id(update.effective_user.id)
-    if (
-        update.my_chat_member.new_chat_member.status == update.my_chat_member.new_chat_member.BANNED
-        and update.my_chat_member.old_chat_member.status == update.my_chat_member.old_chat_member.MEMBER
-    ):
-        return await user_service.set_telegram_blocked(user)
-    if (
-        update.my_chat_member.new_chat_member.status == update.my_chat_member.new_chat_member.MEMBER
-        and update.my_chat_member.old_chat_member.status == update.my_chat_member.old_chat_member.BANNED
-    ):
-        return await user_service.unset_telegram_blocked(user)
-    return None
+    async with session_scope() as session:
+        user_service = UserService(UserRepository(session))
+        user = await user_service.get_user_by_telegram_id(update.effective_user.id)
+        if (
+            update.my_chat_member.new_chat_member.status == update.my_chat_member.new_chat_member.BANNED
+            and update.my_chat_member.old_chat_member.status == update.my_chat_member.old_chat_member.MEMBER
+        ):
+            return await user_service.set_telegram_blocked(user)
+        if (
+            update.my_chat_member.new_chat_member.status == update.my_chat_member.new_chat_member.MEMBER
+            and update.my_chat_member.old_chat_member.status == update.my_chat_member.old_chat_member.BANNED
+        ):
+            return await user_service.unset_telegram_blocked(user)
+        return None
@@ -1,84 +1,167 @@
 import asyncio
+import logging
+import time
 from datetime import date
 from urllib.parse import urljoin
+from uuid import UUID
 
 from telegram.ext import CallbackContext
 
 from src.bot.api_services import (
+    get_analytics_service_callback,
     get_member_service_callback,
+    get_outbox_service_callback,
     get_report_service_callback,
     get_shift_service_callback,
+    get_task_service_callback,
+    get_user_service_callback,
 )
 from src.bot.services import BotService
 from src.bot.ui import DAILY_TASK_BUTTONS
-from src.core.db.db import get_session
-from src.core.db.models import Report
+from src.core.db.db import session_scope, warn_about_long_checkouts
+from src.core.db.models import Report, Task
+from src.core.services.task_service import TaskService
+from src.core.services.user_service import UserService
 from src.core.settings import settings
 
+# количество напоминаний, которые ставятся в очередь на отправку одним запросом
+REMINDER_BATCH_SIZE = 1000
+
+OUTBOX_LOCK = asyncio.Lock()
+ANALYTICS_EXPORTS_LOCK = asyncio.Lock()
+
 
 async def send_no_report_reminder_job(context: CallbackContext) -> None:
-    """Отправить напоминание об отчёте."""
-    member_session_generator = get_session()
-    member_service = await get_member_service_callback(member_session_generator)
+    """Отправить напоминание об отчёте.
+
+    Получатели читаются из базы построчно и ставятся в очередь на отправку порциями по REMINDER_BATCH_SIZE.
+    """
     bot_service = BotService(context)
-    members = await member_service.get_members_with_no_reports()
-    send_message_tasks = [
-        bot_service.send_message(
-            member.user,
-            (
-                f"{member.user.name} {member.user.surname}, мы потеряли тебя! "
-                f"Задание все еще ждет тебя. "
-                f"Напоминаем, что за каждое выполненное задание ты получаешь виртуальные "
-                f"\"ломбарьерчики\", которые можешь обменять на призы и подарки!"
-            ),
-        )
-        for member in members
-    ]
-    context.application.create_task(asyncio.gather(*send_message_tasks))
+    messages = []
+    async with session_scope() as session:
+        member_service = get_member_service_callback(session)
+        async for member in member_service.stream_members_with_no_reports():
+            messages.append(
+                (
+                    member["user_id"],
+                    member["telegram_id"],
+                    f"{member['name']} {member['surname']}, мы потеряли тебя! "
+                    f"Задание все еще ждет тебя. "
+                    f"Напоминаем, что за каждое выполненное задание ты получаешь виртуальные "
+                    f"\"ломбарьерчики\", которые можешь обменять на призы и подарки!",
+                )
+            )
+            if len(messages) == REMINDER_BATCH_SIZE:
+                await bot_service.enqueue_messages(messages)
+                messages = []
+    await bot_service.enqueue_messages(messages)
 
 
 async def send_daily_task_job(context: CallbackContext) -> None:
     """Автоматически запускает смену и рассылает задания."""
-    shift_session = get_session()
-    report_session = get_session()
-    member_session = get_session()
-    shift_service = await get_shift_service_callback(shift_session)
-    report_service = await get_report_service_callback(report_session)
-    member_service = await get_member_service_callback(member_session)
+    async with session_scope() as session:
+        shift_service = get_shift_service_callback(session)
+        report_service = get_report_service_callback(session)
+        member_service = get_member_service_callback(session)
+        task_service = get_task_service_callback(session)
+        user_service = get_user_service_callback(session)
 
-    await shift_service.start_prepared_shift()
+        await shift_service.start_prepared_shift()
 
-    bot_service = BotService(context)
-    await report_service.set_status_to_waiting_reports(Report.Status.SKIPPED)
-    await member_service.exclude_lagging_members(context.application)
-    task, members = await report_service.get_today_task_and_active_members(date.today().day)
-    await report_service.create_daily_reports(members, task)
-    task_photo = urljoin(settings.APPLICATION_URL, task.url)
-    send_message_tasks = [
-        bot_service.send_photo(
-            member.user,
-            task_photo,
+        bot_service = BotService(context)
+        preparation_started_at = time.perf_counter()
+        await report_service.set_status_to_waiting_reports(Report.Status.SKIPPED)
+        await member_service.exclude_lagging_members(context.application)
+        task = await report_service.get_today_task(date.today().day)
+        await report_service.create_daily_reports(task)
+        recipients = await report_service.get_daily_task_recipients()
+        logging.info(
+            f"Подготовка рассылки ежедневного задания для {len(recipients)} участников заняла "
+            f"{time.perf_counter() - preparation_started_at:.3f} сек."
+        )
+        messages = [
             (
-                f"Привет, {member.user.name}!\n"
-                f"Вчерашнее задание не было выполнено! Сегодня можешь отправить отчет только по новому заданию. "
-                f"Сегодня твоим заданием будет {task.title}. "
-                f"Не забудь сделать фотографию, как ты выполняешь задание, и отправить на проверку."
+                recipient.user_id,
+                recipient.telegram_id,
+                (
+                    f"Привет, {recipient.name}!\n"
+                    f"Вчерашнее задание не было выполнено! Сегодня можешь отправить отчет только по новому заданию. "
+                    f"Сегодня твоим заданием будет {task.title}. "
+                    f"Не забудь сделать фотографию, как ты выполняешь задание, и отправить на проверку."
+                )
+                if recipient.previous_report_not_submitted
+                else (
+                    f"Привет, {recipient.name}!\n"
+                    f"Сегодня твоим заданием будет {task.title}. "
+                    f"Не забудь сделать фотографию, как ты выполняешь задание, и отправить на проверку."
+                ),
             )
-            if await report_service.is_previous_report_not_submitted(member.id)
-            else (
-                f"Привет, {member.user.name}!\n"
-                f"Сегодня твоим заданием будет {task.title}. "
-                f"Не забудь сделать фотографию, как ты выполняешь задание, и отправить на проверку."
-            ),
-            DAILY_TASK_BUTTONS,
-        )
-        for member in members
-    ]
-    context.application.create_task(asyncio.gather(*send_message_tasks))
+            for recipient in recipients
+        ]
+        task_photo = await task_service.get_telegram_file_id(task)
+        if not task_photo:
+            task_photo, messages = await _upload_daily_task_photo(
+                bot_service, task_service, user_service, task, messages
+            )
+        await bot_service.enqueue_messages(messages, task_photo, DAILY_TASK_BUTTONS)
+
+
+async def _upload_daily_task_photo(
+    bot_service: BotService,
+    task_service: TaskService,
+    user_service: UserService,
+    task: Task,
+    messages: list[tuple[UUID, int, str]],
+) -> tuple[str, list[tuple[UUID, int, str]]]:
+    """Загружает изображение задания в telegram вместе с первым сообщением рассылки.
+
+    Возвращает file_id загруженного изображения и сообщения, которые осталось отправить.
+    """
+    task_photo = urljoin(settings.APPLICATION_URL, task.url)
+    for next_index, (_, telegram_id, caption) in enumerate(messages, start=1):
+        user = await user_service.get_user_by_telegram_id(telegram_id)
+        message = await bot_service.send_photo(user, task_photo, caption, DAILY_TASK_BUTTONS)
+        if message:
+            file_id = message.photo[-1].file_id
+            await task_service.set_telegram_file_id(task, file_id)
+            return file_id, messages[next_index:]
+    return task_photo, []
+
+
+async def send_outbox_messages_job(context: CallbackContext) -> None:
+    """Отправляет сообщения, накопившиеся в очереди исходящих сообщений."""
+    if OUTBOX_LOCK.locked():
+        return
+    async with OUTBOX_LOCK:
+        async with session_scope() as session:
+            outbox_service = get_outbox_service_callback(session)
+            await outbox_service.send_pending_messages(context.application)
+
+
+async def delete_sent_outbox_messages_job(context: CallbackContext) -> None:
+    """Удаляет отправленные сообщения, срок хранения которых истёк."""
+    async with session_scope() as session:
+        outbox_service = get_outbox_service_callback(session)
+        await outbox_service.delete_sent_messages()
+
+
+async def warn_about_long_db_checkouts_job(context: CallbackContext) -> None:
+    """Предупреждает о соединениях с БД, которые слишком долго не возвращаются в пул."""
+    warn_about_long_checkouts()
+
+
+async def process_analytics_exports_job(context: CallbackContext) -> None:
+    """Формирует отчёты аналитики, заказанные администраторами для формирования в фоне."""
+    if ANALYTICS_EXPORTS_LOCK.locked():
+        return
+    async with ANALYTICS_EXPORTS_LOCK:
+        async with session_scope() as session:
+            analytics_service = get_analytics_service_callback(session)
+            await analytics_service.process_exports()
 
 
 async def finish_shift_automatically_job(context: CallbackContext) -> None:
     """Автоматически закрывает смену в дату, указанную в finished_at."""
-    session = get_session()
-    shift_service = await get_shift_service_callback(session)
-    await shift_service.finish_shift_automatically(context.application)
+    async with session_scope() as session:
+        shift_service = get_shift_service_callback(session)
+        await shift_service.finish_shift_automatically(context.application)
@@ -10,11 +10,12 @@ from telegram.ext import (
     ChatMemberHandler,
     CommandHandler,
     MessageHandler,
-    PicklePersistence,
+    PersistenceInput,
     filters,
 )
 from telegram.ext.filters import PHOTO, TEXT, StatusUpdate
 
+from src.bot.application import ChatOrderedApplication
 from src.bot.handlers import (
     button_handler,
     chat_member_handler,
@@ -25,10 +26,15 @@ from src.bot.handlers import (
     web_app_data,
 )
 from src.bot.jobs import (
+    delete_sent_outbox_messages_job,
     finish_shift_automatically_job,
+    process_analytics_exports_job,
     send_daily_task_job,
     send_no_report_reminder_job,
+    send_outbox_messages_job,
+    warn_about_long_db_checkouts_job,
 )
+from src.bot.persistence import DatabasePersistence
 from src.core.settings import settings
 
 HANDLED_MESSAGE_TYPES = filters.PHOTO | filters.TEXT | filters.StatusUpdate.WEB_APP_DATA
@@ -37,10 +43,18 @@ HANDLED_MESSAGE_TYPES = filters.PHOTO | filters.TEXT | filters.StatusUpdate.WEB_
 def create_bot() -> Application:
     """Создать бота."""
     Path(settings.user_reports_dir).mkdir(parents=True, exist_ok=True)
-    bot_persistence = PicklePersistence(filepath=settings.BOT_PERSISTENCE_FILE)
+    bot_persistence = DatabasePersistence(
+        # данные чатов не используются: в личных чатах они совпадают с данными пользователя
+        store_data=PersistenceInput(chat_data=False, callback_data=False),
+        update_interval=settings.BOT_PERSISTENCE_UPDATE_INTERVAL,
+    )
     bot_instance = (
         ApplicationBuilder()
+        .application_class(ChatOrderedApplication)
         .token(settings.BOT_TOKEN)
+        # PTB забирает обновления из очереди параллельно, а количество работающих обработчиков
+        # и порядок обработки обновлений одного чата контролирует ChatOrderedApplication
+        .concurrent_updates(True)
         .rate_limiter(AIORateLimiter())
         .persistence(persistence=bot_persistence)
         .build()
@@ -64,6 +78,25 @@ def create_bot() -> Application:
         send_no_report_reminder_job,
         time(hour=settings.SEND_NO_REPORT_REMINDER_HOUR, tzinfo=pytz.timezone(settings.TIME_ZONE)),
     )
+    bot_instance.job_queue.run_repeating(
+        send_outbox_messages_job,
+        interval=settings.OUTBOX_POLLING_INTERVAL,
+        # пока очередь разбирается, следующий запуск задачи сразу завершается, не дожидаясь предыдущего
+        job_kwargs={"max_instances": 2},
+    )
+    bot_instance.job_queue.run_daily(
+        delete_sent_outbox_messages_job,
+        time(hour=settings.OUTBOX_CLEANUP_HOUR, tzinfo=pytz.timezone(settings.TIME_ZONE)),
+    )
+    bot_instance.job_queue.run_repeating(
+        process_analytics_exports_job,
+        interval=settings.ANALYTICS_EXPORT_POLLING_INTERVAL,
+        job_kwargs={"max_instances": 2},
+    )
+    if settings.DB_SESSION_LEAK_THRESHOLD:
+        bot_instance.job_queue.run_repeating(
+            warn_about_long_db_checkouts_job, interval=settings.DB_SESSION_LEAK_THRESHOLD
+        )
     return bot_instance
 
 
@@ -0,0 +1,136 @@
+import asyncio
+import json
+from typing import Any, NoReturn, Optional
+
+from telegram.ext import BasePersistence, PersistenceInput
+
+from src.core.db.db import session_scope
+from src.core.db.models import BotPersistenceData
+from src.core.db.repository import BotPersistenceRepository
+
+DataType = BotPersistenceData.DataType
+DataKey = tuple[DataType, int]
+
+BOT_DATA_KEY = 0
+
+
+class DatabasePersistence(BasePersistence[dict, dict, dict]):
+    """Хранение данных бота, пользователей и чатов в БД.
+
+    Данные каждого пользователя и чата хранятся отдельной строкой в формате JSONB, поэтому
+    при сохранении записываются только изменившиеся данные, а не все данные бота целиком.
+    Данные пользователя или чата загружаются из БД перед обработкой его обновления, если
+    в процессе нет несохранённых изменений, что позволяет запускать несколько экземпляров бота.
+    Изменения сохраняются раз в update_interval секунд, поэтому другие экземпляры видят их с этой задержкой.
+    Данные должны сериализоваться в JSON: ключи вложенных словарей сохраняются строками.
+    Данные callback-кнопок и состояния ConversationHandler не сохраняются.
+    """
+
+    def __init__(self, store_data: Optional[PersistenceInput] = None, update_interval: float = 60) -> None:
+        super().__init__(store_data=store_data, update_interval=update_interval)
+        # данные в том виде, в котором они последний раз загружены из БД или сохранены в неё
+        self.__stored: dict[DataKey, str] = {}
+        self.__changes: dict[DataKey, tuple[Optional[dict], Optional[str]]] = {}
+        self.__save_lock = asyncio.Lock()
+
+    @staticmethod
+    def __serialize(data: dict) -> str:
+        return json.dumps(data, sort_keys=True, ensure_ascii=False)
+
+    async def __load(self, data_type: DataType, key: int) -> dict:
+        async with session_scope() as session:
+            data = await BotPersistenceRepository(session).get_data(data_type, key)
+        data = data or {}
+        self.__stored[data_type, key] = self.__serialize(data)
+        return data
+
+    async def __refresh(self, data_type: DataType, key: int, data: dict) -> None:
+        """Заменяет данные процесса данными из БД, если в процессе нет несохранённых изменений."""
+        if self.__serialize(data) != self.__stored.get((data_type, key), self.__serialize({})):
+            return
+        data.clear()
+        data.update(await self.__load(data_type, key))
+
+    async def __save(self, data_type: DataType, key: int, data: Optional[dict]) -> None:
+        """Сохраняет данные, если они изменились. None означает удаление данных.
+
+        PTB сохраняет данные всех пользователей и чатов одновременно, поэтому изменения
+        накапливаются и записываются в БД одной транзакцией тем вызовом, который первым получит блокировку.
+        """
+        serialized = None if data is None else self.__serialize(data)
+        if serialized is not None and self.__stored.get((data_type, key)) == serialized:
+            return
+        self.__changes[data_type, key] = (data, serialized)
+        await self.__save_changes()
+
+    async def __save_changes(self) -> None:
+        async with self.__save_lock:
+            if not self.__changes:
+                return
+            changes, self.__changes = self.__changes, {}
+            try:
+                async with session_scope() as session:
+                    await BotPersistenceRepository(session).save_changes(
+                        {data_key: data for data_key, (data, _) in changes.items()}
+                    )
+            except Exception:
+                # несохранённые изменения будут записаны при следующем сохранении
+                for data_key, change in changes.items():
+                    self.__changes.setdefault(data_key, change)
+                raise
+            for data_key, (_, serialized) in changes.items():
+                if serialized is None:
+                    self.__stored.pop(data_key, None)
+                else:
+                    self.__stored[data_key] = serialized
+
+    async def get_user_data(self) -> dict[int, dict]:
+        # данные пользователей загружаются при обработке их обновлений в refresh_user_data
+        return {}
+
+    async def get_chat_data(self) -> dict[int, dict]:
+        # данные чатов загружаются при обработке их обновлений в refresh_chat_data
+        return {}
+
+    async def get_bot_data(self) -> dict:
+        return await self.__load(DataType.BOT, BOT_DATA_KEY)
+
+    async def refresh_user_data(self, user_id: int, user_data: dict) -> None:
+        await self.__refresh(DataType.USER, user_id, user_data)
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: dict) -> None:
+        await self.__refresh(DataType.CHAT, chat_id, chat_data)
+
+    async def refresh_bot_data(self, bot_data: dict) -> None:
+        # вызывается перед каждым запуском задач бота, поэтому данные бота загружаются только при запуске
+        pass
+
+    async def update_user_data(self, user_id: int, data: dict) -> None:
+        await self.__save(DataType.USER, user_id, data)
+
+    async def update_chat_data(self, chat_id: int, data: dict) -> None:
+        await self.__save(DataType.CHAT, chat_id, data)
+
+    async def update_bot_data(self, data: dict) -> None:
+        await self.__save(DataType.BOT, BOT_DATA_KEY, data)
+
+    async def drop_user_data(self, user_id: int) -> None:
+        await self.__save(DataType.USER, user_id, None)
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        await self.__save(DataType.CHAT, chat_id, None)
+
+    async def flush(self) -> None:
+        await self.__save_changes()
+
+    async def get_callback_data(self) -> NoReturn:
+        raise NotImplementedError("Данные callback-кнопок не сохраняются.")
+
+    async def update_callback_data(self, data: Any) -> NoReturn:
+        raise NotImplementedError("Данные callback-кнопок не сохраняются.")
+
+    async def get_conversations(self, name: str) -> NoReturn:
+        raise NotImplementedError("Состояния ConversationHandler не сохраняются.")
+
+    async def update_conversation(self, name: str, key: tuple, new_state: Optional[object]) -> NoReturn:
+        raise NotImplementedError("Состояния ConversationHandler не сохраняются.")
@@ -2,18 +2,24 @@ import asyncio
 import functools
 import logging
 from datetime import date, datetime
+from typing import Optional
+from uuid import UUID
 
-from telegram import ReplyKeyboardMarkup
+from telegram import KeyboardButton, Message, ReplyKeyboardMarkup
 from telegram.error import NetworkError, RetryAfter, TelegramError, TimedOut
 from telegram.ext import Application
 
 from src.api.request_models.request import RequestDeclineRequest
 from src.bot.error_handler import error_handler
-from src.core.db import models
+from src.core.db import DTO_models, models
+from src.core.db.db import session_scope
+from src.core.db.repository import OutboxRepository
 from src.core.settings import settings
 from src.core.utils import get_lombaryers_for_quantity
 
 FORMAT_PHOTO_DATE = "%d.%m.%Y"
+RETRY_START_SLEEP_TIME = 3
+RETRY_MAX_ATTEMPT_NUMBER = 5
 
 
 def check_user_blocked(func):
@@ -23,13 +29,13 @@ def check_user_blocked(func):
     async def _func_wrapper(*args, **kwargs):
         user = kwargs['user'] if 'user' in kwargs else args[1]
         if user.telegram_blocked:
-            return
-        await func(*args, **kwargs)
+            return None
+        return await func(*args, **kwargs)
 
     return _func_wrapper
 
 
-def retry(start_sleep_time: int = 3, max_attempt_number: int = 5):
+def retry(start_sleep_time: int = RETRY_START_SLEEP_TIME, max_attempt_number: int = RETRY_MAX_ATTEMPT_NUMBER):
     """Функция для повторного выполнения метода через некоторое время, если возникла ошибка."""
 
     def _func_wrapper(func):
@@ -55,7 +61,6 @@ def retry(start_sleep_time: int = 3, max_attempt_number: int = 5):
 class BotService:
     def __init__(self, telegram_bot: Application) -> None:
         self.__bot = telegram_bot.bot
-        self.__bot_application = telegram_bot
 
     @check_user_blocked
     @retry()
@@ -64,8 +69,66 @@ class BotService:
 
     @check_user_blocked
     @retry()
-    async def send_photo(self, user: models.User, photo: str, caption: str, reply_markup: ReplyKeyboardMarkup) -> None:
-        await self.__bot.send_photo(chat_id=user.telegram_id, photo=photo, caption=caption, reply_markup=reply_markup)
+    async def send_photo(
+        self, user: models.User, photo: str, caption: str, reply_markup: ReplyKeyboardMarkup
+    ) -> Message:
+        return await self.__bot.send_photo(
+            chat_id=user.telegram_id, photo=photo, caption=caption, reply_markup=reply_markup
+        )
+
+    async def send_outbox_message(self, message: models.OutboxMessage) -> None:
+        """Отправить сообщение из очереди исходящих сообщений."""
+        reply_markup = None
+        if message.reply_markup:
+            reply_markup = ReplyKeyboardMarkup(
+                [[KeyboardButton(**button) for button in row] for row in message.reply_markup["keyboard"]],
+                **{key: value for key, value in message.reply_markup.items() if key != "keyboard"},
+            )
+        if message.photo:
+            await self.__bot.send_photo(
+                chat_id=message.telegram_id, photo=message.photo, caption=message.text, reply_markup=reply_markup
+            )
+        else:
+            await self.__bot.send_message(message.telegram_id, message.text, reply_markup=reply_markup)
+
+    async def send_messages_in_background(
+        self,
+        messages: list[tuple[models.User, str]],
+        photo: Optional[str] = None,
+        reply_markup: Optional[ReplyKeyboardMarkup] = None,
+    ) -> None:
+        """Поставить сообщения в очередь на отправку.
+
+        Сообщения сохраняются в БД одним запросом и отправляются в фоне задачей send_outbox_messages_job.
+        """
+        await self.enqueue_messages(
+            [(user.id, user.telegram_id, text) for user, text in messages if not user.telegram_blocked],
+            photo,
+            reply_markup,
+        )
+
+    async def enqueue_messages(
+        self,
+        messages: list[tuple[UUID, int, str]],
+        photo: Optional[str] = None,
+        reply_markup: Optional[ReplyKeyboardMarkup] = None,
+    ) -> None:
+        """Поставить в очередь на отправку сообщения, заданные id пользователя, telegram_id и текстом.
+
+        Не требует загрузки пользователей: получатели, заблокировавшие бота, должны быть отфильтрованы заранее.
+        """
+        outbox_messages = [
+            dict(
+                user_id=user_id,
+                telegram_id=telegram_id,
+                text=text,
+                photo=photo,
+                reply_markup=reply_markup.to_dict() if reply_markup else None,
+            )
+            for user_id, telegram_id, text in messages
+        ]
+        async with session_scope() as session:
+            await OutboxRepository(session).create_all(outbox_messages)
 
     async def notify_approved_request(self, user: models.User, first_task_date: str) -> None:
         """Уведомление участника о решении по заявке в telegram.
@@ -103,27 +166,53 @@ class BotService:
 
         - Задание принято, начислен 1 ломбарьерчик.
         """
-        photo_date = datetime.strftime(report.uploaded_at, FORMAT_PHOTO_DATE)
-        text = f"Твой отчет от {photo_date} принят! Тебе начислен 1 \"ломбарьерчик\". "
-        if date.today() < shift.finished_at:
-            text = text + f"Следующее задание придет в {settings.formatted_task_time} часов утра."
-        await self.send_message(user, text)
+        await self.send_message(user, self.__get_approved_task_text(report, shift))
 
     async def notify_declined_task(self, user: models.User, shift: models.Shift) -> None:
         """Уведомление участника о проверенном задании.
 
         - Задание не принято.
         """
+        await self.send_message(user, self.__get_declined_task_text(shift))
+
+    async def notify_reviewed_tasks(self, reports: list[models.Report]) -> None:
+        """Уведомляет участников о проверенных заданиях одной пачкой через очередь исходящих сообщений.
+
+        У отчетов должны быть загружены участник, его пользователь и смена.
+        """
+        messages = [
+            (
+                report.member.user,
+                (
+                    self.__get_approved_task_text(report, report.member.shift)
+                    if report.status == models.Report.Status.APPROVED
+                    else self.__get_declined_task_text(report.member.shift)
+                ),
+            )
+            for report in reports
+        ]
+        await self.send_messages_in_background(messages)
+
+    @staticmethod
+    def __get_approved_task_text(report: models.Report, shift: models.Shift) -> str:
+        photo_date = datetime.strftime(report.uploaded_at, FORMAT_PHOTO_DATE)
+        text = f"Твой отчет от {photo_date} принят! Тебе начислен 1 \"ломбарьерчик\". "
+        if date.today() < shift.finished_at:
+            text = text + f"Следующее задание придет в {settings.formatted_task_time} часов утра."
+        return text
+
+    @staticmethod
+    def __get_declined_task_text(shift: models.Shift) -> str:
         text = (
             "К сожалению, мы не можем принять твой фотоотчет! "
             "Возможно на фотографии не видно, что именно ты выполняешь задание. "
         )
         if date.today() < shift.finished_at:
             text = text + f"Ты можешь отправить отчет повторно до {settings.formatted_task_time} часов утра."
-        await self.send_message(user, text)
+        return text
 
-    async def notify_excluded_members(self, members: list[models.Member]) -> None:
-        """Уведомляет участников об исключении из смены."""
+    async def notify_excluded_members(self, users: list[tuple[UUID, int]]) -> None:
+        """Уведомляет об исключении из смены пользователей, заданных id и telegram_id."""
         text = (
             "К сожалению, мы заблокировали Ваше участие в смене из-за неактивности - "
             "Вы не отправили ни одного отчета на несколько последних заданий подряд. "
@@ -131,13 +220,12 @@ class BotService:
             "Если Вы считаете, что произошла ошибка - обращайтесь "
             f"за помощью на электронную почту {settings.ORGANIZATIONS_EMAIL}."
         )
-        send_message_tasks = [self.send_message(member.user, text) for member in members]
-        self.__bot_application.create_task(asyncio.gather(*send_message_tasks))
+        await self.enqueue_messages([(user_id, telegram_id, text) for user_id, telegram_id in users])
 
     async def notify_that_shift_is_finished(self, shift: models.Shift) -> None:
         """Уведомляет активных участников об окончании смены."""
-        send_message_tasks = [
-            self.send_message(
+        messages = [
+            (
                 member.user,
                 shift.final_message.format(
                     name=member.user.name,
@@ -148,16 +236,33 @@ class BotService:
             )
             for member in shift.members
         ]
-        self.__bot_application.create_task(asyncio.gather(*send_message_tasks))
+        await self.send_messages_in_background(messages)
+
+    async def notify_members_that_shift_is_finished(
+        self, shift: models.Shift, members: list[DTO_models.ShiftMemberRecipientDto]
+    ) -> None:
+        """Уведомляет об окончании смены участников, переданных в виде данных для рассылки."""
+        messages = [
+            (
+                member.user_id,
+                member.telegram_id,
+                shift.final_message.format(
+                    name=member.name,
+                    surname=member.surname,
+                    numbers_lombaryers=member.numbers_lombaryers,
+                    lombaryers_case=get_lombaryers_for_quantity(member.numbers_lombaryers),
+                ),
+            )
+            for member in members
+        ]
+        await self.enqueue_messages(messages)
 
     async def notify_that_shift_is_cancelled(self, users: list[models.User], final_message: str) -> None:
         """Уведомляет пользователей об отмене смены."""
-        send_message_tasks = [self.send_message(user, final_message) for user in users]
-        self.__bot_application.create_task(asyncio.gather(*send_message_tasks))
+        await self.send_messages_in_background([(user, final_message) for user in users])
 
     async def notify_that_shift_start_date_is_changed(
         self, users: list[models.User], start_date_changed_message: str
     ) -> None:
         """Уведомляет пользователей о переносе даты старта смены."""
-        send_message_tasks = [self.send_message(user, start_date_changed_message) for user in users]
-        self.__bot_application.create_task(asyncio.gather(*send_message_tasks))
+        await self.send_messages_in_background([(user, start_date_changed_message) for user in users])
@@ -0,0 +1,52 @@
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """Кэш в памяти процесса с ограниченным временем жизни записей.
+
+    При превышении max_size вытесняются записи, которые дольше всего не запрашивались.
+    Кэш не потокобезопасен и должен использоваться только из цикла событий.
+    Счётчики hits и misses показывают количество обращений, найденных и не найденных в кэше.
+    """
+
+    def __init__(self, ttl: float, max_size: int) -> None:
+        self.__ttl = ttl
+        self.__max_size = max_size
+        self.__items: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.__items)
+
+    def get(self, key: K) -> Optional[V]:
+        """Возвращает значение по ключу или None, если записи нет или её время жизни истекло."""
+        item = self.__items.get(key)
+        if item is None or item[0] <= time.monotonic():
+            self.__items.pop(key, None)
+            self.misses += 1
+            return None
+        self.__items.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def set(self, key: K, value: V, ttl: Optional[float] = None) -> None:
+        """Сохраняет значение. Время жизни записи не может превышать ttl кэша."""
+        ttl = self.__ttl if ttl is None else min(ttl, self.__ttl)
+        if ttl <= 0:
+            return
+        self.__items[key] = (time.monotonic() + ttl, value)
+        self.__items.move_to_end(key)
+        while len(self.__items) > self.__max_size:
+            self.__items.popitem(last=False)
+
+    def delete(self, key: K) -> None:
+        self.__items.pop(key, None)
+
+    def clear(self) -> None:
+        self.__items.clear()
@@ -31,6 +31,25 @@ class FullReportDto:
     task_title: str
     task_url: str
     photo_url: str
+    thumbnail_url: str | None
+
+
+@dataclass
+class DailyTaskRecipientDto:
+    user_id: UUID
+    telegram_id: int
+    name: str
+    previous_report_not_submitted: bool
+
+
+@dataclass
+class ShiftMemberRecipientDto:
+    member_id: UUID
+    numbers_lombaryers: int
+    user_id: UUID
+    telegram_id: int
+    name: str
+    surname: str
 
 
 @dataclass
@@ -41,6 +60,35 @@ class TasksAnalyticReportDto:
     skipped: int
 
 
+@dataclass
+class MembersAnalyticReportDto:
+    surname: str
+    name: str
+    status: str
+    numbers_lombaryers: int
+
+
+@dataclass
+class DailyCompletionAnalyticReportDto:
+    task_date: date
+    task_title: str
+    total: int
+    approved: int
+    declined: int
+    skipped: int
+    completion_rate: float
+
+
+@dataclass
+class ReviewersAnalyticReportDto:
+    surname: str
+    name: str
+    reviewed: int
+    approved: int
+    declined: int
+    median_review_hours: float
+
+
 @dataclass
 class RequestDTO:
     request_id: UUID
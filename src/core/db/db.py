@@ -1,12 +1,96 @@
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from src.core.settings import settings
 
-engine = create_async_engine(settings.database_url, future=True, echo=True)
+engine = create_async_engine(
+    settings.database_url,
+    future=True,
+    echo=settings.DB_ECHO,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args={
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT)},
+    },
+)
+
+async_session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+# время выдачи (time.monotonic()) соединений, которые сейчас выданы из пула, по id записи соединения
+_checked_out_at: dict[int, float] = {}
+
+
+@event.listens_for(engine.sync_engine, "checkout")
+def _remember_checkout_time(dbapi_connection, connection_record, connection_proxy) -> None:
+    _checked_out_at[id(connection_record)] = time.monotonic()
+
+
+@event.listens_for(engine.sync_engine, "detach")
+def _forget_detached_connection(dbapi_connection, connection_record) -> None:
+    _checked_out_at.pop(id(connection_record), None)
+
+
+@event.listens_for(engine.sync_engine, "checkin")
+def _warn_about_leaked_connection(dbapi_connection, connection_record) -> None:
+    """Предупреждает, если сессия удерживала соединение дольше DB_SESSION_LEAK_THRESHOLD секунд.
+
+    Чаще всего это значит, что сессия не была закрыта и соединение вернулось в пул только при сборке мусора.
+    """
+    checked_out_at = _checked_out_at.pop(id(connection_record), None)
+    if checked_out_at is None or not settings.DB_SESSION_LEAK_THRESHOLD:
+        return
+    duration = time.monotonic() - checked_out_at
+    if duration > settings.DB_SESSION_LEAK_THRESHOLD:
+        logging.warning(
+            f"Соединение с БД удерживалось {duration:.1f} сек., "
+            f"что превышает порог {settings.DB_SESSION_LEAK_THRESHOLD} сек. Возможна утечка сессии."
+        )
+
+
+def get_long_checkouts() -> list[float]:
+    """Возвращает время (в секундах) удержания соединений, выданных из пула дольше DB_SESSION_LEAK_THRESHOLD секунд.
+
+    В отличие от предупреждения при возврате соединения в пул, учитывает и соединения, которые еще не возвращены
+    (например, если сессия так и не была закрыта).
+    """
+    if not settings.DB_SESSION_LEAK_THRESHOLD:
+        return []
+    now = time.monotonic()
+    durations = (now - checked_out_at for checked_out_at in list(_checked_out_at.values()))
+    return sorted((duration for duration in durations if duration > settings.DB_SESSION_LEAK_THRESHOLD), reverse=True)
+
+
+def warn_about_long_checkouts() -> None:
+    """Предупреждает о соединениях, которые удерживаются дольше DB_SESSION_LEAK_THRESHOLD секунд."""
+    durations = get_long_checkouts()
+    if durations:
+        logging.warning(
+            f"Соединений с БД, удерживаемых дольше {settings.DB_SESSION_LEAK_THRESHOLD} сек.: {len(durations)} "
+            f"(максимум {durations[0]:.1f} сек.). Возможна утечка сессии."
+        )
+
+
+@asynccontextmanager
+async def session_scope() -> AsyncIterator[AsyncSession]:
+    """Открывает сессию и гарантированно закрывает ее при выходе из блока.
+
+    Используется в коде бота, где нет зависимостей FastAPI.
+    """
+    async with async_session_factory() as session:
+        yield session
 
 
-async def get_session() -> AsyncSession:
-    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-    async with async_session() as session:
+async def get_session() -> AsyncIterator[AsyncSession]:
+    async with async_session_factory() as session:
         yield session
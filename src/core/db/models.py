@@ -11,13 +11,14 @@ from sqlalchemy import (
     Column,
     Enum,
     Identity,
+    Index,
     Integer,
     String,
     UniqueConstraint,
     func,
     select,
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.ext.declarative import as_declarative
 from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.schema import ForeignKey
@@ -101,6 +102,8 @@ class Task(Base):
     url = Column(String(length=150), unique=True, nullable=False)
     title = Column(String(length=150), unique=True, nullable=False)
     is_archived = Column(Boolean, default=False, nullable=False)
+    telegram_file_id = Column(String(length=255), nullable=True)
+    telegram_file_hash = Column(String(length=64), nullable=True)
     reports = relationship("Report", back_populates="task")
 
     def __repr__(self):
@@ -259,16 +262,24 @@ class Report(Base):
         Enum(Status, name="report_status", values_callable=lambda obj: [e.value for e in obj]),
         nullable=False,
     )
-    report_url = Column(String(length=4096), unique=True, nullable=True)
+    report_url = Column(String(length=4096), nullable=True)
+    # sha256 содержимого фотографии отчёта, по нему определяется повторная отправка фотографии
+    photo_hash = Column(String(length=64), nullable=True)
+    thumbnail_url = Column(String(length=4096), nullable=True)
     uploaded_at = Column(TIMESTAMP, nullable=True)
     number_attempt = Column(Integer, nullable=False, server_default='0')
 
-    __table_args__ = (UniqueConstraint("shift_id", "task_date", "member_id", name="_member_task_uc"),)
+    __table_args__ = (
+        UniqueConstraint("shift_id", "task_date", "member_id", name="_member_task_uc"),
+        Index("ix_reports_shift_id_status_task_date_id", "shift_id", "status", "task_date", "id"),
+        Index("ix_reports_shift_id_task_date_id", "shift_id", "task_date", "id"),
+        Index("ix_reports_photo_hash", "photo_hash", unique=True),
+    )
 
     def __repr__(self):
         return f"<Report: {self.id}, task_date: {self.task_date}, status: {self.status}>"
 
-    def send_report(self, photo_url: str):
+    def send_report(self, photo_url: str, photo_hash: str):
         if self.number_attempt == settings.NUMBER_ATTEMPTS_SUBMIT_REPORT:
             raise exceptions.ExceededAttemptsReportError
         if not photo_url:
@@ -280,6 +291,8 @@ class Report(Base):
             raise exceptions.CannotAcceptReportError
         self.status = Report.Status.REVIEWING.value
         self.report_url = photo_url
+        self.photo_hash = photo_hash
+        self.thumbnail_url = None
         self.uploaded_at = datetime.now()
         self.number_attempt += 1
 
@@ -289,6 +302,27 @@ class Report(Base):
         self.reviewed_at = datetime.now()
 
 
+class TaskReportStats(Base):
+    """Количество принятых, отклонённых и пропущенных отчётов по заданию в смене.
+
+    Обновляется при каждом изменении статуса отчёта, чтобы аналитика
+    не пересчитывала все отчёты за всё время.
+    """
+
+    __tablename__ = "task_report_stats"
+
+    task_id = Column(UUID(as_uuid=True), ForeignKey(Task.id), nullable=False)
+    shift_id = Column(UUID(as_uuid=True), ForeignKey(Shift.id), nullable=False)
+    approved = Column(Integer, nullable=False, server_default='0')
+    declined = Column(Integer, nullable=False, server_default='0')
+    skipped = Column(Integer, nullable=False, server_default='0')
+
+    __table_args__ = (UniqueConstraint("task_id", "shift_id", name="_task_shift_stats_uc"),)
+
+    def __repr__(self):
+        return f"<TaskReportStats: task_id: {self.task_id}, shift_id: {self.shift_id}>"
+
+
 class AdministratorInvitation(Base):
     """Модель приглашения администратора/психолога."""
 
@@ -302,3 +336,117 @@ class AdministratorInvitation(Base):
 
     def __repr__(self) -> str:
         return f"<AdministratorInvitation: {self.id}, email: {self.email}, surname: {self.surname}, name: {self.name}>"
+
+
+class OutboxMessage(Base):
+    """Исходящее сообщение в telegram, ожидающее отправки."""
+
+    class Status(str, enum.Enum):
+        """Статус отправки сообщения."""
+
+        PENDING = "pending"
+        SENT = "sent"
+        FAILED = "failed"
+
+    __tablename__ = "outbox_messages"
+
+    sequence_number = Column(BigInteger, Identity(start=1), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey(User.id), nullable=False)
+    user = relationship("User")
+    telegram_id = Column(BigInteger, nullable=False)
+    text = Column(String(length=4096), nullable=False)
+    photo = Column(String(length=255), nullable=True)
+    reply_markup = Column(JSON, nullable=True)
+    status = Column(
+        Enum(Status, name="outbox_message_status", values_callable=lambda obj: [e.value for e in obj]),
+        default=Status.PENDING.value,
+        nullable=False,
+    )
+    attempt_number = Column(Integer, nullable=False, server_default='0')
+    next_attempt_at = Column(TIMESTAMP, server_default=func.current_timestamp(), nullable=False)
+    sent_at = Column(TIMESTAMP, nullable=True)
+    error = Column(String(length=1024), nullable=True)
+
+    __table_args__ = (
+        Index(
+            "ix_outbox_messages_pending",
+            "telegram_id",
+            "sequence_number",
+            postgresql_where=(status == Status.PENDING.value),
+        ),
+    )
+
+    def __repr__(self):
+        return f"<OutboxMessage: {self.id}, telegram_id: {self.telegram_id}, status: {self.status}>"
+
+
+class AnalyticsExport(Base):
+    """Задача на формирование excel-отчёта аналитики в фоне."""
+
+    class ReportType(str, enum.Enum):
+        """Тип отчёта."""
+
+        FULL = "full"
+        TASKS = "tasks"
+
+    class Status(str, enum.Enum):
+        """Статус формирования отчёта."""
+
+        PENDING = "pending"
+        IN_PROGRESS = "in_progress"
+        DONE = "done"
+        FAILED = "failed"
+
+    __tablename__ = "analytics_exports"
+
+    report_type = Column(
+        Enum(ReportType, name="analytics_report_type", values_callable=lambda obj: [e.value for e in obj]),
+        nullable=False,
+    )
+    status = Column(
+        Enum(Status, name="analytics_export_status", values_callable=lambda obj: [e.value for e in obj]),
+        default=Status.PENDING.value,
+        nullable=False,
+    )
+    administrator_id = Column(UUID(as_uuid=True), ForeignKey(Administrator.id), nullable=False)
+    file_name = Column(String(length=255), nullable=True)
+    error = Column(String(length=1024), nullable=True)
+    started_at = Column(TIMESTAMP, nullable=True)
+    finished_at = Column(TIMESTAMP, nullable=True)
+
+    __table_args__ = (
+        Index(
+            "ix_analytics_exports_unfinished",
+            "created_at",
+            postgresql_where=(status.in_((Status.PENDING.value, Status.IN_PROGRESS.value))),
+        ),
+    )
+
+    def __repr__(self):
+        return f"<AnalyticsExport: {self.id}, report_type: {self.report_type}, status: {self.status}>"
+
+
+class BotPersistenceData(Base):
+    """Данные бота, пользователя или чата telegram, сохраняемые между перезапусками бота."""
+
+    class DataType(str, enum.Enum):
+        """Тип данных."""
+
+        BOT = "bot"
+        CHAT = "chat"
+        USER = "user"
+
+    __tablename__ = "bot_persistence_data"
+
+    data_type = Column(
+        Enum(DataType, name="bot_persistence_data_type", values_callable=lambda obj: [e.value for e in obj]),
+        nullable=False,
+    )
+    # telegram id пользователя или чата, для данных бота - 0
+    key = Column(BigInteger, nullable=False)
+    data = Column(JSONB, nullable=False)
+
+    __table_args__ = (UniqueConstraint("data_type", "key", name="_bot_persistence_data_uc"),)
+
+    def __repr__(self):
+        return f"<BotPersistenceData: {self.data_type}, key: {self.key}>"
@@ -1,9 +1,13 @@
 from .abstract_repository import AbstractRepository  # noqa
 from .administrator_invitation import AdministratorInvitationRepository  # noqa
 from .administrator_repository import AdministratorRepository  # noqa
+from .analytics_export_repository import AnalyticsExportRepository  # noqa
+from .bot_persistence_repository import BotPersistenceRepository  # noqa
 from .member_repository import MemberRepository  # noqa
+from .outbox_repository import OutboxRepository  # noqa
 from .report_repository import ReportRepository  # noqa
 from .request_repository import RequestRepository  # noqa
 from .shift_repository import ShiftRepository  # noqa
+from .task_report_stats_repository import TaskReportStatsRepository  # noqa
 from .task_repository import TaskRepository  # noqa
 from .user_repository import UserRepository  # noqa
@@ -1,8 +1,9 @@
 import abc
-from typing import Optional, TypeVar
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional, Sequence, TypeVar
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import ColumnElement, Row, Select, func, select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -10,6 +11,9 @@ from src.core import exceptions
 
 DatabaseModel = TypeVar("DatabaseModel")
 
+UNIT_OF_WORK_KEY = "unit_of_work"
+STREAM_YIELD_PER = 1000
+
 
 class AbstractRepository(abc.ABC):
     """Абстрактный класс, для реализации паттерна Repository."""
@@ -18,6 +22,50 @@ class AbstractRepository(abc.ABC):
         self._session = session
         self._model = model
 
+    @asynccontextmanager
+    async def unit_of_work(self) -> AsyncIterator[None]:
+        """Выполняет изменения всех репозиториев сессии в одной транзакции.
+
+        Внутри блока репозитории только отправляют изменения в базу (flush),
+        commit выполняется один раз при выходе из блока, а при ошибке - rollback.
+        """
+        if self._session.info.get(UNIT_OF_WORK_KEY):
+            yield
+            return
+        self._session.info[UNIT_OF_WORK_KEY] = True
+        try:
+            yield
+            await self._session.commit()
+        except Exception:
+            await self._session.rollback()
+            raise
+        finally:
+            self._session.info.pop(UNIT_OF_WORK_KEY, None)
+
+    async def _commit(self) -> None:
+        """Фиксирует изменения в базе или, внутри unit_of_work, только отправляет их (flush)."""
+        if self._session.info.get(UNIT_OF_WORK_KEY):
+            await self._session.flush()
+        else:
+            await self._session.commit()
+
+    async def rollback(self) -> None:
+        """Откатывает текущую транзакцию сессии.
+
+        Нужен после ошибки запроса к БД: до отката PostgreSQL отклоняет все запросы прерванной транзакции.
+        Объекты, загруженные в сессию, после отката устаревают и перечитываются из базы при обращении.
+        """
+        await self._session.rollback()
+
+    async def _stream(self, statement: Select) -> AsyncIterator[dict[str, Any]]:
+        """Построчно отдает результат запроса по колонкам в виде словарей.
+
+        Строки читаются из базы серверным курсором порциями по STREAM_YIELD_PER.
+        """
+        rows = await self._session.stream(statement.execution_options(yield_per=STREAM_YIELD_PER))
+        async for row in rows:
+            yield row._asdict()
+
     async def get_or_none(self, instance_id: UUID) -> Optional[DatabaseModel]:
         """Получает из базы объект модели по ID. В случае отсутствия возвращает None."""
         db_obj = await self._session.execute(select(self._model).where(self._model.id == instance_id))
@@ -30,11 +78,27 @@ class AbstractRepository(abc.ABC):
             raise exceptions.ObjectNotFoundError(self._model, instance_id)
         return db_obj
 
+    async def get_for_update(self, instance_id: UUID) -> DatabaseModel:
+        """Получает объект модели по ID и блокирует его строку до конца транзакции (SELECT ... FOR UPDATE).
+
+        Объект перечитывается из базы, даже если уже загружен в сессию. В случае отсутствия объекта бросает ошибку.
+        """
+        db_obj = await self._session.execute(
+            select(self._model)
+            .where(self._model.id == instance_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        db_obj = db_obj.scalars().first()
+        if db_obj is None:
+            raise exceptions.ObjectNotFoundError(self._model, instance_id)
+        return db_obj
+
     async def create(self, instance: DatabaseModel) -> DatabaseModel:
         """Создает новый объект модели и сохраняет в базе."""
         self._session.add(instance)
         try:
-            await self._session.commit()
+            await self._commit()
         except IntegrityError:
             raise exceptions.ObjectAlreadyExistsError(instance)
 
@@ -45,16 +109,53 @@ class AbstractRepository(abc.ABC):
         """Обновляет существующий объект модели в базе."""
         instance.id = instance_id
         instance = await self._session.merge(instance)
-        await self._session.commit()
+        await self._commit()
         return instance  # noqa: R504
 
     async def update_all(self, instances: list[DatabaseModel]) -> list[DatabaseModel]:
         """Обновляет несколько измененных объектов модели в базе."""
         self._session.add_all(instances)
-        await self._session.commit()
+        await self._commit()
         return instances
 
+    async def bulk_update(
+        self,
+        values: dict[str, Any],
+        *criteria: ColumnElement[bool],
+        returning: Sequence[ColumnElement] = (),
+    ) -> list[Row]:
+        """Изменяет все подходящие под условия строки модели одним UPDATE ... RETURNING.
+
+        Объекты в память не загружаются: возвращаются только колонки returning
+        измененных строк, по умолчанию - их id. Условия и returning могут ссылаться на другие таблицы
+        (UPDATE ... FROM). Объекты, уже загруженные в сессию, не обновляются.
+        """
+        updated_rows = await self._session.execute(
+            update(self._model.__table__).where(*criteria).values(**values).returning(*(returning or (self._model.id,)))
+        )
+        updated_rows = updated_rows.all()
+        await self._commit()
+        return updated_rows
+
     async def get_all(self) -> list[DatabaseModel]:
         """Возвращает все объекты модели из базы данных."""
         objects = await self._session.execute(select(self._model))
         return objects.scalars().all()
+
+    async def get_data_version(self, models: Sequence[type]) -> tuple[Any, ...]:
+        """Возвращает время последнего изменения и количество строк в таблицах моделей одним запросом.
+
+        Результат меняется при любом добавлении, изменении или удалении строк
+        и используется для проверки актуальности данных, построенных по этим таблицам.
+
+        Ограничение: updated_at - время начала транзакции, а не ее фиксации. Если транзакция изменила строки,
+        не меняя их количество, и была зафиксирована после того, как версия уже учла более позднее updated_at
+        другой транзакции, результат не изменится. Такие данные считаются актуальными до следующего изменения
+        этих таблиц.
+        """
+        columns = []
+        for model in models:
+            columns.append(select(func.max(model.updated_at)).scalar_subquery())
+            columns.append(select(func.count()).select_from(model).scalar_subquery())
+        data_version = await self._session.execute(select(*columns))
+        return tuple(data_version.one())
@@ -26,6 +26,19 @@ class AdministratorRepository(AbstractRepository):
             raise exceptions.AdministratorNotFoundError
         return administrator
 
+    async def get_detached_by_email(self, email: str) -> Administrator:
+        """Получает из БД администратора по его email и отсоединяет объект от сессии.
+
+        Отсоединённый объект не обращается к сессии, в которой был загружен,
+        поэтому его можно хранить в кэше и использовать в других запросах только для чтения.
+
+        Аргументы:
+            email (str) - email администратора.
+        """
+        administrator = await self.get_by_email(email)
+        self._session.expunge(administrator)
+        return administrator
+
     async def check_administrator_existence(self, email: str) -> bool:
         """Проверяет существование администратора по email.
 
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from uuid import UUID
+
+from fastapi import Depends
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.db.db import get_session
+from src.core.db.models import AnalyticsExport
+from src.core.db.repository import AbstractRepository
+
+ERROR_MAX_LENGTH = AnalyticsExport.error.type.length
+
+
+class AnalyticsExportRepository(AbstractRepository):
+    """Репозиторий для работы с моделью AnalyticsExport."""
+
+    def __init__(self, session: AsyncSession = Depends(get_session)) -> None:
+        super().__init__(session, AnalyticsExport)
+
+    async def take_for_processing(self, timeout: timedelta) -> Optional[AnalyticsExport]:
+        """Взять в работу самую раннюю ожидающую задачу.
+
+        Задача, которая находится в работе дольше timeout (например, процесс был перезапущен),
+        считается прерванной и берётся в работу повторно. Строка блокируется с SKIP LOCKED,
+        поэтому одну задачу не возьмут в работу одновременно несколько процессов.
+        """
+        export_id = (
+            select(AnalyticsExport.id)
+            .where(
+                or_(
+                    AnalyticsExport.status == AnalyticsExport.Status.PENDING,
+                    (AnalyticsExport.status == AnalyticsExport.Status.IN_PROGRESS)
+                    & (AnalyticsExport.started_at < func.current_timestamp() - timeout),
+                )
+            )
+            .order_by(AnalyticsExport.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        export = await self._session.scalar(
+            update(AnalyticsExport)
+            .where(AnalyticsExport.id == export_id)
+            .values(status=AnalyticsExport.Status.IN_PROGRESS, started_at=func.current_timestamp())
+            .returning(AnalyticsExport)
+            .execution_options(populate_existing=True)
+        )
+        await self._commit()
+        return export
+
+    async def set_done(self, export_id: UUID, file_name: str) -> None:
+        """Отметить задачу как выполненную."""
+        await self._session.execute(
+            update(AnalyticsExport)
+            .where(AnalyticsExport.id == export_id)
+            .values(
+                status=AnalyticsExport.Status.DONE,
+                file_name=file_name,
+                error=None,
+                finished_at=func.current_timestamp(),
+            )
+        )
+        await self._commit()
+
+    async def set_failed(self, export_id: UUID, error: str) -> None:
+        """Отметить задачу как невыполненную."""
+        await self._session.execute(
+            update(AnalyticsExport)
+            .where(AnalyticsExport.id == export_id)
+            .values(
+                status=AnalyticsExport.Status.FAILED,
+                error=error[:ERROR_MAX_LENGTH],
+                finished_at=func.current_timestamp(),
+            )
+        )
+        await self._commit()
+
+    async def delete_finished_before(self, finished_at: datetime) -> list[str]:
+        """Удалить задачи, завершённые раньше finished_at. Возвращает имена файлов удалённых отчётов."""
+        file_names = await self._session.scalars(
+            delete(AnalyticsExport)
+            .where(AnalyticsExport.finished_at < finished_at)
+            .returning(AnalyticsExport.file_name)
+        )
+        file_names = [file_name for file_name in file_names.all() if file_name]
+        await self._commit()
+        return file_names
@@ -0,0 +1,56 @@
+from typing import Any, Optional
+
+from fastapi import Depends
+from sqlalchemy import delete, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.db.db import get_session
+from src.core.db.models import BotPersistenceData
+from src.core.db.repository import AbstractRepository
+
+
+class BotPersistenceRepository(AbstractRepository):
+    """Репозиторий для работы с моделью BotPersistenceData."""
+
+    def __init__(self, session: AsyncSession = Depends(get_session)) -> None:
+        super().__init__(session, BotPersistenceData)
+
+    async def get_data(self, data_type: BotPersistenceData.DataType, key: int) -> Optional[dict[str, Any]]:
+        """Возвращает сохранённые данные по типу и ключу или None, если данных нет."""
+        return await self._session.scalar(
+            select(BotPersistenceData.data).where(
+                BotPersistenceData.data_type == data_type, BotPersistenceData.key == key
+            )
+        )
+
+    async def save_changes(
+        self,
+        changes: dict[tuple[BotPersistenceData.DataType, int], Optional[dict[str, Any]]],
+    ) -> None:
+        """Сохраняет изменённые данные в одной транзакции.
+
+        changes - новые данные по типу и ключу, None означает удаление данных.
+        Данные сохраняются одним INSERT ... ON CONFLICT DO UPDATE, удаляются одним DELETE.
+        """
+        rows = [
+            dict(data_type=data_type, key=key, data=data)
+            for (data_type, key), data in changes.items()
+            if data is not None
+        ]
+        deleted_keys = [(data_type, key) for (data_type, key), data in changes.items() if data is None]
+        async with self.unit_of_work():
+            if rows:
+                statement = postgresql_insert(BotPersistenceData).values(rows)
+                await self._session.execute(
+                    statement.on_conflict_do_update(
+                        constraint="_bot_persistence_data_uc",
+                        set_={"data": statement.excluded.data, "updated_at": func.current_timestamp()},
+                    )
+                )
+            if deleted_keys:
+                await self._session.execute(
+                    delete(BotPersistenceData).where(
+                        tuple_(BotPersistenceData.data_type, BotPersistenceData.key).in_(deleted_keys)
+                    )
+                )
@@ -1,12 +1,17 @@
-from datetime import datetime
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Any, AsyncIterator
 from uuid import UUID
 
 from fastapi import Depends
-from sqlalchemy import func, or_, select
+from sqlalchemy import Row, case, distinct, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
 
 from src.core.db.db import get_session
+from src.core.db.DTO_models import DailyTaskRecipientDto, MembersAnalyticReportDto
 from src.core.db.models import Member, Report, Shift, User
 from src.core.db.repository import AbstractRepository
 from src.core.exceptions import ObjectNotFoundError
@@ -36,35 +41,141 @@ class MemberRepository(AbstractRepository):
             raise ObjectNotFoundError(Member, member_id)
         return member
 
-    async def get_members_for_excluding(self, shift_id: UUID, task_amount: int) -> list[Member]:
-        members = await self._session.scalars(
-            select(Member)
+    async def add_lombaryer(self, member_id: UUID) -> None:
+        """Начисляет участнику 1 "ломбарьерчик" атомарным UPDATE без чтения текущего значения."""
+        await self._session.execute(
+            update(Member)
+            .where(Member.id == member_id)
+            .values(numbers_lombaryers=Member.numbers_lombaryers + 1)
+            .execution_options(synchronize_session=False)
+        )
+        await self._commit()
+
+    async def add_lombaryers_for_reports(self, report_ids: list[UUID]) -> None:
+        """Начисляет участникам по 1 "ломбарьерчику" за каждый отчет одним сгруппированным UPDATE."""
+        if not report_ids:
+            return
+        lombaryers = (
+            select(Report.member_id, func.count().label("amount"))
+            .where(Report.id.in_(report_ids))
+            .group_by(Report.member_id)
+            .subquery()
+        )
+        updated_members = await self._session.execute(
+            update(Member)
+            .where(Member.id == lombaryers.c.member_id)
+            .values(numbers_lombaryers=Member.numbers_lombaryers + lombaryers.c.amount)
+            .returning(Member.id, Member.numbers_lombaryers)
+            .execution_options(synchronize_session=False)
+        )
+        # обновляем уже загруженные в сессию объекты участников без дополнительных запросов
+        for member_id, numbers_lombaryers in updated_members.all():
+            member = self._session.identity_map.get(identity_key(Member, member_id))
+            if member is not None:
+                set_committed_value(member, "numbers_lombaryers", numbers_lombaryers)
+        await self._commit()
+
+    async def get_members_analytic_report(self) -> dict[UUID, list[MembersAnalyticReportDto]]:
+        """Рейтинг участников по количеству ломбарьерчиков, сгруппированный по сменам.
+
+        Данные по всем сменам получаются одним запросом, ключ словаря - id смены.
+        """
+        stmt = (
+            select(
+                Member.shift_id,
+                User.surname,
+                User.name,
+                case((Member.status == Member.Status.EXCLUDED, "Исключён"), else_="Активен"),
+                Member.numbers_lombaryers,
+            )
+            .join(Member.user)
+            .order_by(Member.shift_id, Member.numbers_lombaryers.desc(), User.surname, User.name)
+        )
+        members = await self._session.execute(stmt)
+        members_by_shift = defaultdict(list)
+        for shift_id, *member in members.all():
+            members_by_shift[shift_id].append(MembersAnalyticReportDto(*member))
+        return members_by_shift
+
+    async def get_daily_task_recipients(self, shift_id: UUID, previous_task_date: date) -> list[DailyTaskRecipientDto]:
+        """Получатели ежедневного задания: активные участники смены, не заблокировавшие бота.
+
+        Вместо загрузки участников с пользователями и отчетами запрос возвращает только поля,
+        нужные для рассылки, и признак того, что отчет за предыдущий день отклонен или пропущен.
+        """
+        previous_report_not_submitted = (
+            select(Report.id)
+            .where(
+                Report.shift_id == shift_id,
+                Report.task_date == previous_task_date,
+                Report.member_id == Member.id,
+                Report.status.in_([Report.Status.DECLINED, Report.Status.SKIPPED]),
+            )
+            .exists()
+        )
+        recipients = await self._session.execute(
+            select(User.id, User.telegram_id, User.name, previous_report_not_submitted)
+            .select_from(Member)
+            .join(Member.user)
             .where(
                 Member.shift_id == shift_id,
                 Member.status == Member.Status.ACTIVE,
+                User.telegram_blocked.is_(False),
+            )
+        )
+        return [DailyTaskRecipientDto(*recipient) for recipient in recipients.all()]
+
+    async def exclude_lagging_members(self, shift_id: UUID, current_task_date: date, task_amount: int) -> list[Row]:
+        """Исключает из смены активных участников, пропустивших задания task_amount дней подряд.
+
+        Учитываются только task_amount дней, предшествующих current_task_date: участник исключается,
+        если за каждый из этих дней у него есть пропущенный отчет. Участники исключаются одним UPDATE,
+        который возвращает user_id, telegram_id и telegram_blocked их пользователей для уведомления.
+        """
+        lagging_members = (
+            select(Report.member_id)
+            .where(
+                Report.shift_id == shift_id,
                 Report.status == Report.Status.SKIPPED,
-                Report.task_date >= func.current_date() - task_amount,
+                Report.task_date >= current_task_date - timedelta(days=task_amount),
+                Report.task_date < current_task_date,
             )
-            .join(Report)
-            .join(Member.user)
-            .group_by(Member)
-            .having(func.count() >= task_amount)
+            .group_by(Report.member_id)
+            .having(func.count(distinct(Report.task_date)) == task_amount)
+        )
+        return await self.bulk_update(
+            {"status": Member.Status.EXCLUDED},
+            Member.id.in_(lagging_members),
+            Member.shift_id == shift_id,
+            Member.status == Member.Status.ACTIVE,
+            Member.user_id == User.id,
+            returning=(User.id, User.telegram_id, User.telegram_blocked),
         )
-        return members.all()
 
-    async def get_members_for_reminding(self, shift_id: UUID, current_task_date: datetime.date) -> list[Member]:
-        members = await self._session.execute(
-            select(Member)
-            .options(joinedload(Member.user))
-            .join(Report)
+    async def stream_members_for_reminding(
+        self, shift_id: UUID, current_task_date: date
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Построчно отдает получателей напоминания об отчете: user_id, telegram_id, name и surname.
+
+        Получатели - активные участники смены, не отправившие отчет за текущий день.
+        Пользователи, заблокировавшие бота, не возвращаются.
+        """
+        statement = (
+            select(User.id.label("user_id"), User.telegram_id, User.name, User.surname)
+            .select_from(Member)
+            .join(Member.user)
+            .join(Report, Report.member_id == Member.id)
             .where(
                 Member.shift_id == shift_id,
                 Member.status == Member.Status.ACTIVE,
+                Report.shift_id == shift_id,
                 Report.status == Report.Status.WAITING,
                 Report.task_date == current_task_date,
+                User.telegram_blocked.is_(False),
             )
         )
-        return members.scalars().all()
+        async for member in self._stream(statement):
+            yield member
 
     async def is_unreviewed_report_exists(self, member_id: UUID) -> bool:
         """Проверка, есть ли у пользователя непроверенные задания в смене."""
@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta
+from typing import Any
+from uuid import UUID
+
+from fastapi import Depends
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from src.core.db.db import get_session
+from src.core.db.models import OutboxMessage
+from src.core.db.repository import AbstractRepository
+
+ERROR_MAX_LENGTH = OutboxMessage.error.type.length
+
+
+class OutboxRepository(AbstractRepository):
+    """Репозиторий для работы с моделью OutboxMessage."""
+
+    def __init__(self, session: AsyncSession = Depends(get_session)) -> None:
+        super().__init__(session, OutboxMessage)
+
+    async def create_all(self, messages: list[dict[str, Any]]) -> None:
+        """Добавляет сообщения в очередь на отправку одним INSERT-запросом."""
+        if not messages:
+            return
+        await self._session.execute(insert(OutboxMessage), messages)
+        await self._commit()
+
+    async def take_for_sending(self, limit: int, timeout: timedelta) -> list[OutboxMessage]:
+        """Взять в работу сообщения, готовые к отправке.
+
+        Для каждого чата берется только самое раннее неотправленное сообщение, поэтому
+        следующее сообщение в чат уходит только после того, как обработано предыдущее.
+        Взятым сообщениям время следующей попытки сдвигается на timeout, поэтому другие процессы
+        их не возьмут, а сообщение, отправка которого прервалась, будет взято повторно через timeout.
+        Строки блокируются с SKIP LOCKED, поэтому одно сообщение не возьмут одновременно несколько процессов.
+        """
+        first_pending_messages = (
+            select(OutboxMessage.id)
+            .where(OutboxMessage.status == OutboxMessage.Status.PENDING)
+            .distinct(OutboxMessage.telegram_id)
+            .order_by(OutboxMessage.telegram_id, OutboxMessage.sequence_number)
+        )
+        message_ids = (
+            select(OutboxMessage.id)
+            .where(
+                OutboxMessage.id.in_(first_pending_messages),
+                # условия повторяются здесь, чтобы после ожидания блокировки они перепроверялись на новой версии строки
+                OutboxMessage.status == OutboxMessage.Status.PENDING,
+                OutboxMessage.next_attempt_at <= func.current_timestamp(),
+            )
+            .order_by(OutboxMessage.sequence_number)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        message_ids = await self._session.scalars(
+            update(OutboxMessage)
+            .where(OutboxMessage.id.in_(message_ids))
+            .values(next_attempt_at=func.current_timestamp() + timeout)
+            .returning(OutboxMessage.id)
+        )
+        message_ids = message_ids.all()
+        await self._commit()
+        if not message_ids:
+            return []
+        messages = await self._session.scalars(
+            select(OutboxMessage)
+            .where(OutboxMessage.id.in_(message_ids))
+            .order_by(OutboxMessage.sequence_number)
+            .options(selectinload(OutboxMessage.user))
+            .execution_options(populate_existing=True)
+        )
+        return messages.all()
+
+    async def set_sent(self, message_ids: list[UUID]) -> None:
+        """Отметить сообщения как отправленные."""
+        if not message_ids:
+            return
+        await self._session.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id.in_(message_ids))
+            .values(status=OutboxMessage.Status.SENT, sent_at=func.current_timestamp(), error=None)
+        )
+        await self._commit()
+
+    async def set_failed(self, message_id: UUID, error: str) -> None:
+        """Отметить сообщение как неотправленное."""
+        await self._session.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id == message_id)
+            .values(
+                status=OutboxMessage.Status.FAILED,
+                attempt_number=OutboxMessage.attempt_number + 1,
+                error=error[:ERROR_MAX_LENGTH],
+            )
+        )
+        await self._commit()
+
+    async def postpone(self, message_id: UUID, delay: timedelta, error: str) -> None:
+        """Отложить повторную отправку сообщения."""
+        await self._session.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id == message_id)
+            .values(
+                attempt_number=OutboxMessage.attempt_number + 1,
+                next_attempt_at=func.current_timestamp() + delay,
+                error=error[:ERROR_MAX_LENGTH],
+            )
+        )
+        await self._commit()
+
+    async def delete_sent_before(self, sent_at: datetime) -> None:
+        """Удалить сообщения, отправленные раньше sent_at."""
+        await self._session.execute(
+            delete(OutboxMessage)
+            .where(OutboxMessage.status == OutboxMessage.Status.SENT, OutboxMessage.sent_at < sent_at)
+            .execution_options(synchronize_session=False)
+        )
+        await self._commit()
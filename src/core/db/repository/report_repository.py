@@ -1,18 +1,55 @@
-from datetime import timedelta
-from typing import Optional, Sequence
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Optional, Sequence
 from uuid import UUID
 
 from fastapi import Depends
-from sqlalchemy import desc, exists, select
+from sqlalchemy import (
+    Numeric,
+    Select,
+    bindparam,
+    cast,
+    desc,
+    extract,
+    func,
+    literal,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from src.core import exceptions
-from src.core.db import DTO_models
 from src.core.db.db import get_session
-from src.core.db.models import Member, Report, Shift, Task, User
+from src.core.db.DTO_models import (
+    DailyCompletionAnalyticReportDto,
+    ReviewersAnalyticReportDto,
+)
+from src.core.db.models import Administrator, Member, Report, Shift, Task, User
 from src.core.db.repository import AbstractRepository
 from src.core.utils import get_current_task_date
 
+REPORT_SUMMARY_COLUMNS = {
+    "shift_id": Report.shift_id,
+    "shift_status": Shift.status,
+    "shift_started_at": Shift.started_at,
+    "report_id": Report.id,
+    "report_status": Report.status,
+    "report_created_at": Report.created_at,
+    "report_uploaded_at": Report.uploaded_at,
+    "updated_by": Report.updated_by,
+    "report_reviewed_at": Report.reviewed_at,
+    "user_name": User.name,
+    "user_surname": User.surname,
+    "task_id": Report.task_id,
+    "task_title": Task.title,
+    "task_url": Task.url,
+    "photo_url": Report.report_url,
+    "thumbnail_url": Report.thumbnail_url,
+}
+
 
 class ReportRepository(AbstractRepository):
     """Репозиторий для работы с моделью Report."""
@@ -20,9 +57,60 @@ class ReportRepository(AbstractRepository):
     def __init__(self, session: AsyncSession = Depends(get_session)) -> None:
         super().__init__(session, Report)
 
-    async def get_by_report_url(self, url: str) -> Report:
-        reports = await self._session.execute(select(Report).where(Report.report_url == url))
-        return reports.scalars().first()
+    async def get_without_thumbnail(self, after_id: Optional[UUID], limit: int) -> list[tuple[UUID, str]]:
+        """Получить id и url фото отчётов, для которых нет превью, в порядке id после after_id."""
+        statement = select(Report.id, Report.report_url).where(
+            Report.report_url.is_not(None), Report.thumbnail_url.is_(None)
+        )
+        if after_id:
+            statement = statement.where(Report.id > after_id)
+        reports = await self._session.execute(statement.order_by(Report.id).limit(limit))
+        return reports.all()
+
+    async def set_thumbnail_urls(self, thumbnail_urls: dict[UUID, str]) -> None:
+        """Сохранить url превью фото отчётов одним запросом.
+
+        Время изменения отчёта не меняется: превью не влияет на данные отчёта и аналитику.
+        """
+        if not thumbnail_urls:
+            return
+        reports = Report.__table__
+        await self._session.execute(
+            update(reports)
+            .where(reports.c.id == bindparam("report_id"))
+            .values(thumbnail_url=bindparam("thumbnail_url"), updated_at=reports.c.updated_at),
+            [dict(report_id=report_id, thumbnail_url=url) for report_id, url in thumbnail_urls.items()],
+        )
+        await self._commit()
+
+    async def exists_by_photo_hash(self, photo_hash: str) -> bool:
+        """Проверяет, есть ли отчёт с фотографией с таким хэшем."""
+        return await self._session.scalar(select(select(Report.id).where(Report.photo_hash == photo_hash).exists()))
+
+    async def get_for_review(self, report_ids: list[UUID]) -> list[Report]:
+        """Получить отчеты вместе с участниками, их пользователями и сменами.
+
+        Строки отчетов блокируются до конца транзакции, чтобы один отчет нельзя было проверить дважды.
+        """
+        reports = await self._session.scalars(
+            select(Report)
+            .where(Report.id.in_(report_ids))
+            .options(selectinload(Report.member).selectinload(Member.user))
+            .options(selectinload(Report.member).selectinload(Member.shift))
+            .with_for_update(of=Report)
+        )
+        return reports.all()
+
+    async def set_reviewed(self, report_ids: list[UUID], status: Report.Status, administrator_id: UUID) -> None:
+        """Установить статус проверенным отчетам одним UPDATE."""
+        if not report_ids:
+            return
+        await self._session.execute(
+            update(Report)
+            .where(Report.id.in_(report_ids))
+            .values(status=status, updated_by=administrator_id, reviewed_at=datetime.now())
+        )
+        await self._commit()
 
     async def get_all_tasks_id_under_review(self) -> Optional[list[UUID]]:
         """Получить список id непроверенных задач."""
@@ -33,41 +121,148 @@ class ReportRepository(AbstractRepository):
 
     async def create_all(self, reports_list: list[Report]) -> Report:
         self._session.add_all(reports_list)
-        await self._session.commit()
+        await self._commit()
         return reports_list
 
-    async def get_summaries_of_reports(self, shift_id: UUID, status: Report.Status) -> list[DTO_models.FullReportDto]:
-        """Получить отчеты участников по id смены с url фото выполненного задания."""
-        stmt = select(
-            Shift.id,
-            Shift.status,
-            Shift.started_at,
-            Report.id,
-            Report.status,
-            Report.created_at,
-            Report.uploaded_at,
-            Report.updated_by,
-            Report.reviewed_at,
-            User.name,
-            User.surname,
-            Report.task_id,
-            Task.title,
-            Task.url,
-            Report.report_url.label("photo_url"),
+    async def create_daily_reports(self, shift_id: UUID, task_id: UUID, task_date: date) -> None:
+        """Создает отчеты со статусом waiting всем активным участникам смены одним INSERT ... SELECT.
+
+        Уже созданные на эту дату отчеты не изменяются, поэтому повторный вызов безопасен.
+        """
+        await self._session.execute(
+            postgresql_insert(Report)
+            .from_select(
+                ["id", "shift_id", "member_id", "task_id", "task_date", "status"],
+                select(
+                    func.gen_random_uuid(),
+                    Member.shift_id,
+                    Member.id,
+                    literal(task_id, Report.task_id.type),
+                    literal(task_date, Report.task_date.type),
+                    literal(Report.Status.WAITING, Report.status.type),
+                ).where(Member.shift_id == shift_id, Member.status == Member.Status.ACTIVE),
+            )
+            .on_conflict_do_nothing(constraint="_member_task_uc")
+        )
+        await self._commit()
+
+    async def get_summaries_of_reports(
+        self,
+        shift_id: UUID,
+        status: Report.Status,
+        fields: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[UUID] = None,
+    ) -> list[dict[str, Any]]:
+        """Получить отчеты участников по id смены с url фото выполненного задания.
+
+        Отчеты отсортированы по убыванию (task_date, id). Выбираются только запрошенные поля (по умолчанию все)
+        и id отчета, таблицы присоединяются только если нужны для запрошенных полей.
+        Если передан cursor (id последнего отчета предыдущей страницы), возвращаются отчеты после него.
+        """
+        reports = await self._session.execute(
+            self.__get_summaries_of_reports_statement(shift_id, status, fields, limit, cursor)
         )
+        return [report._asdict() for report in reports.all()]
+
+    async def stream_summaries_of_reports(
+        self,
+        shift_id: UUID,
+        status: Report.Status,
+        fields: Optional[Sequence[str]] = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Построчно отдает отчеты участников смены, не загружая весь список в память."""
+        async for report in self._stream(self.__get_summaries_of_reports_statement(shift_id, status, fields)):
+            yield report
+
+    @staticmethod
+    def __get_summaries_of_reports_statement(
+        shift_id: UUID,
+        status: Report.Status,
+        fields: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[UUID] = None,
+    ) -> Select:
+        fields = list(dict.fromkeys(("report_id", *(fields or REPORT_SUMMARY_COLUMNS))))
+        columns = [REPORT_SUMMARY_COLUMNS[field] for field in fields]
+        stmt = select(*(column.label(field) for field, column in zip(fields, columns))).select_from(Report)
+        tables = {column.table for column in columns}
+        if Shift.__table__ in tables:
+            stmt = stmt.join(Shift, Report.shift_id == Shift.id)
+        if User.__table__ in tables:
+            stmt = stmt.join(Member, Report.member_id == Member.id).join(User, Member.user_id == User.id)
+        if Task.__table__ in tables:
+            stmt = stmt.join(Task, Report.task_id == Task.id)
         if shift_id:
             stmt = stmt.where(Report.shift_id == shift_id)
         if status:
             stmt = stmt.where(Report.status == status)
-        stmt = stmt.join(Shift).join(Member).join(User).join(Task).order_by(desc(Shift.started_at))
-        stmt = stmt.where(
-            Report.shift_id == Shift.id,
-            Report.member_id == Member.id,
-            Report.task_id == Task.id,
-            Member.user_id == User.id,
+        if cursor:
+            cursor_task_date = select(Report.task_date).where(Report.id == cursor).scalar_subquery()
+            stmt = stmt.where(tuple_(Report.task_date, Report.id) < tuple_(cursor_task_date, cursor))
+        return stmt.order_by(desc(Report.task_date), desc(Report.id)).limit(limit)
+
+    async def get_daily_completion_analytic_report(self) -> dict[UUID, list[DailyCompletionAnalyticReportDto]]:
+        """Выполнение заданий по дням, сгруппированное по сменам.
+
+        Процент выполнения - доля принятых отчётов от всех отчётов участников за день.
+        Данные по всем сменам получаются одним запросом, ключ словаря - id смены.
+        """
+        total = func.count()
+        approved = func.count().filter(Report.status == Report.Status.APPROVED)
+        stmt = (
+            select(
+                Report.shift_id,
+                Report.task_date,
+                Task.title,
+                total,
+                approved,
+                func.count().filter(Report.status == Report.Status.DECLINED),
+                func.count().filter(Report.status == Report.Status.SKIPPED),
+                func.round(cast(approved * 100, Numeric) / total, 1),
+            )
+            .join(Report.task)
+            .where(Report.status != Report.Status.NOT_PARTICIPATE)
+            .group_by(Report.shift_id, Report.task_date, Task.title)
+            .order_by(Report.shift_id, Report.task_date)
+        )
+        reports = await self._session.execute(stmt)
+        days_by_shift = defaultdict(list)
+        for shift_id, *day in reports.all():
+            days_by_shift[shift_id].append(DailyCompletionAnalyticReportDto(*day))
+        return days_by_shift
+
+    async def get_reviewers_analytic_report(self) -> dict[UUID, list[ReviewersAnalyticReportDto]]:
+        """Количество проверенных каждым администратором отчётов и медианное время проверки в часах.
+
+        Время проверки считается от загрузки отчёта участником до его проверки.
+        Данные по всем сменам получаются одним запросом, ключ словаря - id смены.
+        """
+        review_seconds = extract("epoch", Report.reviewed_at - Report.uploaded_at)
+        stmt = (
+            select(
+                Report.shift_id,
+                Administrator.surname,
+                Administrator.name,
+                func.count(),
+                func.count().filter(Report.status == Report.Status.APPROVED),
+                func.count().filter(Report.status == Report.Status.DECLINED),
+                func.round(cast(func.percentile_cont(0.5).within_group(review_seconds) / 3600, Numeric), 2),
+            )
+            .join(Administrator, Administrator.id == Report.updated_by)
+            .where(
+                Report.status.in_((Report.Status.APPROVED, Report.Status.DECLINED)),
+                Report.reviewed_at.is_not(None),
+                Report.uploaded_at.is_not(None),
+            )
+            .group_by(Report.shift_id, Administrator.id)
+            .order_by(Report.shift_id, func.count().desc())
         )
         reports = await self._session.execute(stmt)
-        return [DTO_models.FullReportDto(*report) for report in reports.all()]
+        reviewers_by_shift = defaultdict(list)
+        for shift_id, *reviewer in reports.all():
+            reviewers_by_shift[shift_id].append(ReviewersAnalyticReportDto(*reviewer))
+        return reviewers_by_shift
 
     async def get_current_report(self, user_id: UUID) -> Report:
         """Получить текущий отчет по id пользователя."""
@@ -81,26 +276,3 @@ class ReportRepository(AbstractRepository):
         if not report:
             raise exceptions.CurrentTaskNotFoundError()
         return report
-
-    async def get_waiting_reports(self) -> Sequence[Report]:
-        reports = await self._session.execute(select(Report).where(Report.status == Report.Status.WAITING))
-        return reports.scalars().all()
-
-    async def set_status_to_reports(self, reports_list: Sequence[Report], status: Report.Status) -> None:
-        for report in reports_list:
-            report.status = status
-        self._session.add_all(reports_list)
-        await self._session.commit()
-
-    async def is_previous_report_not_submitted(self, member_id: UUID) -> bool:
-        """Проверить статус вчерашнего отчета по id участника смены."""
-        yesterday = get_current_task_date() - timedelta(days=1)
-        exists_criteria = select(
-            exists(Report).where(
-                Report.member_id == member_id,
-                Report.task_date == yesterday,
-                Report.status.in_([Report.Status.DECLINED, Report.Status.SKIPPED]),
-            )
-        )
-        report_exists = await self._session.execute(exists_criteria)
-        return report_exists.scalar()
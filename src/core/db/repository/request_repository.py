@@ -1,9 +1,9 @@
 from http import HTTPStatus
-from typing import Optional
+from typing import Any, AsyncIterator, Optional
 from uuid import UUID
 
 from fastapi import Depends, HTTPException
-from sqlalchemy import or_, select
+from sqlalchemy import Select, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -43,7 +43,17 @@ class RequestRepository(AbstractRepository):
         return request.scalars().first()
 
     async def get_requests_list(self, status: Optional[Request.Status]) -> list[RequestDTO]:
-        statement = select(
+        requests = await self._session.execute(self.__get_requests_list_statement(status))
+        return [RequestDTO.parse_from_db(request) for request in requests.all()]
+
+    async def stream_requests_list(self, status: Optional[Request.Status]) -> AsyncIterator[dict[str, Any]]:
+        """Построчно отдает заявки, не загружая весь список в память."""
+        async for request in self._stream(self.__get_requests_list_statement(status)):
+            yield request
+
+    @staticmethod
+    def __get_requests_list_statement(status: Optional[Request.Status]) -> Select:
+        return select(
             Request.user_id,
             User.name,
             User.surname,
@@ -57,5 +67,3 @@ class RequestRepository(AbstractRepository):
             or_(status is None, Request.status == status),
             Request.user_id == User.id,
         )
-        requests = await self._session.execute(statement)
-        return [RequestDTO.parse_from_db(request) for request in requests.all()]
@@ -1,9 +1,9 @@
 from datetime import date, timedelta
-from typing import Optional
+from typing import Any, AsyncIterator, Collection, Optional
 from uuid import UUID
 
 from fastapi import Depends
-from sqlalchemy import and_, func, or_, select
+from sqlalchemy import Select, and_, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload, subqueryload
 
@@ -11,6 +11,7 @@ from src.api.request_models.shift import ShiftSortRequest
 from src.api.response_models.shift import ShiftDtoResponse
 from src.core import exceptions
 from src.core.db.db import get_session
+from src.core.db.DTO_models import ShiftMemberRecipientDto
 from src.core.db.models import Member, Report, Request, Shift, User
 from src.core.db.repository import AbstractRepository
 from src.core.settings import settings
@@ -46,8 +47,41 @@ class ShiftRepository(AbstractRepository):
             raise exceptions.ObjectNotFoundError(Shift, id)
         return request
 
+    async def get_members_recipients(
+        self, id: UUID, member_status: Member.Status, members_ids: Optional[Collection[UUID]] = None
+    ) -> list[ShiftMemberRecipientDto]:
+        """Получить участников смены с выбранным статусом в виде данных для рассылки.
+
+        В отличие от get_with_members не загружает отчеты участников, а возвращает только поля,
+        нужные для сообщения. Пользователи, заблокировавшие бота, не возвращаются.
+
+        Аргументы:
+            id (UUID) - id смены (shift)
+            member_status (Member.Status) - статус участника смены
+            members_ids (Optional[Collection[UUID]]) - id участников, если нужны не все участники смены.
+        """
+        statement = (
+            select(Member.id, Member.numbers_lombaryers, User.id, User.telegram_id, User.name, User.surname)
+            .join(Member.user)
+            .where(Member.shift_id == id, Member.status == member_status, User.telegram_blocked.is_(False))
+        )
+        if members_ids is not None:
+            statement = statement.where(Member.id.in_(members_ids))
+        members = await self._session.execute(statement)
+        return [ShiftMemberRecipientDto(*member) for member in members.all()]
+
     async def list_all_requests(self, id: UUID, status: Optional[Request.Status]) -> list[ShiftDtoResponse]:
-        db_list_request = await self._session.execute(
+        db_list_request = await self._session.execute(self.__get_all_requests_statement(id, status))
+        return db_list_request.all()
+
+    async def stream_all_requests(self, id: UUID, status: Optional[Request.Status]) -> AsyncIterator[dict[str, Any]]:
+        """Построчно отдает заявки смены, не загружая весь список в память."""
+        async for request in self._stream(self.__get_all_requests_statement(id, status)):
+            yield request
+
+    @staticmethod
+    def __get_all_requests_statement(id: UUID, status: Optional[Request.Status]) -> Select:
+        return (
             select(
                 Request.user_id,
                 Request.id.label("request_id"),
@@ -66,7 +100,6 @@ class ShiftRepository(AbstractRepository):
                 or_(status is None, Request.status == status),
             )
         )
-        return db_list_request.all()
 
     async def get_shifts_with_total_users(
         self,
@@ -121,21 +154,6 @@ class ShiftRepository(AbstractRepository):
         statement = select(Shift).where(Shift.status == status)
         return (await self._session.scalars(statement)).first()
 
-    async def get_shift_with_request(self, id: UUID) -> Shift:
-        """Получить смену (Shift) по её id вместе со связанными данными.
-
-        Связанные данные: Shift -> Request.
-
-        Аргументы:
-            id (UUID) - id смены (shift)
-        """
-        statement = select(Shift).where(Shift.id == id).options(selectinload(Shift.requests))
-        request = await self._session.execute(statement)
-        request = request.scalars().first()
-        if request is None:
-            raise exceptions.ObjectNotFoundError(Shift, id)
-        return request
-
     async def check_shift_existence(self, shift_id: UUID) -> bool:
         shift_exists = await self._session.execute(select(select(Shift).where(Shift.id == shift_id).exists()))
         return shift_exists.scalar()
@@ -161,31 +179,6 @@ class ShiftRepository(AbstractRepository):
         )
         return shift.scalars().first()
 
-    async def get_with_members_and_unreviewed_reports(self, shift_id: UUID) -> Shift:
-        """Возвращает смену с активными участниками и их непроверенными заданиями."""
-        members_id = (
-            select(Member.id)
-            .join(Report)
-            .where(
-                Member.shift_id == shift_id,
-                Member.status == Member.Status.ACTIVE,
-                Report.member_id == Member.id,
-                Report.status == Report.Status.REVIEWING,
-            )
-            .group_by(Member.id)
-            .subquery()
-        )
-        member_stmt = Shift.members.and_(Member.id.in_(members_id))
-        shift = await self._session.execute(
-            select(Shift)
-            .where(Shift.id == shift_id)
-            .options(subqueryload(member_stmt).subqueryload(Member.user))
-            .options(
-                subqueryload(member_stmt).subqueryload(Member.reports.and_(Report.status == Report.Status.REVIEWING))
-            )
-        )
-        return shift.scalars().first()
-
     async def is_unreviewed_report_exists(self, shift_id: UUID) -> bool:
         """Проверяет, остались ли непроверенные задачи в смене."""
         stmt = select(Report).where(Report.status == Report.Status.REVIEWING, Report.shift_id == shift_id)
@@ -211,3 +204,16 @@ class ShiftRepository(AbstractRepository):
             ),
         )
         return await self._session.scalar(statement)
+
+    async def get_shifts_for_analytics(self) -> list[Shift]:
+        """Возвращает начатые, ожидающие закрытия и завершённые смены в порядке их начала."""
+        statement = (
+            select(Shift)
+            .where(
+                Shift.status.in_(
+                    (Shift.Status.STARTED, Shift.Status.READY_FOR_COMPLETE, Shift.Status.FINISHED),
+                ),
+            )
+            .order_by(Shift.started_at, Shift.sequence_number)
+        )
+        return (await self._session.scalars(statement)).all()
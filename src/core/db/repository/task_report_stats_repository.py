@@ -0,0 +1,85 @@
+from collections import defaultdict
+from typing import Iterable, Optional
+from uuid import UUID
+
+from fastapi import Depends
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.db.db import get_session
+from src.core.db.models import Report, TaskReportStats
+from src.core.db.repository import AbstractRepository
+
+# статусы отчётов, которые учитываются в статистике, и соответствующие им колонки
+STATS_COLUMNS = {
+    Report.Status.APPROVED: "approved",
+    Report.Status.DECLINED: "declined",
+    Report.Status.SKIPPED: "skipped",
+}
+
+# изменение статуса отчёта: task_id, shift_id, статус до изменения, статус после изменения
+ReportStatusChange = tuple[UUID, UUID, Optional[Report.Status], Report.Status]
+
+
+class TaskReportStatsRepository(AbstractRepository):
+    """Репозиторий для работы с моделью TaskReportStats."""
+
+    def __init__(self, session: AsyncSession = Depends(get_session)) -> None:
+        super().__init__(session, TaskReportStats)
+
+    async def add_status_changes(self, changes: Iterable[ReportStatusChange]) -> None:
+        """Учитывает в статистике изменения статусов отчётов.
+
+        Изменения сворачиваются в приращения счётчиков по заданию и смене
+        и применяются одним INSERT ... ON CONFLICT DO UPDATE.
+        """
+        deltas = defaultdict(lambda: dict.fromkeys(STATS_COLUMNS.values(), 0))
+        for task_id, shift_id, old_status, new_status in changes:
+            if old_status in STATS_COLUMNS:
+                deltas[task_id, shift_id][STATS_COLUMNS[old_status]] -= 1
+            if new_status in STATS_COLUMNS:
+                deltas[task_id, shift_id][STATS_COLUMNS[new_status]] += 1
+        rows = [
+            dict(task_id=task_id, shift_id=shift_id, **counters)
+            for (task_id, shift_id), counters in deltas.items()
+            if any(counters.values())
+        ]
+        if not rows:
+            return
+        statement = postgresql_insert(TaskReportStats).values(rows)
+        statement = statement.on_conflict_do_update(
+            constraint="_task_shift_stats_uc",
+            set_={
+                **{
+                    column: getattr(TaskReportStats, column) + getattr(statement.excluded, column)
+                    for column in STATS_COLUMNS.values()
+                },
+                "updated_at": func.current_timestamp(),
+            },
+        )
+        await self._session.execute(statement)
+        await self._commit()
+
+    async def rebuild(self) -> None:
+        """Пересчитывает статистику по всем отчётам.
+
+        На время пересчёта таблица блокируется на запись, чтобы изменения статусов
+        из параллельных транзакций не потерялись и не были учтены дважды.
+        """
+        async with self.unit_of_work():
+            await self._session.execute(text(f"LOCK TABLE {TaskReportStats.__tablename__} IN EXCLUSIVE MODE"))
+            await self._session.execute(delete(TaskReportStats))
+            await self._session.execute(
+                insert(TaskReportStats).from_select(
+                    ["id", "task_id", "shift_id", *STATS_COLUMNS.values()],
+                    select(
+                        func.gen_random_uuid(),
+                        Report.task_id,
+                        Report.shift_id,
+                        *(func.count().filter(Report.status == status) for status in STATS_COLUMNS),
+                    )
+                    .group_by(Report.task_id, Report.shift_id)
+                    .having(func.count().filter(Report.status.in_(STATS_COLUMNS)) > 0),
+                )
+            )
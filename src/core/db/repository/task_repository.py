@@ -6,7 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.db.db import get_session
 from src.core.db.DTO_models import TasksAnalyticReportDto
-from src.core.db.models import Report, Task
+from src.core.db.models import Report, Task, TaskReportStats
 from src.core.db.repository import AbstractRepository
 
 
@@ -27,15 +27,18 @@ class TaskRepository(AbstractRepository):
         Содержит:
         - список всех задач;
         - общее количество принятых/отклонённых/не предоставленных отчётов по каждому заданию.
+
+        Количество отчётов берется из накопленной статистики TaskReportStats,
+        поэтому запрос не зависит от общего количества отчётов.
         """
         stmt = (
             select(
                 Task.title,
-                func.count().filter(Report.status == Report.Status.APPROVED).label(Report.Status.APPROVED),
-                func.count().filter(Report.status == Report.Status.DECLINED).label(Report.Status.DECLINED),
-                func.count().filter(Report.status == Report.Status.SKIPPED).label(Report.Status.SKIPPED),
+                func.sum(TaskReportStats.approved).label(Report.Status.APPROVED),
+                func.sum(TaskReportStats.declined).label(Report.Status.DECLINED),
+                func.sum(TaskReportStats.skipped).label(Report.Status.SKIPPED),
             )
-            .join(Task.reports)
+            .join(TaskReportStats, TaskReportStats.task_id == Task.id)
             .group_by(Task.id)
         )
         tasks = await self._session.execute(stmt)
@@ -1,8 +1,8 @@
-from typing import Optional
+from typing import Any, AsyncIterator, Optional
 from uuid import UUID
 
 from fastapi import Depends
-from sqlalchemy import asc, case, desc, func, or_, select
+from sqlalchemy import Select, asc, case, desc, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.api.request_models.user import UserDescAscSortRequest, UserFieldSortRequest
@@ -75,8 +75,27 @@ class UserRepository(AbstractRepository):
         field_sort: Optional[UserFieldSortRequest] = None,
         direction_sort: Optional[UserDescAscSortRequest] = None,
     ) -> list[User]:
+        users = await self._session.execute(self.__get_users_with_status_statement(status, field_sort, direction_sort))
+        return users.all()
+
+    async def stream_users_with_status(
+        self,
+        status: Optional[User.Status] = None,
+        field_sort: Optional[UserFieldSortRequest] = None,
+        direction_sort: Optional[UserDescAscSortRequest] = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Построчно отдает пользователей со статусом, не загружая весь список в память."""
+        async for user in self._stream(self.__get_users_with_status_statement(status, field_sort, direction_sort)):
+            yield user
+
+    @staticmethod
+    def __get_users_with_status_statement(
+        status: Optional[User.Status],
+        field_sort: Optional[UserFieldSortRequest],
+        direction_sort: Optional[UserDescAscSortRequest],
+    ) -> Select:
         sorting = {'desc': desc, 'asc': asc}
-        users = await self._session.execute(
+        return (
             select(
                 User.id,
                 User.name,
@@ -102,7 +121,6 @@ class UserRepository(AbstractRepository):
             )
             .order_by(sorting[direction_sort.value if direction_sort else 'asc'](field_sort or User.created_at))
         )
-        return users.all()
 
     async def get_users_by_shift_id(self, shift_id: UUID) -> list[User]:
         users = await self._session.execute(
@@ -34,6 +34,10 @@ class NotFoundError(ApplicationError):
     status_code: HTTPStatus = HTTPStatus.NOT_FOUND
 
 
+class TooManyRequestsError(ApplicationError):
+    status_code: HTTPStatus = HTTPStatus.TOO_MANY_REQUESTS
+
+
 class NotValidValueError(ApplicationError):
     """Исключение для невалидных данных."""
 
@@ -109,6 +113,10 @@ class ReportWaitingPhotoError(NotFoundError):
     detail = "К заданию нет отчета участника."
 
 
+class ReportsCursorError(BadRequestError):
+    detail = "Курсор относится к отчету другой смены."
+
+
 class ShiftStartError(BadRequestError):
     def __init__(self, shift: Shift):
         self.detail = "Невозможно начать смену {!r}. Проверьте статус смены".format(shift)
@@ -207,6 +215,12 @@ class InvalidAuthenticationDataError(BadRequestError):
     detail = "Неверный email или пароль."
 
 
+class TooManyLoginAttemptsError(TooManyRequestsError):
+    """Превышено количество попыток входа с одного email или IP-адреса."""
+
+    detail = "Слишком много попыток входа. Попробуйте позже."
+
+
 class AdministratorBlockedError(ForbiddenError):
     """Попытка аутентификации заблокированного пользователя."""
 
@@ -260,3 +274,7 @@ class AdministratorBlockError(ForbiddenError):
 
 class AdministratorSelfBlockError(ForbiddenError):
     detail = "Вы не можете заблокировать себя."
+
+
+class AnalyticsExportFileNotFoundError(NotFoundError):
+    detail = "Файл отчёта не найден. Сформируйте отчёт заново."
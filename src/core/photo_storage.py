@@ -0,0 +1,112 @@
+import asyncio
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import BinaryIO
+from urllib.parse import urljoin
+
+from fastapi.concurrency import run_in_threadpool
+from PIL import Image, ImageOps
+from telegram import File
+
+from src.core.settings import settings
+
+PHOTOS_DIR = "photos"
+THUMBNAIL_SUFFIX = ".thumb.jpg"
+# создание превью нагружает процессор, поэтому количество одновременно создаваемых превью ограничено
+THUMBNAILS_EXECUTOR = ThreadPoolExecutor(max_workers=settings.THUMBNAIL_WORKERS, thread_name_prefix="thumbnails")
+
+
+class HashingWriter:
+    """Файловый объект, который считает sha256 записываемых данных и передаёт их дальше."""
+
+    def __init__(self, out: BinaryIO) -> None:
+        self.__out = out
+        self.__hash = hashlib.sha256()
+
+    def write(self, data: bytes) -> int:
+        self.__hash.update(data)
+        return self.__out.write(data)
+
+    def hexdigest(self) -> str:
+        return self.__hash.hexdigest()
+
+
+class PhotoStorage:
+    """Хранилище фотографий отчётов с адресацией по содержимому.
+
+    Каждая фотография хранится один раз в файле, имя которого - sha256 её содержимого,
+    поэтому одинаковые фотографии не занимают место на диске повторно,
+    а проверка на повторную отправку фотографии сводится к поиску хэша в БД.
+    Рядом с фотографией хранится её уменьшенная копия (превью) для просмотра в списке отчётов.
+    """
+
+    def __init__(self) -> None:
+        self.__directory = settings.user_reports_dir / PHOTOS_DIR
+
+    @staticmethod
+    def get_url(photo_path: str) -> str:
+        """Ссылка на фотографию по её пути относительно каталога фотоотчётов."""
+        return urljoin(settings.user_reports_url, photo_path)
+
+    @staticmethod
+    def get_path(photo_url: str) -> str:
+        """Путь фотографии относительно каталога фотоотчётов по ссылке на неё."""
+        return photo_url.removeprefix(settings.user_reports_url)
+
+    async def save_telegram_file(self, file: File) -> tuple[str, str]:
+        """Скачивает файл из telegram и сохраняет его, если такого файла в хранилище ещё нет.
+
+        Хэш считается во время записи файла. Возвращает хэш и путь файла относительно каталога фотоотчётов.
+        """
+        await run_in_threadpool(self.__directory.mkdir, parents=True, exist_ok=True)
+        with NamedTemporaryFile(dir=self.__directory, suffix=".tmp", delete=False) as temp_file:
+            writer = HashingWriter(temp_file)
+            try:
+                await file.download_to_memory(out=writer)
+            except Exception:
+                temp_file.close()
+                os.unlink(temp_file.name)
+                raise
+        photo_hash = writer.hexdigest()
+        photo_path = f"{PHOTOS_DIR}/{photo_hash[:2]}/{photo_hash}{Path(file.file_path).suffix}"
+        await run_in_threadpool(self.__store, Path(temp_file.name), settings.user_reports_dir / photo_path)
+        return photo_hash, photo_path
+
+    async def save_thumbnail(self, photo_path: str) -> str:
+        """Создаёт превью фотографии в пуле потоков. Возвращает путь превью относительно каталога фотоотчётов."""
+        thumbnail_path = str(Path(photo_path).with_suffix(THUMBNAIL_SUFFIX))
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            THUMBNAILS_EXECUTOR,
+            self.__create_thumbnail,
+            settings.user_reports_dir / photo_path,
+            settings.user_reports_dir / thumbnail_path,
+        )
+        return thumbnail_path
+
+    @staticmethod
+    def __create_thumbnail(photo_path: Path, thumbnail_path: Path) -> None:
+        if thumbnail_path.exists():
+            return
+        size = (settings.THUMBNAIL_SIZE, settings.THUMBNAIL_SIZE)
+        with Image.open(photo_path) as image:
+            # jpeg декодируется сразу в уменьшенном размере, что намного быстрее полного декодирования
+            image.draft("RGB", size)
+            thumbnail = ImageOps.exif_transpose(image).convert("RGB")
+        thumbnail.thumbnail(size)
+        with NamedTemporaryFile(dir=thumbnail_path.parent, suffix=".tmp", delete=False) as temp_file:
+            thumbnail.save(temp_file, format="JPEG", quality=settings.THUMBNAIL_QUALITY, optimize=True)
+        os.replace(temp_file.name, thumbnail_path)
+
+    @staticmethod
+    def __store(temp_path: Path, path: Path) -> None:
+        """Переносит скачанный файл в хранилище или удаляет его, если такой файл уже сохранён."""
+        if path.exists():
+            temp_path.unlink()
+            return
+        path.parent.mkdir(exist_ok=True)
+        # файл переименовывается целиком, чтобы его нельзя было прочитать частично
+        os.replace(temp_path, path)
@@ -0,0 +1,31 @@
+import time
+from typing import Hashable
+
+from src.core.cache import TTLCache
+
+
+class RateLimiter:
+    """Ограничивает количество попыток по ключу за период в памяти процесса.
+
+    Попытки считаются в фиксированном окне, которое начинается с первой попытки по ключу.
+    Каждый процесс считает попытки отдельно.
+    """
+
+    def __init__(self, limit: int, period: float, max_size: int) -> None:
+        self.__limit = limit
+        self.__period = period
+        # ключ -> время окончания окна и количество попыток в нём
+        self.__attempts: TTLCache[Hashable, tuple[float, int]] = TTLCache(period, max_size)
+
+    def hit(self, key: Hashable) -> bool:
+        """Учитывает попытку. Возвращает False, если лимит попыток за период уже исчерпан."""
+        now = time.monotonic()
+        window_end, attempts = self.__attempts.get(key) or (now + self.__period, 0)
+        if attempts >= self.__limit:
+            return False
+        self.__attempts.set(key, (window_end, attempts + 1), ttl=window_end - now)
+        return True
+
+    def reset(self, key: Hashable) -> None:
+        """Сбрасывает счётчик попыток по ключу."""
+        self.__attempts.delete(key)
@@ -40,7 +40,7 @@ class AdministratorService:
             name=schema.name,
             surname=schema.surname,
             email=invitation.email,
-            hashed_password=AuthenticationService.get_hashed_password(schema.password.get_secret_value()),
+            hashed_password=await AuthenticationService.hash_password(schema.password.get_secret_value()),
             status=Administrator.Status.ACTIVE,
             role=Administrator.Role.EXPERT,
         )
@@ -72,7 +72,9 @@ class AdministratorService:
         else:
             administrator.role = Administrator.Role.ADMINISTRATOR
 
-        return await self.__administrator_repository.update(administrator.id, administrator)
+        administrator = await self.__administrator_repository.update(administrator.id, administrator)
+        AuthenticationService.invalidate_administrator_cache(administrator.email)
+        return administrator
 
     async def restore_administrator_password(self, email: str) -> Administrator:
         """
@@ -90,10 +92,12 @@ class AdministratorService:
 
     async def __set_new_password(self, password: str, email: str) -> Administrator:
         """Хэширует пароль, сохраняет его в БД, возвращает объект Administrator с обновленными данными."""
-        hashed_password = AuthenticationService.get_hashed_password(password)
+        hashed_password = await AuthenticationService.hash_password(password)
         administrator = await self.__administrator_repository.get_by_email(email)
         instance = Administrator(hashed_password=hashed_password)
-        return await self.__administrator_repository.update(id=administrator.id, instance=instance)
+        administrator = await self.__administrator_repository.update(id=administrator.id, instance=instance)
+        AuthenticationService.invalidate_administrator_cache(email)
+        return administrator
 
     async def block_administrator(self, blocked_by: Administrator, blocked_id: UUID) -> Administrator:
         """Блокирует администратора."""
@@ -107,7 +111,9 @@ class AdministratorService:
             administrator.status = Administrator.Status.BLOCKED
         else:
             administrator.status = Administrator.Status.ACTIVE
-        return await self.__administrator_repository.update(administrator.id, administrator)
+        administrator = await self.__administrator_repository.update(administrator.id, administrator)
+        AuthenticationService.invalidate_administrator_cache(administrator.email)
+        return administrator
 
     async def get_by_id(self, administrator_id: UUID) -> Administrator:
         """Возвращает сущность администратора по id."""
@@ -119,4 +125,6 @@ class AdministratorService:
         administrator = await self.__administrator_repository.get(administrator_id)
         administrator.name = schema.name
         administrator.surname = schema.surname
-        return await self.__administrator_repository.update(administrator_id, administrator)
+        administrator = await self.__administrator_repository.update(administrator_id, administrator)
+        AuthenticationService.invalidate_administrator_cache(administrator.email)
+        return administrator
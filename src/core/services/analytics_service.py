@@ -1,42 +1,238 @@
-from io import BytesIO
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from tempfile import NamedTemporaryFile, SpooledTemporaryFile
+from typing import (
+    Any,
+    Awaitable,
+    BinaryIO,
+    Callable,
+    Iterator,
+    Optional,
+    Sequence,
+    TypeVar,
+)
+from uuid import UUID
 
 from fastapi import Depends
-from openpyxl import Workbook
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.db.repository.task_repository import TaskRepository
+from src.core import exceptions
+from src.core.db.db import session_scope
+from src.core.db.models import (
+    Administrator,
+    AnalyticsExport,
+    Member,
+    Report,
+    Shift,
+    Task,
+    TaskReportStats,
+    User,
+)
+from src.core.db.repository import (
+    AnalyticsExportRepository,
+    MemberRepository,
+    ReportRepository,
+    ShiftRepository,
+    TaskRepository,
+)
+from src.core.settings import settings
 from src.excel_generator.builder import AnalyticReportBuilder
-from src.excel_generator.task_builder import TaskAnalyticReportSettings
+from src.excel_generator.cache import AnalyticReportCache
+from src.excel_generator.shift_builder import (
+    DailyCompletionAnalyticReportSettings,
+    MembersAnalyticReportSettings,
+    ReviewersAnalyticReportSettings,
+)
+from src.excel_generator.task_builder import (
+    BaseAnalyticReportSettings,
+    TaskAnalyticReportSettings,
+)
+
+REPORT_CHUNK_SIZE = 64 * 1024
+# входит в версию отчёта: увеличить при изменении структуры отчётов, чтобы не отдавать их из кэша
+REPORT_LAYOUT_VERSION = 1
+
+T = TypeVar("T")
+ReportSheet = tuple[type[BaseAnalyticReportSettings], Sequence[Any], Optional[str]]
 
 
 class AnalyticsService:
-    """Сервис для получения отчётов."""
+    """Сервис для получения отчётов.
+
+    Данные получаются из БД асинхронно, а сборка excel файла выполняется в пуле потоков,
+    чтобы не блокировать цикл событий, который обслуживает в том числе webhook бота.
+    Сформированные отчёты кэшируются на диске по версии данных, из которых они построены.
+    Тяжёлые отчёты можно сформировать в фоне через задачи AnalyticsExport.
+    """
+
+    ReportType = AnalyticsExport.ReportType
+
+    # таблицы, изменение которых меняет содержимое отчёта
+    REPORT_SOURCES = {
+        ReportType.FULL: (Task, TaskReportStats, Shift, Member, Report, Administrator, User),
+        ReportType.TASKS: (Task, TaskReportStats),
+    }
 
     def __init__(
         self,
         task_repository: TaskRepository = Depends(),
         task_report_builder: AnalyticReportBuilder = Depends(),
+        report_cache: AnalyticReportCache = Depends(),
+        analytics_export_repository: AnalyticsExportRepository = Depends(),
     ) -> None:
         self.__task_report_builder = task_report_builder
         self.__task_repository = task_repository
+        self.__report_cache = report_cache
+        self.__analytics_export_repository = analytics_export_repository
 
-    async def __generate_task_report(self, workbook: Workbook) -> Workbook:
-        """Генерация отчёта с заданиями."""
-        tasks_statistic = await self.__task_repository.get_tasks_statistics_report()
-        await self.__task_report_builder.generate_report(
-            tasks_statistic,
-            workbook=workbook,
-            analytic_task_report_full=TaskAnalyticReportSettings,
+    def __build_report(self, sheets: list[ReportSheet]) -> SpooledTemporaryFile:
+        """Сборка excel файла из листов с настройками, данными и именем листа. Выполняется в пуле потоков."""
+        workbook = self.__task_report_builder.create_workbook()
+        for report_settings, data, sheet_name in sheets:
+            self.__task_report_builder.generate_report(
+                data,
+                workbook=workbook,
+                analytic_task_report_full=report_settings,
+                sheet_name=sheet_name,
+            )
+        return self.__task_report_builder.save_workbook(workbook)
+
+    def __build_and_cache_report(
+        self, report_type: ReportType, version: str, sheets: list[ReportSheet]
+    ) -> SpooledTemporaryFile:
+        """Сборка excel файла и сохранение его в кэш. Выполняется в пуле потоков."""
+        report_file = self.__build_report(sheets)
+        self.__report_cache.put(report_type.value, version, report_file)
+        return report_file
+
+    async def __get_report_file(self, report_type: ReportType, version: str) -> BinaryIO | SpooledTemporaryFile:
+        """Возвращает файл отчёта из кэша, а если его там нет - формирует и сохраняет в кэш."""
+        report_file = await run_in_threadpool(self.__report_cache.get, report_type.value, version)
+        if report_file is None:
+            if report_type is self.ReportType.FULL:
+                sheets = await self.__get_full_report_sheets()
+            else:
+                sheets = await self.__get_task_report_sheets()
+            report_file = await run_in_threadpool(self.__build_and_cache_report, report_type, version, sheets)
+        return report_file
+
+    @staticmethod
+    def __iterate_report_file(report_file: BinaryIO | SpooledTemporaryFile) -> Iterator[bytes]:
+        """Отдаёт файл отчёта частями и закрывает его после отправки."""
+        with report_file:
+            while chunk := report_file.read(REPORT_CHUNK_SIZE):
+                yield chunk
+
+    @staticmethod
+    async def __fetch_in_new_session(fetch: Callable[[AsyncSession], Awaitable[T]]) -> T:
+        """Выполняет запрос в отдельной сессии, чтобы запросы к БД могли выполняться параллельно."""
+        async with session_scope() as session:
+            return await fetch(session)
+
+    async def get_report_version(self, report_type: ReportType) -> str:
+        """Версия отчёта: меняется при любом изменении данных, из которых строится отчёт."""
+        data_version = await self.__task_repository.get_data_version(self.REPORT_SOURCES[report_type])
+        return hashlib.sha256(repr((REPORT_LAYOUT_VERSION, report_type.value, data_version)).encode()).hexdigest()
+
+    async def generate_full_report(self, version: str) -> Iterator[bytes]:
+        """Полный отчёт версии version из кэша или сформированный заново."""
+        return self.__iterate_report_file(await self.__get_report_file(self.ReportType.FULL, version))
+
+    async def generate_task_report(self, version: str) -> Iterator[bytes]:
+        """Отчёт с заданиями версии version из кэша или сформированный заново."""
+        return self.__iterate_report_file(await self.__get_report_file(self.ReportType.TASKS, version))
+
+    async def __get_full_report_sheets(self) -> list[ReportSheet]:
+        """Данные листов полного отчёта.
+
+        Содержит итоги по заданиям со всех смен и для каждой смены листы с рейтингом участников,
+        выполнением заданий по дням и проверкой отчётов администраторами.
+        Данные для каждого вида листов получаются одним запросом, запросы выполняются параллельно.
+        """
+        tasks_statistic, shifts, members, daily_completion, reviewers = await asyncio.gather(
+            self.__fetch_in_new_session(lambda session: TaskRepository(session).get_tasks_statistics_report()),
+            self.__fetch_in_new_session(lambda session: ShiftRepository(session).get_shifts_for_analytics()),
+            self.__fetch_in_new_session(lambda session: MemberRepository(session).get_members_analytic_report()),
+            self.__fetch_in_new_session(
+                lambda session: ReportRepository(session).get_daily_completion_analytic_report()
+            ),
+            self.__fetch_in_new_session(lambda session: ReportRepository(session).get_reviewers_analytic_report()),
         )
+        sheets: list[ReportSheet] = [(TaskAnalyticReportSettings, tasks_statistic, None)]
+        for shift in shifts:
+            for report_settings, data in (
+                (MembersAnalyticReportSettings, members),
+                (DailyCompletionAnalyticReportSettings, daily_completion),
+                (ReviewersAnalyticReportSettings, reviewers),
+            ):
+                sheet_name = f"Смена {shift.sequence_number}. {report_settings.sheet_name}"
+                sheets.append((report_settings, data.get(shift.id, ()), sheet_name))
+        return sheets
 
-    async def generate_full_report(self) -> BytesIO:
-        """Генерация полного отчёта."""
-        workbook = self.__task_report_builder.create_workbook()
-        await self.__generate_task_report(workbook)
-        await self.__generate_task_report(workbook)
-        return await self.__task_report_builder.get_report_response(workbook)
+    async def __get_task_report_sheets(self) -> list[ReportSheet]:
+        """Данные листа отчёта с заданиями."""
+        tasks_statistic = await self.__task_repository.get_tasks_statistics_report()
+        return [(TaskAnalyticReportSettings, tasks_statistic, None)]
 
-    async def generate_task_report(self) -> BytesIO:
-        """Генерация отчёта с заданиями."""
-        workbook = self.__task_report_builder.create_workbook()
-        await self.__generate_task_report(workbook)
-        return await self.__task_report_builder.get_report_response(workbook)
+    async def create_export(self, report_type: ReportType, administrator_id: UUID) -> AnalyticsExport:
+        """Создаёт задачу на формирование отчёта в фоне."""
+        export = AnalyticsExport(report_type=report_type, administrator_id=administrator_id)
+        return await self.__analytics_export_repository.create(export)
+
+    async def get_export(self, export_id: UUID) -> AnalyticsExport:
+        return await self.__analytics_export_repository.get(export_id)
+
+    def get_export_file(self, export: AnalyticsExport) -> Iterator[bytes]:
+        """Отдаёт частями файл отчёта, сформированного в фоне."""
+        try:
+            report_file = (Path(settings.ANALYTICS_EXPORTS_DIR) / export.file_name).open("rb")
+        except FileNotFoundError:
+            raise exceptions.AnalyticsExportFileNotFoundError
+        return self.__iterate_report_file(report_file)
+
+    async def process_exports(self) -> None:
+        """Формирует отчёты по ожидающим задачам и удаляет отчёты, срок хранения которых истёк.
+
+        Задачи берутся в работу по одной. Если процесс будет остановлен во время формирования отчёта,
+        задача будет взята в работу повторно по истечении ANALYTICS_EXPORT_TIMEOUT.
+        """
+        await self.__delete_expired_exports()
+        while export := await self.__analytics_export_repository.take_for_processing(settings.ANALYTICS_EXPORT_TIMEOUT):
+            export_id = export.id
+            file_name = f"{export_id}.xlsx"
+            try:
+                version = await self.get_report_version(export.report_type)
+                report_file = await self.__get_report_file(export.report_type, version)
+                await run_in_threadpool(self.__save_export_file, report_file, file_name)
+            except Exception as exc:
+                logging.exception(f"Не удалось сформировать отчёт {export}")
+                # ошибка запроса (например, statement_timeout) прерывает транзакцию сессии,
+                # без отката отметить задачу как невыполненную не получится
+                await self.__analytics_export_repository.rollback()
+                await self.__analytics_export_repository.set_failed(export_id, str(exc))
+                continue
+            await self.__analytics_export_repository.set_done(export_id, file_name)
+
+    @staticmethod
+    def __save_export_file(report_file: BinaryIO | SpooledTemporaryFile, file_name: str) -> None:
+        """Сохраняет отчёт в каталог отчётов, сформированных в фоне. Выполняется в пуле потоков."""
+        exports_dir = Path(settings.ANALYTICS_EXPORTS_DIR)
+        exports_dir.mkdir(parents=True, exist_ok=True)
+        with report_file, NamedTemporaryFile(dir=exports_dir, suffix=".tmp", delete=False) as export_file:
+            shutil.copyfileobj(report_file, export_file)
+        # файл переименовывается целиком, чтобы его нельзя было скачать частично
+        os.replace(export_file.name, exports_dir / file_name)
+
+    async def __delete_expired_exports(self) -> None:
+        """Удаляет задачи и файлы отчётов, срок хранения которых истёк."""
+        file_names = await self.__analytics_export_repository.delete_finished_before(
+            datetime.now() - settings.ANALYTICS_EXPORT_TTL
+        )
+        for file_name in file_names:
+            await run_in_threadpool((Path(settings.ANALYTICS_EXPORTS_DIR) / file_name).unlink, missing_ok=True)
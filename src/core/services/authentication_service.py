@@ -1,4 +1,8 @@
+import asyncio
 import datetime as dt
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 
 from fastapi import Depends
 from fastapi.security import OAuth2PasswordBearer
@@ -7,31 +11,63 @@ from passlib.context import CryptContext
 
 from src.api.request_models.administrator import AdministratorAuthenticateRequest
 from src.core import exceptions
+from src.core.cache import TTLCache
 from src.core.db.DTO_models import AdministratorAndTokensDTO
 from src.core.db.models import Administrator
 from src.core.db.repository import AdministratorRepository
+from src.core.rate_limiter import RateLimiter
 from src.core.settings import settings
 
 PASSWORD_CONTEXT = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt занимает сотни миллисекунд, поэтому выполняется в отдельных потоках, а не в цикле событий
+PASSWORD_HASHING_EXECUTOR = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASHING_WORKERS, thread_name_prefix="password_hashing"
+)
 OAUTH2_SCHEME = OAuth2PasswordBearer(tokenUrl="/administrators/login", scheme_name="JWT")
 
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24
 REFRESH_TOKEN_EXPIRE_MINUTES = 60 * 24 * 10
 ALGORITHM = "HS256"
 
+# кэши процесса: активные администраторы по email и email из уже проверенных jwt-токенов
+ADMINISTRATORS_CACHE: TTLCache[str, Administrator] = TTLCache(settings.AUTH_CACHE_TTL, settings.AUTH_CACHE_MAX_SIZE)
+TOKENS_CACHE: TTLCache[str, str] = TTLCache(settings.AUTH_CACHE_TTL, settings.AUTH_CACHE_MAX_SIZE)
+
+LOGIN_ATTEMPTS_MAX_KEYS = 10000
+EMAIL_LOGIN_RATE_LIMITER = RateLimiter(
+    settings.LOGIN_ATTEMPTS_PER_EMAIL, settings.LOGIN_ATTEMPTS_PERIOD, LOGIN_ATTEMPTS_MAX_KEYS
+)
+IP_LOGIN_RATE_LIMITER = RateLimiter(
+    settings.LOGIN_ATTEMPTS_PER_IP, settings.LOGIN_ATTEMPTS_PERIOD, LOGIN_ATTEMPTS_MAX_KEYS
+)
+
 
 class AuthenticationService:
     def __init__(self, administrator_repository: AdministratorRepository = Depends()):
         self.__administrator_repository = administrator_repository
 
+    @staticmethod
+    def invalidate_administrator_cache(email: str) -> None:
+        """Удаляет администратора из кэша. Вызывается при любом изменении администратора."""
+        ADMINISTRATORS_CACHE.delete(email)
+
     @staticmethod
     def get_hashed_password(password: str) -> str:
-        """Получить хэш пароля."""
+        """Получить хэш пароля. Блокирует поток на время хэширования."""
         return PASSWORD_CONTEXT.hash(password)
 
-    def __verify_hashed_password(self, plain_password: str, hashed_password: str) -> bool:
-        """Сравнить открытый пароль с хэшем."""
-        return PASSWORD_CONTEXT.verify(plain_password, hashed_password)
+    @staticmethod
+    async def hash_password(password: str) -> str:
+        """Получить хэш пароля в пуле потоков, не блокируя цикл событий."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(PASSWORD_HASHING_EXECUTOR, PASSWORD_CONTEXT.hash, password)
+
+    async def __verify_hashed_password(self, plain_password: str, hashed_password: str) -> bool:
+        """Сравнить открытый пароль с хэшем в пуле потоков, не блокируя цикл событий."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            PASSWORD_HASHING_EXECUTOR, PASSWORD_CONTEXT.verify, plain_password, hashed_password
+        )
 
     def __create_jwt_token(self, email: str, expires_delta: int) -> str:
         """Создать jwt-токен.
@@ -50,23 +86,48 @@ class AuthenticationService:
         if administrator.status == Administrator.Status.BLOCKED:
             raise exceptions.AdministratorBlockedError
         password = auth_data.password.get_secret_value()
-        if not self.__verify_hashed_password(password, administrator.hashed_password):
+        if not await self.__verify_hashed_password(password, administrator.hashed_password):
             raise exceptions.InvalidAuthenticationDataError
         return administrator
 
-    async def login(self, auth_data: AdministratorAuthenticateRequest) -> AdministratorAndTokensDTO:
-        """Получить refresh- и access- токены и информацию об администраторе."""
+    @staticmethod
+    def __check_login_attempts(email: str, client_ip: Optional[str]) -> None:
+        """Учесть попытку входа и проверить, что лимит попыток для email и IP-адреса не исчерпан."""
+        allowed = EMAIL_LOGIN_RATE_LIMITER.hit(email.lower())
+        if client_ip is not None:
+            allowed = IP_LOGIN_RATE_LIMITER.hit(client_ip) and allowed
+        if not allowed:
+            raise exceptions.TooManyLoginAttemptsError
+
+    async def login(
+        self, auth_data: AdministratorAuthenticateRequest, client_ip: Optional[str] = None
+    ) -> AdministratorAndTokensDTO:
+        """Получить refresh- и access- токены и информацию об администраторе.
+
+        Количество попыток входа ограничено для каждого email и IP-адреса.
+        После успешного входа счётчик попыток для email сбрасывается.
+        """
+        self.__check_login_attempts(auth_data.email, client_ip)
         administrator = await self.__authenticate_administrator(auth_data)
+        EMAIL_LOGIN_RATE_LIMITER.reset(auth_data.email.lower())
         administrator.last_login_at = dt.datetime.now()
         await self.__administrator_repository.update(administrator.id, administrator)
+        self.invalidate_administrator_cache(administrator.email)
         return AdministratorAndTokensDTO(
             access_token=self.__create_jwt_token(administrator.email, ACCESS_TOKEN_EXPIRE_MINUTES),
             refresh_token=self.__create_jwt_token(administrator.email, REFRESH_TOKEN_EXPIRE_MINUTES),
             administrator=administrator,
         )
 
-    async def get_current_active_administrator(self, token: str) -> Administrator:
-        """Получить текущего активного администратора, используя токен."""
+    @staticmethod
+    def __get_email_from_token(token: str) -> str:
+        """Проверить jwt-токен и получить из него email.
+
+        Проверенный токен кэшируется, но не дольше, чем до истечения срока его действия.
+        """
+        email = TOKENS_CACHE.get(token)
+        if email is not None:
+            return email
         try:
             payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
         except JWTError:
@@ -74,7 +135,21 @@ class AuthenticationService:
         email = payload.get("email")
         if not email:
             raise exceptions.UnauthorizedError
-        administrator = await self.__administrator_repository.get_by_email(email)
+        if "exp" in payload:
+            TOKENS_CACHE.set(token, email, ttl=payload["exp"] - time.time())
+        return email
+
+    async def get_current_active_administrator(self, token: str) -> Administrator:
+        """Получить текущего активного администратора, используя токен.
+
+        Администратор берётся из кэша процесса, а при отсутствии в кэше - из БД.
+        Возвращаемый объект отсоединён от сессии и используется только для чтения.
+        """
+        email = self.__get_email_from_token(token)
+        administrator = ADMINISTRATORS_CACHE.get(email)
+        if administrator is None:
+            administrator = await self.__administrator_repository.get_detached_by_email(email)
+            ADMINISTRATORS_CACHE.set(email, administrator)
         if administrator.status == Administrator.Status.BLOCKED:
             raise exceptions.AdministratorBlockedError
         return administrator
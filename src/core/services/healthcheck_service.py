@@ -1,4 +1,5 @@
 import logging
+import os
 from datetime import datetime
 from http import HTTPStatus
 
@@ -7,10 +8,20 @@ from fastapi import Depends
 from telegram.ext import Application
 
 from src.api.response_models.healthcheck import (
+    AuthenticationCacheStatusResponse,
+    BotUpdatesStatusResponse,
+    CacheStatusResponse,
     ComponentItemHealthcheck,
+    DatabasePoolStatusResponse,
     HealthcheckResponse,
 )
+from src.bot.application import ChatOrderedApplication
+from src.core.db.db import engine, get_long_checkouts
 from src.core.db.repository import ReportRepository
+from src.core.services.authentication_service import (
+    ADMINISTRATORS_CACHE,
+    TOKENS_CACHE,
+)
 from src.core.settings import settings
 
 
@@ -44,6 +55,49 @@ class HealthcheckService:
             logging.exception(db_error)
             return ComponentItemHealthcheck(name='db', status=False, errors=[f'{db_error}'])
 
+    async def get_db_pool_status(self) -> DatabasePoolStatusResponse:
+        """Возвращает статистику пула соединений с БД текущего процесса."""
+        pool = engine.pool
+        return DatabasePoolStatusResponse(
+            pid=os.getpid(),
+            pool_size=pool.size(),
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            long_checkouts=[round(duration, 1) for duration in get_long_checkouts()],
+        )
+
+    async def get_authentication_cache_status(self) -> AuthenticationCacheStatusResponse:
+        """Возвращает статистику кэшей аутентификации текущего процесса."""
+        return AuthenticationCacheStatusResponse(
+            pid=os.getpid(),
+            administrators=CacheStatusResponse(
+                size=len(ADMINISTRATORS_CACHE), hits=ADMINISTRATORS_CACHE.hits, misses=ADMINISTRATORS_CACHE.misses
+            ),
+            tokens=CacheStatusResponse(size=len(TOKENS_CACHE), hits=TOKENS_CACHE.hits, misses=TOKENS_CACHE.misses),
+        )
+
+    async def get_bot_updates_status(self, bot_instance: ChatOrderedApplication) -> BotUpdatesStatusResponse:
+        """Возвращает статистику очереди и времени обработки обновлений бота текущего процесса."""
+        latencies = sorted(bot_instance.handler_latencies)
+        latency_avg_ms = latency_p95_ms = latency_max_ms = None
+        if latencies:
+            latency_avg_ms = round(sum(latencies) / len(latencies) * 1000, 1)
+            latency_p95_ms = round(latencies[int(len(latencies) * 0.95)] * 1000, 1)
+            latency_max_ms = round(latencies[-1] * 1000, 1)
+        return BotUpdatesStatusResponse(
+            pid=os.getpid(),
+            queued=bot_instance.update_queue.qsize(),
+            waiting=bot_instance.waiting_updates,
+            processing=bot_instance.processing_updates,
+            processed=bot_instance.processed_updates,
+            concurrency_limit=settings.BOT_CONCURRENT_UPDATES,
+            latency_avg_ms=latency_avg_ms,
+            latency_p95_ms=latency_p95_ms,
+            latency_max_ms=latency_max_ms,
+        )
+
     async def get_healthcheck_status(self, bot: Application.bot) -> HealthcheckResponse:
         components = [await self.__get_bot_status(bot), await self.__get_api_status(), await self.__get_db_status()]
         return HealthcheckResponse(timestamp=datetime.now(), components=components)
@@ -1,8 +1,9 @@
+from typing import Any, AsyncIterator
+
 from fastapi import Depends
 from telegram.ext import Application
 
 from src.bot import services
-from src.core.db.models import Member
 from src.core.db.repository import MemberRepository, ShiftRepository
 from src.core.settings import settings
 from src.core.utils import get_current_task_date
@@ -25,19 +26,23 @@ class MemberService:
         в настройках количество раз подряд, то они будут исключены из смены.
         """
         shift_id = await self.__shift_repository.get_started_shift_id()
-        lagging_members = await self.__member_repository.get_members_for_excluding(
-            shift_id, settings.SEQUENTIAL_TASKS_PASSES_FOR_EXCLUDE
+        excluded_users = await self.__member_repository.exclude_lagging_members(
+            shift_id, get_current_task_date(), settings.SEQUENTIAL_TASKS_PASSES_FOR_EXCLUDE
+        )
+        await self.__telegram_bot(bot).notify_excluded_members(
+            [
+                (user_id, telegram_id)
+                for user_id, telegram_id, telegram_blocked in excluded_users
+                if not telegram_blocked
+            ]
         )
-        for member in lagging_members:
-            member.status = Member.Status.EXCLUDED
-            await self.__member_repository.update(member.id, member)
-        await self.__telegram_bot(bot).notify_excluded_members(lagging_members)
 
-    async def get_members_with_no_reports(self) -> list[Member]:
-        """Получить всех участников, у которых отчеты в статусе WAITING."""
+    async def stream_members_with_no_reports(self) -> AsyncIterator[dict[str, Any]]:
+        """Построчно отдает получателей напоминания: участников, у которых отчеты в статусе WAITING."""
         shift_id = await self.__shift_repository.get_started_shift_id()
         current_task_date = get_current_task_date()
-        return await self.__member_repository.get_members_for_reminding(shift_id, current_task_date)
+        async for member in self.__member_repository.stream_members_for_reminding(shift_id, current_task_date):
+            yield member
 
     async def get_number_of_lombariers_by_telegram_id(self, telegram_id) -> int:
         """Получение баланса ломбарьеров в текущей смене по telegram_id."""
@@ -0,0 +1,71 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import Depends
+from telegram.error import BadRequest, NetworkError, RetryAfter, TelegramError, TimedOut
+from telegram.ext import Application
+
+from src.bot import services
+from src.bot.error_handler import error_handler
+from src.core.db.models import OutboxMessage
+from src.core.db.repository import OutboxRepository
+from src.core.settings import settings
+
+
+class OutboxService:
+    """Сервис для отправки сообщений из очереди исходящих сообщений."""
+
+    def __init__(self, outbox_repository: OutboxRepository = Depends()) -> None:
+        self.__outbox_repository = outbox_repository
+        self.__telegram_bot = services.BotService
+
+    async def send_pending_messages(self, bot: Application) -> None:
+        """Отправляет накопившиеся сообщения пачками.
+
+        В пачку попадает не больше OUTBOX_CONCURRENCY сообщений и не больше одного сообщения
+        на чат, поэтому порядок сообщений в каждом чате сохраняется. Сообщения пачки берутся в работу
+        в БД, поэтому несколько процессов бота могут разбирать очередь одновременно.
+        """
+        bot_service = self.__telegram_bot(bot)
+        while messages := await self.__outbox_repository.take_for_sending(
+            settings.OUTBOX_CONCURRENCY, settings.OUTBOX_SENDING_TIMEOUT
+        ):
+            errors = await asyncio.gather(*(self.__send_message(bot_service, message) for message in messages))
+            await self.__outbox_repository.set_sent(
+                [message.id for message, error in zip(messages, errors) if error is None]
+            )
+            for message, error in zip(messages, errors):
+                if error is not None:
+                    await self.__handle_sending_error(message, error)
+
+    async def delete_sent_messages(self) -> None:
+        """Удаляет отправленные сообщения, срок хранения которых истёк."""
+        await self.__outbox_repository.delete_sent_before(datetime.now() - settings.OUTBOX_SENT_MESSAGES_TTL)
+
+    async def __send_message(self, bot_service: services.BotService, message: OutboxMessage) -> Optional[TelegramError]:
+        """Отправляет сообщение. Возвращает ошибку отправки, если она возникла."""
+        if message.user.telegram_blocked:
+            return TelegramError("Пользователь заблокировал бота")
+        try:
+            await bot_service.send_outbox_message(message)
+        except TelegramError as exc:
+            return exc
+        return None
+
+    async def __handle_sending_error(self, message: OutboxMessage, error: TelegramError) -> None:
+        """Откладывает повторную отправку сообщения или помечает его как неотправленное."""
+        is_retryable = isinstance(error, (RetryAfter, TimedOut, NetworkError)) and not isinstance(error, BadRequest)
+        if is_retryable and message.attempt_number + 1 < services.RETRY_MAX_ATTEMPT_NUMBER:
+            logging.warning(f"Сообщение пользователю {message.user} не было отправлено. Ошибка отправления: {error}")
+            retry_delay = services.RETRY_START_SLEEP_TIME * 3**message.attempt_number
+            await self.__outbox_repository.postpone(message.id, timedelta(seconds=retry_delay), str(error))
+            return
+        await self.__outbox_repository.set_failed(message.id, str(error))
+        if is_retryable or message.user.telegram_blocked:
+            return
+        try:
+            await error_handler(message.user, error)
+        except TelegramError as exc:
+            logging.exception(f"Сообщение пользователю {message.user} не было отправлено. Ошибка отправления: {exc}")
@@ -1,21 +1,34 @@
+import asyncio
+import logging
 from datetime import date, timedelta
-from typing import Sequence
+from typing import Any, AsyncIterator, Optional
 from urllib.parse import urljoin
 
 from fastapi import Depends
 from pydantic.schema import UUID
+from sqlalchemy.exc import IntegrityError
 from telegram.ext import Application
 
+from src.api.request_models.report import ReportReviewRequest
 from src.api.response_models.report import ReportResponse
 from src.bot import services
 from src.core import exceptions
 from src.core.db import DTO_models
 from src.core.db.models import Member, Report, Shift, Task
-from src.core.db.repository import MemberRepository, ReportRepository, ShiftRepository
+from src.core.db.repository import (
+    MemberRepository,
+    ReportRepository,
+    ShiftRepository,
+    TaskReportStatsRepository,
+)
+from src.core.photo_storage import PhotoStorage
 from src.core.services.task_service import TaskService
 from src.core.settings import settings
 from src.core.utils import get_current_task_date, get_lombaryers_for_quantity
 
+# количество отчётов, превью для которых создаются за один проход
+THUMBNAILS_BATCH_SIZE = 100
+
 
 class ReportService:
     """Вспомогательный класс для Report.
@@ -31,58 +44,86 @@ class ReportService:
         shift_repository: ShiftRepository = Depends(),
         member_repository: MemberRepository = Depends(),
         task_service: TaskService = Depends(),
+        task_report_stats_repository: TaskReportStatsRepository = Depends(),
     ) -> None:
         self.__telegram_bot = services.BotService
         self.__report_repository = report_repository
         self.__shift_repository = shift_repository
         self.__member_repository = member_repository
         self.__task_service = task_service
+        self.__task_report_stats_repository = task_report_stats_repository
 
     async def get_report(self, id: UUID) -> Report:
         return await self.__report_repository.get(id)
 
-    async def check_duplicate_report(self, url: str) -> None:
-        report = await self.__report_repository.get_by_report_url(url)
-        if report:
+    async def check_duplicate_report(self, photo_hash: str) -> None:
+        if await self.__report_repository.exists_by_photo_hash(photo_hash):
             raise exceptions.DuplicateReportError
 
     async def check_report_skipped(self, report: Report) -> None:
         if report.status == Report.Status.SKIPPED:
             raise exceptions.ReportAlreadySkippedError
 
-    async def get_today_task_and_active_members(self, current_day_of_month: int) -> tuple[Task, list[Member]]:
-        """Получить ежедневное задание и список активных участников смены."""
+    async def get_today_task(self, current_day_of_month: int) -> Task:
+        """Получить ежедневное задание стартовавшей смены."""
         shift_id = await self.__shift_repository.get_started_shift_id()
-        shift = await self.__shift_repository.get_with_members(shift_id, Member.Status.ACTIVE)
-        task = await self.__task_service.get_task_by_day_of_month(shift.tasks, current_day_of_month)
-        return task, shift.members
+        shift = await self.__shift_repository.get(shift_id)
+        return await self.__task_service.get_task_by_day_of_month(shift.tasks, current_day_of_month)
 
     async def approve_report(self, report_id: UUID, administrator_id: UUID, bot: Application) -> ReportResponse:
         """Задание принято: изменение статуса, начисление 1 /"ломбарьерчика/", уведомление участника."""
-        report = await self.__report_repository.get(report_id)
-        self.__can_change_status(report.status)
-        report.status = Report.Status.APPROVED
-        report.set_reviewer(administrator_id)
-        report = await self.__report_repository.update(report_id, report)
-        member = await self.__member_repository.get_with_user_and_shift(report.member_id)
-        member.numbers_lombaryers += 1
-        await self.__member_repository.update(member.id, member)
+        async with self.__report_repository.unit_of_work():
+            # строка отчета блокируется, чтобы параллельная проверка не изменила статус повторно
+            report = await self.__report_repository.get_for_update(report_id)
+            self.__can_change_status(report.status)
+            report = await self.__update_status(report, Report.Status.APPROVED, administrator_id)
+            await self.__member_repository.add_lombaryer(report.member_id)
+            member = await self.__member_repository.get_with_user_and_shift(report.member_id)
         await self.__telegram_bot(bot).notify_approved_task(member.user, report, member.shift)
         await self.__notify_member_about_finished_shift(member, bot)
         return report
 
     async def decline_report(self, report_id: UUID, administrator_id: UUID, bot: Application) -> ReportResponse:
         """Задание отклонено: изменение статуса, уведомление участника в телеграм."""
-        report = await self.__report_repository.get(report_id)
-        self.__can_change_status(report.status)
-        report.status = Report.Status.DECLINED
-        report.set_reviewer(administrator_id)
-        report = await self.__report_repository.update(report_id, report)
-        member = await self.__member_repository.get_with_user_and_shift(report.member_id)
+        async with self.__report_repository.unit_of_work():
+            report = await self.__report_repository.get_for_update(report_id)
+            self.__can_change_status(report.status)
+            report = await self.__update_status(report, Report.Status.DECLINED, administrator_id)
+            member = await self.__member_repository.get_with_user_and_shift(report.member_id)
         await self.__telegram_bot(bot).notify_declined_task(member.user, member.shift)
         await self.__notify_member_about_finished_shift(member, bot)
         return report
 
+    async def review_reports(
+        self, reviews: list[ReportReviewRequest], administrator_id: UUID, bot: Application
+    ) -> list[Report]:
+        """Массовая проверка заданий: изменение статусов, начисление "ломбарьерчиков", уведомление участников.
+
+        Все решения применяются в одной транзакции: если хотя бы один отчет нельзя проверить, не меняется ни один.
+        """
+        report_ids = [review.report_id for review in reviews]
+        async with self.__report_repository.unit_of_work():
+            reports = {report.id: report for report in await self.__report_repository.get_for_review(report_ids)}
+            status_changes = []
+            for review in reviews:
+                if review.report_id not in reports:
+                    raise exceptions.ObjectNotFoundError(Report, review.report_id)
+                report = reports[review.report_id]
+                self.__can_change_status(report.status)
+                status_changes.append((report.task_id, report.shift_id, report.status, review.status))
+            approved_ids = [review.report_id for review in reviews if review.status == Report.Status.APPROVED]
+            declined_ids = [review.report_id for review in reviews if review.status == Report.Status.DECLINED]
+            await self.__report_repository.set_reviewed(approved_ids, Report.Status.APPROVED, administrator_id)
+            await self.__report_repository.set_reviewed(declined_ids, Report.Status.DECLINED, administrator_id)
+            await self.__member_repository.add_lombaryers_for_reports(approved_ids)
+            await self.__task_report_stats_repository.add_status_changes(status_changes)
+        reviewed_reports = [reports[report_id] for report_id in report_ids]
+        await self.__telegram_bot(bot).notify_reviewed_tasks(reviewed_reports)
+        members = {report.member_id: report.member for report in reviewed_reports}
+        for member in members.values():
+            await self.__notify_member_about_finished_shift(member, bot)
+        return reviewed_reports
+
     async def skip_current_report(self, user_id: UUID) -> Report:
         """Задание пропущено: изменение статуса."""
         report = await self.__report_repository.get_current_report(user_id)
@@ -90,8 +131,23 @@ class ReportService:
             raise exceptions.ReportAlreadySkippedError
         if report.status is not Report.Status.WAITING:
             raise exceptions.ReportCantBeSkippedError
-        report.status = Report.Status.SKIPPED
-        return await self.__report_repository.update(report.id, report)
+        async with self.__report_repository.unit_of_work():
+            return await self.__update_status(report, Report.Status.SKIPPED)
+
+    async def __update_status(
+        self, report: Report, status: Report.Status, administrator_id: Optional[UUID] = None
+    ) -> Report:
+        """Меняет статус отчёта и учитывает изменение в статистике заданий.
+
+        Вызывается внутри unit_of_work, чтобы отчёт и статистика изменились в одной транзакции.
+        """
+        status_change = (report.task_id, report.shift_id, report.status, status)
+        report.status = status
+        if administrator_id:
+            report.set_reviewer(administrator_id)
+        report = await self.__report_repository.update(report.id, report)
+        await self.__task_report_stats_repository.add_status_changes([status_change])
+        return report
 
     async def __notify_member_about_finished_shift(self, member: Member, bot: Application) -> None:
         """Уведомляет пользователя об окончании смены, если у него не осталось непроверенных заданий."""
@@ -127,54 +183,129 @@ class ReportService:
         self,
         shift_id: UUID,
         status: Report.Status,
-    ) -> list[DTO_models.FullReportDto]:
-        """Получает из БД список отчетов участников.
+        fields: Optional[list[str]] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[UUID] = None,
+    ) -> tuple[list[DTO_models.FullReportDto] | list[dict[str, Any]], Optional[UUID]]:
+        """Получает из БД страницу списка отчетов участников и курсор следующей страницы.
 
         Список берется по id смены и/или статусу заданий с url фото выполненного задания.
+        Если переданы fields, вместо FullReportDto возвращаются словари только с этими полями.
+        Курсор равен None, если страница последняя. Переданный cursor должен быть id отчета этой смены.
         """
         shift_exists = await self.__shift_repository.check_shift_existence(shift_id)
         if not shift_exists:
             raise exceptions.ObjectNotFoundError(Shift, shift_id)
-        reports = await self.__report_repository.get_summaries_of_reports(shift_id, status)
-        for report in reports:
-            report.task_url = urljoin(settings.APPLICATION_URL, report.task_url)
-            if report.photo_url:
-                report.photo_url = urljoin(settings.APPLICATION_URL, report.photo_url)
-        return reports
+        if cursor:
+            await self.__check_reports_cursor(shift_id, cursor)
+        reports = await self.__report_repository.get_summaries_of_reports(
+            shift_id, status, fields, limit + 1 if limit else None, cursor
+        )
+        next_cursor = None
+        if limit and len(reports) > limit:
+            reports = reports[:limit]
+            next_cursor = reports[-1]["report_id"]
+        reports = [self.__prepare_report_summary(report, fields) for report in reports]
+        if fields:
+            return reports, next_cursor
+        return [DTO_models.FullReportDto(**report) for report in reports], next_cursor
+
+    async def __check_reports_cursor(self, shift_id: UUID, cursor: UUID) -> None:
+        """Проверяет, что курсор - id существующего отчета запрошенной смены."""
+        cursor_report = await self.__report_repository.get(cursor)
+        if cursor_report.shift_id != shift_id:
+            raise exceptions.ReportsCursorError
+
+    async def stream_summaries_of_reports(
+        self,
+        shift_id: UUID,
+        status: Report.Status,
+        fields: Optional[list[str]] = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Проверяет существование смены и возвращает построчную выдачу отчетов участников."""
+        shift_exists = await self.__shift_repository.check_shift_existence(shift_id)
+        if not shift_exists:
+            raise exceptions.ObjectNotFoundError(Shift, shift_id)
+        reports = self.__report_repository.stream_summaries_of_reports(shift_id, status, fields)
+        return (self.__prepare_report_summary(report, fields) async for report in reports)
+
+    @staticmethod
+    def __prepare_report_summary(report: dict[str, Any], fields: Optional[list[str]]) -> dict[str, Any]:
+        """Дополняет url задания и фото адресом приложения и оставляет только запрошенные поля."""
+        if report.get("task_url"):
+            report["task_url"] = urljoin(settings.APPLICATION_URL, report["task_url"])
+        if report.get("photo_url"):
+            report["photo_url"] = urljoin(settings.APPLICATION_URL, report["photo_url"])
+        if report.get("thumbnail_url"):
+            report["thumbnail_url"] = urljoin(settings.APPLICATION_URL, report["thumbnail_url"])
+        if fields:
+            return {field: report[field] for field in fields}
+        return report
 
     async def get_current_report(self, user_id: UUID) -> Report:
         return await self.__report_repository.get_current_report(user_id)
 
-    async def send_report(self, report: Report, photo_url: str) -> Report:
+    async def send_report(self, report: Report, photo_url: str, photo_hash: str) -> Report:
         await self.check_report_skipped(report)
-        await self.check_duplicate_report(photo_url)
-        report.send_report(photo_url)
-        return await self.__report_repository.update(report.id, report)
+        await self.check_duplicate_report(photo_hash)
+        status_change = (report.task_id, report.shift_id, report.status, Report.Status.REVIEWING)
+        report.send_report(photo_url, photo_hash)
+        try:
+            async with self.__report_repository.unit_of_work():
+                report = await self.__report_repository.update(report.id, report)
+                # повторная отправка отклонённого отчёта уменьшает количество отклонённых отчётов
+                await self.__task_report_stats_repository.add_status_changes([status_change])
+        except IntegrityError:
+            # такую же фотографию одновременно отправил другой участник
+            raise exceptions.DuplicateReportError
+        return report
 
-    async def create_daily_reports(self, members: list[Member], task: Task) -> None:
-        current_date = date.today()
-        reports = [
-            Report(
-                shift_id=member.shift_id,
-                task_id=task.id,
-                status=(
-                    Report.Status.WAITING if member.status == Member.Status.ACTIVE else Report.Status.NOT_PARTICIPATE
-                ),
-                task_date=current_date,
-                member_id=member.id,
+    async def create_thumbnail(self, report_id: UUID, photo_url: str) -> None:
+        """Создаёт превью фото отчёта и сохраняет ссылку на него."""
+        photo_storage = PhotoStorage()
+        thumbnail_path = await photo_storage.save_thumbnail(photo_storage.get_path(photo_url))
+        await self.__report_repository.set_thumbnail_urls({report_id: photo_storage.get_url(thumbnail_path)})
+
+    async def create_missing_thumbnails(self) -> int:
+        """Создаёт превью фото всех отчётов, у которых его нет. Возвращает количество созданных превью.
+
+        Отчёты обрабатываются порциями, превью одной порции создаются параллельно в пуле потоков.
+        Отчёты, для которых не удалось создать превью, пропускаются.
+        """
+        photo_storage = PhotoStorage()
+        created, after_id = 0, None
+        while reports := await self.__report_repository.get_without_thumbnail(after_id, THUMBNAILS_BATCH_SIZE):
+            after_id = reports[-1][0]
+            thumbnail_paths = await asyncio.gather(
+                *(photo_storage.save_thumbnail(photo_storage.get_path(photo_url)) for _, photo_url in reports),
+                return_exceptions=True,
             )
-            for member in members
-        ]
-        await self.__report_repository.create_all(reports)
+            thumbnail_urls = {}
+            for (report_id, photo_url), thumbnail_path in zip(reports, thumbnail_paths):
+                if isinstance(thumbnail_path, Exception):
+                    logging.warning(f"Не удалось создать превью фото {photo_url} отчёта {report_id}: {thumbnail_path}")
+                    continue
+                thumbnail_urls[report_id] = photo_storage.get_url(thumbnail_path)
+            await self.__report_repository.set_thumbnail_urls(thumbnail_urls)
+            created += len(thumbnail_urls)
+        return created
 
-    async def __get_waiting_reports(self) -> Sequence[Report]:
-        """Получаем список отчетов участников со статусом waiting."""
-        return await self.__report_repository.get_waiting_reports()
+    async def create_daily_reports(self, task: Task) -> None:
+        """Создать отчеты на сегодня активным участникам стартовавшей смены."""
+        shift_id = await self.__shift_repository.get_started_shift_id()
+        await self.__report_repository.create_daily_reports(shift_id, task.id, date.today())
 
     async def set_status_to_waiting_reports(self, status: Report.Status):
-        """Устанавливаем статус всем отчетам со статусом waiting."""
-        reports_list = await self.__get_waiting_reports()
-        return await self.__report_repository.set_status_to_reports(reports_list, status)
+        """Устанавливаем статус всем отчетам со статусом waiting одним запросом."""
+        async with self.__report_repository.unit_of_work():
+            updated_reports = await self.__report_repository.bulk_update(
+                {"status": status},
+                Report.status == Report.Status.WAITING,
+                returning=(Report.task_id, Report.shift_id),
+            )
+            await self.__task_report_stats_repository.add_status_changes(
+                (task_id, shift_id, Report.Status.WAITING, status) for task_id, shift_id in updated_reports
+            )
 
     async def create_not_participated_reports(self, member_id: UUID, shift: Shift) -> None:
         """Создаем пропущенные отчеты со статусом not_participate участнику, который пришел на смену позже."""
@@ -191,6 +322,9 @@ class ReportService:
         ]
         await self.__report_repository.create_all(reports)
 
-    async def is_previous_report_not_submitted(self, member_id: UUID) -> bool:
-        """Проверяет статус вчерашнего отчета."""
-        return await self.__report_repository.is_previous_report_not_submitted(member_id)
+    async def get_daily_task_recipients(self) -> list[DTO_models.DailyTaskRecipientDto]:
+        """Возвращает получателей ежедневного задания стартовавшей смены."""
+        shift_id = await self.__shift_repository.get_started_shift_id()
+        return await self.__member_repository.get_daily_task_recipients(
+            shift_id, get_current_task_date() - timedelta(days=1)
+        )
@@ -1,6 +1,5 @@
 from datetime import timedelta
-from pathlib import Path
-from typing import Optional
+from typing import Any, AsyncIterator, Optional
 
 from fastapi import Depends
 from pydantic.schema import UUID
@@ -15,7 +14,6 @@ from src.core.db.models import Member, Request, User
 from src.core.db.repository import MemberRepository, RequestRepository, UserRepository
 from src.core.services.report_service import ReportService
 from src.core.services.shift_service import ShiftService
-from src.core.settings import settings
 from src.core.utils import get_current_task_date
 
 
@@ -35,11 +33,6 @@ class RequestService:
         self.__report_service = report_service
         self.__telegram_bot = services.BotService
 
-    async def __create_user_dir(self, user: User, request: Request) -> None:
-        shift_dir = await self.__shift_service.get_shift_dir(request.shift_id)
-        path = Path(settings.user_reports_dir / shift_dir / str(user.id))
-        path.mkdir(parents=True, exist_ok=True)
-
     async def approve_request(self, request_id: UUID, bot: Application) -> RequestResponse:
         """Одобрение заявки: обновление статуса, уведомление участника в телеграм."""
         request = await self.__request_repository.get(request_id)
@@ -47,7 +40,6 @@ class RequestService:
         request.status = Request.Status.APPROVED
         await self.__request_repository.update(request_id, request)
         user = request.user
-        await self.__create_user_dir(user, request)
         if user.status is not User.Status.VERIFIED:
             user.status = User.Status.VERIFIED
             await self.__user_repository.update(user.id, user)
@@ -83,6 +75,10 @@ class RequestService:
         """Список заявок на участие."""
         return await self.__request_repository.get_requests_list(status)
 
+    def stream_requests_list(self, status: Optional[Request.Status]) -> AsyncIterator[dict[str, Any]]:
+        """Построчная выдача списка заявок на участие."""
+        return self.__request_repository.stream_requests_list(status)
+
     @staticmethod
     def __exception_if_request_is_processed(status: Request.Status) -> None:
         """Если заявка была обработана ранее, выбрасываем исключение."""
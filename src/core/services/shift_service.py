@@ -1,8 +1,7 @@
 import random
 from datetime import date, timedelta
 from itertools import cycle
-from pathlib import Path
-from typing import Optional
+from typing import Any, AsyncIterator, Optional
 from uuid import UUID
 
 from fastapi import Depends
@@ -26,6 +25,7 @@ from src.core.db.repository import (
     ReportRepository,
     RequestRepository,
     ShiftRepository,
+    TaskReportStatsRepository,
     UserRepository,
 )
 from src.core.services.task_service import TaskService
@@ -49,12 +49,14 @@ class ShiftService:
         report_repository: ReportRepository = Depends(),
         user_repository: UserRepository = Depends(),
         request_repository: RequestRepository = Depends(),
+        task_report_stats_repository: TaskReportStatsRepository = Depends(),
     ) -> None:
         self.__shift_repository = shift_repository
         self.__task_service = task_service
         self.__report_repository = report_repository
         self.__user_repository = user_repository
         self.__request_repository = request_repository
+        self.__task_report_stats_repository = task_report_stats_repository
         self.__telegram_bot = services.BotService
 
     def __check_date_not_today_or_in_past(self, _date: date) -> None:
@@ -152,15 +154,6 @@ class ShiftService:
         if shift.status == Shift.Status.PREPARING:
             await self.__check_preparing_shift_dates(update_shift_data.started_at, update_shift_data.finished_at)
 
-    async def __create_shift_dir(self, shift: Shift) -> None:
-        shift_dir = await self.get_shift_dir(shift)
-        path = Path(settings.user_reports_dir / shift_dir)
-        path.mkdir(parents=True, exist_ok=True)
-
-    async def get_shift_dir(self, shift_id: UUID) -> str:
-        shift = await self.__shift_repository.get(shift_id)
-        return f"shift_{shift.sequence_number}"
-
     async def create_new_shift(self, new_shift: ShiftCreateRequest) -> Shift:
         shift = Shift(**new_shift.dict())
         await self.__validate_shift_on_create(shift)
@@ -174,9 +167,7 @@ class ShiftService:
             if day == 31:
                 break
         shift.tasks = month_tasks
-        shift = await self.__shift_repository.create(instance=shift)
-        await self.__create_shift_dir(shift.id)
-        return shift
+        return await self.__shift_repository.create(instance=shift)
 
     async def get_shift(self, _id: UUID) -> Shift:
         return await self.__shift_repository.get(_id)
@@ -206,10 +197,11 @@ class ShiftService:
         return shift
 
     async def finish_shift(self, bot: Application, _id: UUID) -> Shift:
-        shift = await self.__shift_repository.get_with_members(_id, Member.Status.ACTIVE)
+        shift = await self.__shift_repository.get(_id)
         await shift.finish()
         await self.__shift_repository.update(_id, shift)
-        await self.__telegram_bot(bot).notify_that_shift_is_finished(shift)
+        members = await self.__shift_repository.get_members_recipients(_id, Member.Status.ACTIVE)
+        await self.__telegram_bot(bot).notify_members_that_shift_is_finished(shift, members)
         return shift
 
     async def get_shift_with_members(self, _id: UUID, member_status: Optional[Member.Status]) -> ShiftMembersResponse:
@@ -222,6 +214,13 @@ class ShiftService:
             raise exceptions.ObjectNotFoundError(Shift, _id)
         return await self.__shift_repository.list_all_requests(id=_id, status=status)
 
+    async def stream_all_requests(self, _id: UUID, status: Optional[Request.Status]) -> AsyncIterator[dict[str, Any]]:
+        """Проверяет существование смены и возвращает построчную выдачу ее заявок."""
+        shift_exists = await self.__shift_repository.check_shift_existence(_id)
+        if not shift_exists:
+            raise exceptions.ObjectNotFoundError(Shift, _id)
+        return self.__shift_repository.stream_all_requests(id=_id, status=status)
+
     async def list_all_shifts(
         self, status: Optional[list[Shift.Status]] = None, sort: Optional[ShiftSortRequest] = None
     ) -> list[ShiftWithTotalUsersResponse]:
@@ -235,7 +234,7 @@ class ShiftService:
         if not shift:
             return
         if shift.status is Shift.Status.READY_FOR_COMPLETE:
-            await self.__decline_reports_and_notify_users(shift.id, bot)
+            await self.__decline_reports_and_notify_users(shift, bot)
             shift.status = Shift.Status.FINISHED
             await self.__shift_repository.update(shift.id, shift)
         if shift.finished_at + timedelta(days=1) == date.today():
@@ -249,40 +248,46 @@ class ShiftService:
         shift = await self.__shift_repository.get_with_members_with_reviewed_reports(shift_id)
         await self.__telegram_bot(bot).notify_that_shift_is_finished(shift)
 
-    async def __decline_reports_and_notify_users(self, shift_id: UUID, bot: Application) -> None:
-        """Отклоняет непроверенные задания, уведомляет пользователей об окончании смены."""
-        shift = await self.__shift_repository.get_with_members_and_unreviewed_reports(shift_id)
-        reports_for_update = []
-        for member in shift.members:
-            for report in member.reports:
-                report.status = Report.Status.DECLINED
-                reports_for_update.append(report)
-        await self.__report_repository.update_all(reports_for_update)
-        await self.__telegram_bot(bot).notify_that_shift_is_finished(shift)
+    async def __decline_reports_and_notify_users(self, shift: Shift, bot: Application) -> None:
+        """Отклоняет непроверенные задания активных участников, уведомляет их об окончании смены."""
+        async with self.__report_repository.unit_of_work():
+            declined_reports = await self.__report_repository.bulk_update(
+                {"status": Report.Status.DECLINED},
+                Report.shift_id == shift.id,
+                Report.status == Report.Status.REVIEWING,
+                Report.member.has(Member.status == Member.Status.ACTIVE),
+                returning=(Report.member_id, Report.task_id, Report.shift_id),
+            )
+            await self.__task_report_stats_repository.add_status_changes(
+                (task_id, shift_id, Report.Status.REVIEWING, Report.Status.DECLINED)
+                for _, task_id, shift_id in declined_reports
+            )
+        members = await self.__shift_repository.get_members_recipients(
+            shift.id, Member.Status.ACTIVE, {member_id for member_id, _, _ in declined_reports}
+        )
+        await self.__telegram_bot(bot).notify_members_that_shift_is_finished(shift, members)
 
     async def cancel_shift(
         self, bot: Application, _id: UUID, cancel_shift_data: Optional[ShiftCancelRequest] = None
     ) -> Shift:
-        shift = await self.__shift_repository.get_shift_with_request(_id)
+        shift = await self.__shift_repository.get(_id)
         final_message = "Смена отменена"
         if cancel_shift_data:
             final_message = cancel_shift_data.final_message
         await shift.cancel(final_message)
-        await self.__shift_repository.update(_id, shift)
-        requests_to_update = []
-        for request in shift.requests:
-            if request.status == Request.Status.PENDING:
-                request.status = Request.Status.DECLINED.value
-                requests_to_update.append(request)
-        await self.__request_repository.update_all(requests_to_update)
-
+        async with self.__shift_repository.unit_of_work():
+            await self.__shift_repository.update(_id, shift)
+            await self.__request_repository.bulk_update(
+                {"status": Request.Status.DECLINED},
+                Request.shift_id == _id,
+                Request.status == Request.Status.PENDING,
+            )
+            await self.__user_repository.bulk_update(
+                {"status": User.Status.DECLINED},
+                User.requests.any(Request.shift_id == _id),
+                User.status == User.Status.PENDING,
+            )
         users = await self.__user_repository.get_users_by_shift_id(shift.id)
-        users_to_update = []
-        for user in users:
-            if user.status == User.Status.PENDING:
-                user.status = User.Status.DECLINED.value
-                users_to_update.append(user)
-        await self.__user_repository.update_all(users_to_update)
         await self.__telegram_bot(bot).notify_that_shift_is_cancelled(users, final_message)
         return shift
 
@@ -1,3 +1,6 @@
+import hashlib
+from pathlib import Path
+from typing import Optional
 from urllib.parse import urljoin
 
 from fastapi import Depends, UploadFile
@@ -21,6 +24,14 @@ class TaskService:
             image.close()
         return urljoin(settings.task_image_url, file_name)
 
+    @staticmethod
+    def __get_image_hash(url: str) -> Optional[str]:
+        """Вычислить хэш изображения задания, хранящегося на диске."""
+        image_path = settings.task_image_dir / Path(url).name
+        if not image_path.is_file():
+            return None
+        return hashlib.sha256(image_path.read_bytes()).hexdigest()
+
     async def get_task_ids_list(self) -> list[UUID]:
         return await self.__task_repository.get_task_ids_list()
 
@@ -48,8 +59,27 @@ class TaskService:
         task = await self.__task_repository.get(task_id)
         task.title = update_task_data.title
         task.url = await self.__download_file(update_task_data.image)
+        task.telegram_file_id = None
+        task.telegram_file_hash = None
         return await self.__task_repository.update(task_id, task)
 
+    async def get_telegram_file_id(self, task: Task) -> Optional[str]:
+        """Получить file_id загруженного в telegram изображения задания.
+
+        Возвращает None, если изображение еще не загружалось или было заменено.
+        """
+        if not task.telegram_file_id:
+            return None
+        if task.telegram_file_hash != self.__get_image_hash(task.url):
+            return None
+        return task.telegram_file_id
+
+    async def set_telegram_file_id(self, task: Task, file_id: str) -> Task:
+        """Сохранить file_id загруженного в telegram изображения задания."""
+        task.telegram_file_id = file_id
+        task.telegram_file_hash = self.__get_image_hash(task.url)
+        return await self.__task_repository.update(task.id, task)
+
     async def change_status(self, task_id: UUID) -> Task:
         task = await self.__task_repository.get(task_id)
         task.is_archived = not task.is_archived
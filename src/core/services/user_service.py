@@ -1,5 +1,5 @@
 from datetime import date
-from typing import Optional
+from typing import Any, AsyncIterator, Optional
 from uuid import UUID
 
 from fastapi import Depends
@@ -110,6 +110,14 @@ class UserService:
     ) -> list[UserWithStatusResponse]:
         return await self.__user_repository.get_users_with_status(status, field_sort, direction_sort)
 
+    def stream_all_users(
+        self,
+        status: Optional[User.Status] = None,
+        field_sort: Optional[UserFieldSortRequest] = None,
+        direction_sort: Optional[UserDescAscSortRequest] = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        return self.__user_repository.stream_users_with_status(status, field_sort, direction_sort)
+
     async def set_telegram_blocked(self, user: User) -> None:
         user.telegram_blocked = True
         await self.__user_repository.update(user.id, user)
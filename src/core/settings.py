@@ -19,13 +19,23 @@ class Settings(BaseSettings):
 
     BOT_TOKEN: str
     BOT_WEBHOOK_MODE: bool = False
-    BOT_PERSISTENCE_FILE: str = str(BASE_DIR / "src" / "bot" / "bot_persistence_file")
+    BOT_PERSISTENCE_UPDATE_INTERVAL: int = 60  # интервал (в секундах) сохранения данных бота в БД
+    BOT_CONCURRENT_UPDATES: int = 16  # максимальное количество одновременно обрабатываемых обновлений бота
     APPLICATION_URL: str
     POSTGRES_DB: str
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str
     DB_HOST: str
     DB_PORT: str
+    DB_ECHO: bool = False  # логирование всех SQL-запросов, включать только для отладки
+    DB_POOL_SIZE: int = 5  # количество постоянных соединений с БД в пуле одного процесса
+    DB_MAX_OVERFLOW: int = 10  # количество соединений, которые могут быть открыты сверх DB_POOL_SIZE
+    DB_POOL_TIMEOUT: int = 30  # время ожидания (в секундах) свободного соединения из пула
+    DB_POOL_RECYCLE: int = 1800  # время жизни (в секундах) соединения, после которого оно пересоздается
+    DB_POOL_PRE_PING: bool = True  # проверка соединения перед выдачей из пула
+    DB_STATEMENT_TIMEOUT: int = 30000  # максимальное время выполнения (в миллисекундах) SQL-запроса
+    DB_STATEMENT_CACHE_SIZE: int = 100  # размер кэша подготовленных выражений asyncpg для одного соединения
+    DB_SESSION_LEAK_THRESHOLD: int = 60  # время (в секундах) удержания соединения до предупреждения об утечке
     MIN_DAYS: int = 1
     MAX_DAYS: int = 93
     SEND_NEW_TASK_HOUR: int = 8  # время для отправки задания
@@ -63,6 +73,36 @@ class Settings(BaseSettings):
     LOG_COMPRESSION: str = "tar.gz"
     LOG_LEVEL: str = "WARNING"
 
+    # Настройки очереди исходящих сообщений
+    OUTBOX_POLLING_INTERVAL: int = 1  # интервал (в секундах) проверки очереди на наличие новых сообщений
+    OUTBOX_CONCURRENCY: int = 25  # максимальное количество одновременно отправляемых сообщений
+    OUTBOX_SENDING_TIMEOUT = timedelta(minutes=5)  # время, после которого неотправленное сообщение берется повторно
+    OUTBOX_SENT_MESSAGES_TTL = timedelta(days=7)  # время хранения отправленных сообщений
+    OUTBOX_CLEANUP_HOUR: int = 3  # час, в который удаляются отправленные сообщения с истекшим сроком хранения
+
+    # Настройки кэша excel-отчётов аналитики
+    ANALYTICS_CACHE_DIR: str = str(BASE_DIR / "analytics_cache")  # каталог для хранения сформированных отчётов
+    ANALYTICS_CACHE_MAX_SIZE: int = 100 * 1024 * 1024  # максимальный размер (в байтах) файлов в каталоге кэша
+    ANALYTICS_EXPORTS_DIR: str = str(BASE_DIR / "analytics_exports")  # каталог для отчётов, сформированных в фоне
+    ANALYTICS_EXPORT_POLLING_INTERVAL: int = 5  # интервал (в секундах) проверки новых задач на формирование отчёта
+    ANALYTICS_EXPORT_TIMEOUT = timedelta(minutes=30)  # время, после которого незавершённая задача запускается заново
+    ANALYTICS_EXPORT_TTL = timedelta(days=7)  # время хранения сформированного в фоне отчёта
+
+    # Настройки кэша аутентификации администраторов. Кэш свой у каждого процесса, поэтому изменения
+    # администратора (например, блокировка) в других процессах вступают в силу не позже чем через AUTH_CACHE_TTL
+    AUTH_CACHE_TTL: int = 60  # время жизни (в секундах) записи об администраторе и проверенном токене
+    AUTH_CACHE_MAX_SIZE: int = 1000  # максимальное количество администраторов и токенов в кэше
+    PASSWORD_HASHING_WORKERS: int = 2  # количество потоков для одновременного хэширования и проверки паролей
+    # ограничение попыток входа администратора, считается отдельно в каждом процессе
+    LOGIN_ATTEMPTS_PER_EMAIL: int = 5  # количество попыток входа с одним email за период
+    LOGIN_ATTEMPTS_PER_IP: int = 20  # количество попыток входа с одного IP-адреса за период
+    LOGIN_ATTEMPTS_PERIOD: int = 300  # период (в секундах), за который считаются попытки входа
+
+    # Настройки превью фотоотчётов
+    THUMBNAIL_SIZE: int = 320  # максимальный размер (в пикселях) большей стороны превью
+    THUMBNAIL_QUALITY: int = 75  # качество JPEG превью
+    THUMBNAIL_WORKERS: int = 2  # количество потоков для одновременного создания превью
+
     NUMBER_ATTEMPTS_SUBMIT_REPORT: int = 3  # количество попыток для сдачи фотоотчета для одного задания
     INVITE_LINK_EXPIRATION_TIME = timedelta(days=1)  # время существования ссылки для приглашения на регистрацию
 
@@ -1,105 +1,126 @@
 import enum
 from dataclasses import astuple
-from io import BytesIO
+from tempfile import SpooledTemporaryFile
+from typing import Any, Iterable, Optional, Sequence
 
 from openpyxl import Workbook
-from openpyxl.styles import Alignment, Border, Font, Side
-from openpyxl.worksheet.worksheet import Worksheet
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, Side
+from openpyxl.worksheet._write_only import WriteOnlyWorksheet
 
-from src.core.db.DTO_models import TasksAnalyticReportDto
 from src.excel_generator.task_builder import BaseAnalyticReportSettings
 
+# отчёт держится в памяти, пока не превысит этот размер, после чего переносится во временный файл на диске
+SPOOLED_MAX_SIZE = 10 * 1024 * 1024
+
 
 class AnalyticReportBuilder:
-    """Интерфейс строителя."""
+    """Интерфейс строителя.
+
+    Отчёт строится в режиме write-only: строки сразу записываются на диск
+    и не хранятся в памяти, поэтому стили задаются ячейкам до записи строки.
+    Методы строителя выполняют блокирующую работу и должны вызываться в пуле потоков.
+    """
 
-    async def generate_report(
+    def generate_report(
         self,
-        data: tuple[TasksAnalyticReportDto],
+        data: Sequence[Any],
         workbook: Workbook,
         analytic_task_report_full: BaseAnalyticReportSettings,
+        sheet_name: Optional[str] = None,
     ) -> Workbook:
-        """Генерация листа с данными."""
-        worksheet = self._create_sheet(workbook, sheet_name=analytic_task_report_full.sheet_name)
-        analytic_task_report_full.row_count = 0
-        self.__add_header(worksheet, analytic_task_report_full)
-        self.__add_data(worksheet, data, analytic_task_report_full)
-        self.__add_footer(worksheet, analytic_task_report_full)
-        self.__apply_styles(worksheet)
+        """Генерация листа с данными.
+
+        data - последовательность dataclass-объектов, поля которых соответствуют колонкам листа.
+        Если sheet_name не передан, используется имя листа из настроек отчёта.
+        """
+        worksheet = self._create_sheet(workbook, sheet_name=sheet_name or analytic_task_report_full.sheet_name)
+        row_count = 0
+        row_count += self.__add_header(worksheet, analytic_task_report_full)
+        row_count += self.__add_data(worksheet, data)
+        self.__add_footer(worksheet, analytic_task_report_full, row_count)
         return workbook
 
     def __add_row(
-        self,
-        worksheet: Worksheet,
-        analytic_task_report: BaseAnalyticReportSettings,
-        data: tuple[str | int],
+        self, worksheet: WriteOnlyWorksheet, data: Iterable[Any], style: "AnalyticReportBuilder.Styles"
     ) -> None:
-        analytic_task_report.row_count += 1
-        for index, value in enumerate(data, start=1):
-            worksheet.cell(row=analytic_task_report.row_count, column=index, value=value)
+        worksheet.append([self.__create_cell(worksheet, value, style) for value in data])
 
     @staticmethod
-    async def get_report_response(workbook: Workbook) -> BytesIO:
-        """Создание ответа."""
-        stream = BytesIO()
-        workbook.save(stream)
-        stream.seek(0)
-        return stream
+    def __create_cell(
+        worksheet: WriteOnlyWorksheet, value: Any, style: "AnalyticReportBuilder.Styles"
+    ) -> WriteOnlyCell:
+        cell = WriteOnlyCell(worksheet)
+        cell.style = style.value
+        # значение присваивается после стиля, чтобы для дат сохранился формат, выставленный openpyxl
+        cell.value = value
+        return cell
 
     @staticmethod
-    def create_workbook() -> Workbook:
+    def save_workbook(workbook: Workbook) -> SpooledTemporaryFile:
+        """Сохраняет отчёт во временный файл и возвращает его, установив позицию чтения в начало."""
+        report_file = SpooledTemporaryFile(max_size=SPOOLED_MAX_SIZE)
+        workbook.save(report_file)
+        report_file.seek(0)
+        return report_file
+
+    def create_workbook(self) -> Workbook:
         """Генерация excel файла."""
-        workbook = Workbook()
-        workbook.remove_sheet(workbook.active)
+        workbook = Workbook(write_only=True)
+        self.__add_named_styles(workbook)
         return workbook
 
-    @staticmethod
-    def _create_sheet(workbook: Workbook, sheet_name: str) -> Worksheet:
+    def __add_named_styles(self, workbook: Workbook) -> None:
+        """Регистрирует в отчёте стили ячеек, чтобы не вычислять стиль для каждой ячейки отдельно."""
+        border = self.Styles.BORDER.value
+        workbook.add_named_style(
+            NamedStyle(
+                name=self.Styles.HEADER.value,
+                font=self.Styles.FONT_BOLD.value,
+                alignment=self.Styles.ALIGNMENT_HEADER.value,
+                border=border,
+            )
+        )
+        workbook.add_named_style(
+            NamedStyle(
+                name=self.Styles.DATA.value,
+                font=self.Styles.FONT_STANDART.value,
+                alignment=self.Styles.ALIGNMENT_STANDART.value,
+                border=border,
+            )
+        )
+        workbook.add_named_style(
+            NamedStyle(
+                name=self.Styles.FOOTER.value,
+                font=self.Styles.FONT_BOLD.value,
+                alignment=self.Styles.ALIGNMENT_STANDART.value,
+                border=border,
+            )
+        )
+
+    def _create_sheet(self, workbook: Workbook, sheet_name: str) -> WriteOnlyWorksheet:
         """Создаёт лист внутри отчёта."""
-        return workbook.create_sheet(sheet_name)
+        worksheet = workbook.create_sheet(sheet_name)
+        # в режиме write-only ширину колонок нужно задать до записи первой строки
+        worksheet.column_dimensions["A"].width = self.Styles.WIDTH.value
+        return worksheet
 
-    def __add_header(self, worksheet: Worksheet, analytic_task_report: BaseAnalyticReportSettings) -> None:
-        """Заполняет первые строки в листе."""
-        self.__add_row(worksheet, analytic_task_report, analytic_task_report.header_data)
+    def __add_header(self, worksheet: WriteOnlyWorksheet, analytic_task_report: BaseAnalyticReportSettings) -> int:
+        """Заполняет первые строки в листе. Возвращает количество записанных строк."""
+        self.__add_row(worksheet, analytic_task_report.header_data, self.Styles.HEADER)
+        return 1
 
-    def __add_data(
-        self,
-        worksheet: Worksheet,
-        data: tuple[TasksAnalyticReportDto],
-        analytic_task_report: BaseAnalyticReportSettings,
-    ) -> None:
-        """Заполняет строки данными из БД."""
-        for task in data:
-            self.__add_row(worksheet, analytic_task_report, data=astuple(task))
+    def __add_data(self, worksheet: WriteOnlyWorksheet, data: Sequence[Any]) -> int:
+        """Заполняет строки данными из БД. Возвращает количество записанных строк."""
+        for row in data:
+            self.__add_row(worksheet, astuple(row), self.Styles.DATA)
+        return len(data)
 
-    def __add_footer(self, worksheet: Worksheet, analytic_task_report: BaseAnalyticReportSettings) -> None:
+    def __add_footer(
+        self, worksheet: WriteOnlyWorksheet, analytic_task_report: BaseAnalyticReportSettings, row_count: int
+    ) -> None:
         """Заполняет последнюю строку в листе."""
-        self.__add_row(worksheet, analytic_task_report, data=analytic_task_report.footer_data)
-
-    def __apply_styles(self, worksheet: Worksheet):
-        """Задаёт форматирование отчёта."""
-        # задаём стиль для хэдера
-        rows = list(worksheet.iter_rows())
-        header_cells = rows[0]
-        for cell in header_cells:
-            cell.font = self.Styles.FONT_BOLD.value
-            cell.alignment = self.Styles.ALIGNMENT_HEADER.value
-        # задаём стиль для ячеек с данными
-        data_rows = rows[1:-1]
-        for row in data_rows:
-            for cell in row:
-                cell.font = self.Styles.FONT_STANDART.value
-                cell.alignment = self.Styles.ALIGNMENT_STANDART.value
-        # задаём стиль для футера
-        footer_cells = rows[-1]
-        for cell in footer_cells:
-            cell.font = self.Styles.FONT_BOLD.value
-            cell.alignment = self.Styles.ALIGNMENT_STANDART.value
-        # задаём стиль границ и колонок
-        for row in rows:
-            for cell in row:
-                cell.border = self.Styles.BORDER.value
-        worksheet.column_dimensions["A"].width = self.Styles.WIDTH.value
+        self.__add_row(worksheet, analytic_task_report.get_footer_data(row_count), self.Styles.FOOTER)
 
     class Styles(enum.Enum):
         FONT_BOLD = Font(name='Times New Roman', size=11, bold=True)
@@ -110,3 +131,6 @@ class AnalyticReportBuilder:
             left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')
         )
         WIDTH = 50
+        HEADER = "analytic_header"
+        DATA = "analytic_data"
+        FOOTER = "analytic_footer"
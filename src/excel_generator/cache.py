@@ -0,0 +1,66 @@
+import os
+import shutil
+from pathlib import Path
+from tempfile import NamedTemporaryFile, SpooledTemporaryFile
+from typing import BinaryIO, Optional
+
+from src.core.settings import settings
+
+CACHE_FILE_SUFFIX = ".xlsx"
+
+
+class AnalyticReportCache:
+    """Файловый кэш сформированных excel-отчётов.
+
+    Отчёт хранится в файле с именем из типа отчёта и версии данных, по которым он построен,
+    поэтому при изменении данных отчёт перестаёт находиться в кэше без явной инвалидации.
+    При превышении допустимого размера удаляются отчёты, которые дольше всего не запрашивались.
+    Методы кэша работают с диском и должны вызываться в пуле потоков.
+    """
+
+    def __init__(self) -> None:
+        self.__directory = Path(settings.ANALYTICS_CACHE_DIR)
+        self.__max_size = settings.ANALYTICS_CACHE_MAX_SIZE
+
+    def get(self, report_type: str, version: str) -> Optional[BinaryIO]:
+        """Возвращает открытый файл отчёта или None, если отчёта нет в кэше."""
+        path = self.__get_path(report_type, version)
+        try:
+            report_file = path.open("rb")
+        except FileNotFoundError:
+            return None
+        # время изменения файла используется как время последнего обращения для вытеснения
+        os.utime(path)
+        return report_file
+
+    def put(self, report_type: str, version: str, report_file: SpooledTemporaryFile) -> None:
+        """Сохраняет отчёт в кэш, удаляет предыдущие версии этого отчёта и освобождает место."""
+        self.__directory.mkdir(parents=True, exist_ok=True)
+        with NamedTemporaryFile(dir=self.__directory, suffix=".tmp", delete=False) as cache_file:
+            shutil.copyfileobj(report_file, cache_file)
+        report_file.seek(0)
+        path = self.__get_path(report_type, version)
+        # файл переименовывается целиком, чтобы другие процессы не прочитали его частично
+        os.replace(cache_file.name, path)
+        for outdated_path in self.__directory.glob(f"{report_type}_*{CACHE_FILE_SUFFIX}"):
+            if outdated_path != path:
+                outdated_path.unlink(missing_ok=True)
+        self.__evict()
+
+    def __get_path(self, report_type: str, version: str) -> Path:
+        return self.__directory / f"{report_type}_{version}{CACHE_FILE_SUFFIX}"
+
+    def __evict(self) -> None:
+        """Удаляет отчёты, которые дольше всего не запрашивались, пока размер кэша превышает допустимый."""
+        cached_files = []
+        for path in self.__directory.glob(f"*{CACHE_FILE_SUFFIX}"):
+            try:
+                cached_files.append((path.stat(), path))
+            except FileNotFoundError:
+                continue
+        cache_size = sum(stat.st_size for stat, _ in cached_files)
+        for stat, path in sorted(cached_files, key=lambda cached_file: cached_file[0].st_mtime):
+            if cache_size <= self.__max_size:
+                break
+            path.unlink(missing_ok=True)
+            cache_size -= stat.st_size
@@ -0,0 +1,78 @@
+from src.excel_generator.task_builder import BaseAnalyticReportSettings
+
+
+class MembersAnalyticReportSettings(BaseAnalyticReportSettings):
+    """Конфигурация листа с рейтингом участников смены."""
+
+    sheet_name: str = "Участники"
+    header_data: tuple[str] = (
+        "Фамилия",
+        "Имя",
+        "Статус участника",
+        "Кол-во ломбарьерчиков",
+    )
+
+    @staticmethod
+    def get_footer_data(row_count: int) -> tuple[str]:
+        """Строка с итогами. row_count - номер последней строки с данными."""
+        return (
+            "ИТОГО:",
+            "",
+            "",
+            f"=SUM(D2:D{row_count})",
+        )
+
+
+class DailyCompletionAnalyticReportSettings(BaseAnalyticReportSettings):
+    """Конфигурация листа с выполнением заданий смены по дням."""
+
+    sheet_name: str = "Выполнение по дням"
+    header_data: tuple[str] = (
+        "Дата",
+        "Задача",
+        "Кол-во отчётов",
+        "Кол-во принятых отчётов",
+        "Кол-во отклонённых отчётов",
+        "Кол-во не предоставленных отчётов",
+        "Процент выполнения",
+    )
+
+    @staticmethod
+    def get_footer_data(row_count: int) -> tuple[str]:
+        """Строка с итогами. row_count - номер последней строки с данными."""
+        footer_row = row_count + 1
+        return (
+            "ИТОГО:",
+            "",
+            f"=SUM(C2:C{row_count})",
+            f"=SUM(D2:D{row_count})",
+            f"=SUM(E2:E{row_count})",
+            f"=SUM(F2:F{row_count})",
+            f"=IF(C{footer_row}=0,0,ROUND(D{footer_row}*100/C{footer_row},1))",
+        )
+
+
+class ReviewersAnalyticReportSettings(BaseAnalyticReportSettings):
+    """Конфигурация листа с проверкой отчётов смены администраторами."""
+
+    sheet_name: str = "Проверка отчётов"
+    header_data: tuple[str] = (
+        "Фамилия",
+        "Имя",
+        "Кол-во проверенных отчётов",
+        "Кол-во принятых отчётов",
+        "Кол-во отклонённых отчётов",
+        "Медианное время проверки, ч",
+    )
+
+    @staticmethod
+    def get_footer_data(row_count: int) -> tuple[str]:
+        """Строка с итогами. row_count - номер последней строки с данными."""
+        return (
+            "ИТОГО:",
+            "",
+            f"=SUM(C2:C{row_count})",
+            f"=SUM(D2:D{row_count})",
+            f"=SUM(E2:E{row_count})",
+            "",
+        )
@@ -5,7 +5,10 @@ from dataclasses import dataclass
 class BaseAnalyticReportSettings:
     sheet_name: str
     header_data: tuple[str]
-    row_coun: int
+
+    @staticmethod
+    def get_footer_data(row_count: int) -> tuple[str]:
+        raise NotImplementedError
 
 
 class TaskAnalyticReportSettings(BaseAnalyticReportSettings):
@@ -18,14 +21,13 @@ class TaskAnalyticReportSettings(BaseAnalyticReportSettings):
         "Кол-во отклонённых отчётов",
         "Кол-во не предоставленных отчётов",
     )
-    row_count: int = 0
 
-    @classmethod
-    @property
-    def footer_data(cls):
+    @staticmethod
+    def get_footer_data(row_count: int) -> tuple[str]:
+        """Строка с итогами. row_count - номер последней строки с данными."""
         return (
             "ИТОГО:",
-            f"=SUM(B2:B{cls.row_count})",
-            f"=SUM(C2:C{cls.row_count})",
-            f"=SUM(D2:D{cls.row_count})",
+            f"=SUM(B2:B{row_count})",
+            f"=SUM(C2:C{row_count})",
+            f"=SUM(D2:D{row_count})",
         )
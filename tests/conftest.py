@@ -0,0 +1,117 @@
+import uuid
+from datetime import date, timedelta
+from typing import AsyncIterator, Iterator
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+from src.core.db.models import Member, Report, Shift, Task, User
+from src.core.settings import settings
+
+
+class QueryCounter:
+    """Запоминает SQL-запросы, выполненные через соединение сессии.
+
+    Запросы точек сохранения, которые появляются из-за внешней транзакции теста, не учитываются.
+    """
+
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if "SAVEPOINT" not in statement:
+            self.statements.append(statement)
+
+    def clear(self) -> None:
+        self.statements.clear()
+
+    def touching(self, table_name: str) -> list[str]:
+        """Возвращает запросы, в которых упоминается таблица table_name."""
+        return [statement for statement in self.statements if table_name in statement]
+
+
+@pytest.fixture
+async def engine() -> AsyncIterator[AsyncEngine]:
+    engine = create_async_engine(settings.database_url)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def session(engine: AsyncEngine) -> AsyncIterator[AsyncSession]:
+    """Сессия внутри внешней транзакции, которая откатывается после теста.
+
+    Коммиты репозиториев фиксируют только точку сохранения, поэтому тест не оставляет данных в базе.
+    """
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        async with AsyncSession(
+            bind=connection, expire_on_commit=False, join_transaction_mode="create_savepoint"
+        ) as session:
+            yield session
+        await transaction.rollback()
+
+
+@pytest.fixture
+def query_counter(session: AsyncSession) -> Iterator[QueryCounter]:
+    counter = QueryCounter()
+    sync_engine = session.bind.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", counter)
+    yield counter
+    event.remove(sync_engine, "before_cursor_execute", counter)
+
+
+def _unique_number() -> int:
+    return uuid.uuid4().int % 10**10
+
+
+def make_user(telegram_blocked: bool = False) -> User:
+    number = _unique_number()
+    return User(
+        name="Имя",
+        surname="Фамилия",
+        date_of_birth=date(2010, 1, 1),
+        city="Москва",
+        phone_number=f"7{number}",
+        telegram_id=number,
+        status=User.Status.VERIFIED,
+        telegram_blocked=telegram_blocked,
+    )
+
+
+@pytest.fixture
+async def started_shift(session: AsyncSession) -> Shift:
+    """Начатая смена с участниками, у каждого из которых есть история отчетов.
+
+    Активные участники: обычный и заблокировавший бота. Кроме них в смене есть исключенный участник.
+    """
+    task = Task(url=f"/static/tasks/{uuid.uuid4()}.png", title=f"Задание {uuid.uuid4()}")
+    shift = Shift(
+        status=Shift.Status.STARTED,
+        started_at=date.today() - timedelta(days=30),
+        finished_at=date.today() + timedelta(days=60),
+        title="Тестовая смена",
+        final_message="{name} {surname}, ты заработал {numbers_lombaryers} {lombaryers_case}",
+        tasks={},
+    )
+    members = [
+        Member(user=make_user(), shift=shift, status=Member.Status.ACTIVE, numbers_lombaryers=3),
+        Member(user=make_user(telegram_blocked=True), shift=shift, status=Member.Status.ACTIVE),
+        Member(user=make_user(), shift=shift, status=Member.Status.EXCLUDED),
+    ]
+    reports = [
+        Report(
+            shift=shift,
+            task=task,
+            member=member,
+            task_date=shift.started_at + timedelta(days=day),
+            status=Report.Status.APPROVED,
+        )
+        for member in members
+        for day in range(30)
+    ]
+    session.add_all([task, shift, *members, *reports])
+    await session.commit()
+    session.expunge_all()
+    return shift
@@ -0,0 +1,43 @@
+import uuid
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.bot.api_services import get_analytics_service_callback
+from src.core.db.models import Administrator, AnalyticsExport
+from src.core.db.repository import TaskRepository
+
+
+@pytest.fixture
+async def pending_export(session: AsyncSession) -> AnalyticsExport:
+    administrator = Administrator(
+        name="Имя",
+        surname="Фамилия",
+        email=f"{uuid.uuid4()}@example.com",
+        hashed_password="",
+        role=Administrator.Role.ADMINISTRATOR,
+        status=Administrator.Status.ACTIVE,
+    )
+    session.add(administrator)
+    await session.commit()
+    export = AnalyticsExport(report_type=AnalyticsExport.ReportType.TASKS, administrator_id=administrator.id)
+    session.add(export)
+    await session.commit()
+    return export
+
+
+async def test_export_is_failed_when_database_query_fails(
+    session: AsyncSession, pending_export: AnalyticsExport, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async def get_data_version(self, models):
+        # ошибка запроса прерывает транзакцию сессии, как, например, превышение statement_timeout
+        await self._session.execute(text("SELECT 1 / 0"))
+
+    monkeypatch.setattr(TaskRepository, "get_data_version", get_data_version)
+    export_id = pending_export.id
+
+    await get_analytics_service_callback(session).process_exports()
+
+    status = await session.scalar(text("SELECT status FROM analytics_exports WHERE id = :id"), {"id": export_id})
+    assert status == AnalyticsExport.Status.FAILED.value
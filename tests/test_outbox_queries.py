@@ -0,0 +1,64 @@
+from datetime import timedelta
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.db.models import OutboxMessage
+from src.core.db.repository import OutboxRepository
+
+from .conftest import make_user
+
+SENDING_TIMEOUT = timedelta(minutes=5)
+
+
+async def create_messages(session: AsyncSession, chats_count: int, messages_per_chat: int) -> None:
+    users = [make_user() for _ in range(chats_count)]
+    session.add_all(users)
+    await session.commit()
+    await OutboxRepository(session).create_all(
+        [
+            dict(user_id=user.id, telegram_id=user.telegram_id, text=f"{user.telegram_id}-{number}")
+            for number in range(messages_per_chat)
+            for user in users
+        ]
+    )
+
+
+async def test_taken_messages_are_not_taken_again(session: AsyncSession) -> None:
+    outbox_repository = OutboxRepository(session)
+    await create_messages(session, chats_count=3, messages_per_chat=2)
+
+    first_batch = await outbox_repository.take_for_sending(2, SENDING_TIMEOUT)
+    second_batch = await outbox_repository.take_for_sending(2, SENDING_TIMEOUT)
+    third_batch = await outbox_repository.take_for_sending(2, SENDING_TIMEOUT)
+
+    taken_messages = first_batch + second_batch
+    assert len({message.telegram_id for message in taken_messages}) == len(taken_messages) == 3
+    assert all(message.text.endswith("-0") for message in taken_messages)
+    assert third_batch == []
+
+
+async def test_next_chat_message_is_taken_after_previous_is_sent(session: AsyncSession) -> None:
+    outbox_repository = OutboxRepository(session)
+    await create_messages(session, chats_count=1, messages_per_chat=2)
+    [first_message] = await outbox_repository.take_for_sending(10, SENDING_TIMEOUT)
+
+    await outbox_repository.set_sent([first_message.id])
+    [next_message] = await outbox_repository.take_for_sending(10, SENDING_TIMEOUT)
+
+    assert next_message.sequence_number > first_message.sequence_number
+
+
+async def test_delete_sent_before_keeps_pending_messages(session: AsyncSession) -> None:
+    outbox_repository = OutboxRepository(session)
+    await create_messages(session, chats_count=2, messages_per_chat=1)
+    [sent_message, pending_message] = await outbox_repository.take_for_sending(10, SENDING_TIMEOUT)
+    await outbox_repository.set_sent([sent_message.id])
+
+    sent_at = await session.scalar(select(OutboxMessage.sent_at).where(OutboxMessage.id == sent_message.id))
+    await outbox_repository.delete_sent_before(sent_at + timedelta(seconds=1))
+
+    message_ids = await session.scalars(
+        select(OutboxMessage.id).where(OutboxMessage.id.in_((sent_message.id, pending_message.id)))
+    )
+    assert message_ids.all() == [pending_message.id]
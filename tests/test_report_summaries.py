@@ -0,0 +1,44 @@
+import uuid
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.bot.api_services import get_report_service_callback
+from src.core import exceptions
+from src.core.db.models import Report, Shift
+
+
+async def test_pages_follow_each_other(session: AsyncSession, started_shift: Shift) -> None:
+    report_service = get_report_service_callback(session)
+    all_reports, _ = await report_service.get_summaries_of_reports(started_shift.id, None, ["report_id"])
+
+    first_page, cursor = await report_service.get_summaries_of_reports(started_shift.id, None, ["report_id"], 2)
+    next_page, _ = await report_service.get_summaries_of_reports(started_shift.id, None, ["report_id"], 2, cursor)
+
+    assert first_page + next_page == all_reports[:4]
+
+
+async def test_unknown_cursor_is_rejected(session: AsyncSession, started_shift: Shift) -> None:
+    report_service = get_report_service_callback(session)
+
+    with pytest.raises(exceptions.ObjectNotFoundError):
+        await report_service.get_summaries_of_reports(started_shift.id, None, None, 10, uuid.uuid4())
+
+
+async def test_cursor_of_another_shift_is_rejected(session: AsyncSession, started_shift: Shift) -> None:
+    another_shift = Shift(
+        status=Shift.Status.PREPARING,
+        started_at=date.today() + timedelta(days=100),
+        finished_at=date.today() + timedelta(days=190),
+        title="Другая смена",
+        final_message="",
+        tasks={},
+    )
+    session.add(another_shift)
+    await session.commit()
+    cursor = await session.scalar(select(Report.id).where(Report.shift_id == started_shift.id).limit(1))
+
+    with pytest.raises(exceptions.ReportsCursorError):
+        await get_report_service_callback(session).get_summaries_of_reports(another_shift.id, None, None, 10, cursor)
@@ -0,0 +1,68 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.bot.api_services import get_shift_service_callback
+from src.bot.services import BotService
+from src.core.db.models import Member, Report, Shift
+from src.core.db.repository import ShiftRepository
+
+from .conftest import QueryCounter
+
+
+@pytest.fixture
+def enqueued_messages(monkeypatch: pytest.MonkeyPatch) -> list[tuple]:
+    """Перехватывает сообщения, которые бот ставит в очередь на отправку."""
+    messages = []
+
+    async def enqueue_messages(self, new_messages, photo=None, reply_markup=None) -> None:
+        messages.extend(new_messages)
+
+    monkeypatch.setattr(BotService, "enqueue_messages", enqueue_messages)
+    return messages
+
+
+def loaded_reports(session: AsyncSession) -> list[Report]:
+    return [instance for instance in session.identity_map.values() if isinstance(instance, Report)]
+
+
+async def test_members_recipients_do_not_load_reports(
+    session: AsyncSession, query_counter: QueryCounter, started_shift: Shift
+) -> None:
+    query_counter.clear()
+
+    recipients = await ShiftRepository(session).get_members_recipients(started_shift.id, Member.Status.ACTIVE)
+
+    assert len(query_counter.statements) == 1
+    assert query_counter.touching("reports") == []
+    assert loaded_reports(session) == []
+    assert [recipient.numbers_lombaryers for recipient in recipients] == [3]
+
+
+async def test_members_recipients_filtered_by_ids(session: AsyncSession, started_shift: Shift) -> None:
+    shift_repository = ShiftRepository(session)
+    active_recipients = await shift_repository.get_members_recipients(started_shift.id, Member.Status.ACTIVE)
+
+    recipients = await shift_repository.get_members_recipients(started_shift.id, Member.Status.ACTIVE, set())
+
+    assert len(active_recipients) == 1
+    assert recipients == []
+
+
+async def test_finish_shift_does_not_load_reports(
+    session: AsyncSession, query_counter: QueryCounter, started_shift: Shift, enqueued_messages: list[tuple]
+) -> None:
+    shift_service = get_shift_service_callback(session)
+    query_counter.clear()
+
+    shift = await shift_service.finish_shift(SimpleNamespace(bot=None), started_shift.id)
+
+    assert shift.status == Shift.Status.FINISHED
+    assert query_counter.touching("reports") == []
+    assert loaded_reports(session) == []
+    # выборка смены, ее обновление и выборка получателей
+    assert len(query_counter.statements) == 3
+    assert len(enqueued_messages) == 1
+    _, _, text = enqueued_messages[0]
+    assert text == "Имя Фамилия, ты заработал 3 ломбарьерчика"